@@ -17,19 +17,19 @@ from examples import table
 from examples import tictactoe
 
 items = [
-    ("examples/styling.py", styling.create()),
-    ("examples/dom.py", dom.create()),
-    ("examples/inputs.py", inputs.create()),
-    ("examples/reactive.py", reactive.create()),
-    ("examples/table.py", table.create()),
-    ("examples/custom.py", custom.create()),
-    ("examples/app.py", app.create()),
-    ("examples/pubsub.py", pubsub.create()),
-    ("examples/editor.py", editor.create()),
-    ("examples/pitch.py", pitch.create()),
-    ("examples/svg.py", svg.create()),
-    ("examples/canvas.py", canvas.create()),
-    ("examples/pizza.py", pizza.create()),
-    ("examples/splits.py", splits.create()),
-    ("examples/tictactoe.py", tictactoe.create()),
+    ("examples/styling.py", styling.NAME, styling.create),
+    ("examples/dom.py", dom.NAME, dom.create),
+    ("examples/inputs.py", inputs.NAME, inputs.create),
+    ("examples/reactive.py", reactive.NAME, reactive.create),
+    ("examples/table.py", table.NAME, table.create),
+    ("examples/custom.py", custom.NAME, custom.create),
+    ("examples/app.py", app.NAME, app.create),
+    ("examples/pubsub.py", pubsub.NAME, pubsub.create),
+    ("examples/editor.py", editor.NAME, editor.create),
+    ("examples/pitch.py", pitch.NAME, pitch.create),
+    ("examples/svg.py", svg.NAME, svg.create),
+    ("examples/canvas.py", canvas.NAME, canvas.create),
+    ("examples/pizza.py", pizza.NAME, pizza.create),
+    ("examples/splits.py", splits.NAME, splits.create),
+    ("examples/tictactoe.py", tictactoe.NAME, tictactoe.create),
 ]
\ No newline at end of file
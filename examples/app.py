@@ -2,6 +2,8 @@
 
 import ltk
 
+NAME = "App"
+
 def create():
     def handler(item):
         ltk.ListItem(
@@ -46,4 +48,4 @@ def create():
         )
         .width(500)
         .height(800)
-        .attr("name", "App"))
\ No newline at end of file
+        .attr("name", NAME))
\ No newline at end of file
@@ -3,6 +3,8 @@
 import ltk
 import random
 
+NAME = "Canvas"
+
 
 def create():
 
@@ -33,5 +35,5 @@ def create():
                 .css("border", "1px solid gray")
                 .css("background", "pink")
         )
-        .attr("name", "Canvas")
+        .attr("name", NAME)
     )
@@ -2,6 +2,8 @@
 
 import ltk
 
+NAME = "Custom"
+
 def create():
     class CustomWidget(ltk.VBox):
         classes = [ "custom Widget" ]
@@ -35,6 +37,6 @@ def create():
         .css("padding", 8)
         .css("border", "1px solid gray")
         .css("background", "lightyellow")
-        .attr("name", "Custom")
+        .attr("name", NAME)
         .height(790)
     )
@@ -2,6 +2,8 @@
 
 import ltk
 
+NAME = "DOM"
+
 colors = [ "#E40303", "#FF8C00", "#FFED00", "#008026", "#24408E", "#732982" ]
 
 def create():
@@ -135,5 +137,5 @@ def create():
         )
         .width(400)
         .attr("id", "dom-demo")
-        .attr("name", "DOM")
+        .attr("name", NAME)
     )
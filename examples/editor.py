@@ -2,6 +2,8 @@
 
 import ltk
 
+NAME = "Editor"
+
 source = """
 ltk.VBox(
     ltk.HBox(
@@ -28,21 +30,18 @@ ltk.VBox(
 def create():
     editor = Editor(source)
 
-    def show_output():
-        eval(editor.text()).appendTo(
-            ltk.find("#editor-output")
-                .empty()
-        )
+    def render():
+        return eval(editor.text() if editor.editor else source)
 
-    ltk.schedule(ltk.proxy(lambda: show_output()), "show output", 0.1)
+    output = ltk.Renderer(render)
 
     return(
         ltk.VerticalSplitPane(
-            ltk.Div()
+            output
                 .css("border", "1px solid gray")
                 .attr("id", "editor-output"),
             editor
-                .on("keyup", ltk.proxy(lambda event: show_output()))
+                .on("keyup", lambda event: output.refresh())
                 .css("border", "1px solid gray")
                 .attr("id", "editor"),
             "interactive editor"
@@ -50,11 +49,12 @@ def create():
         .css("height", 805)
         .css("width", 400)
         .css("font-size", 14)
-        .attr("name", "Editor")
+        .attr("name", NAME)
     )
 
 class Editor(ltk.Div):
     classes = [ "editor" ]
+    editor = None
 
     def __init__(self, value):
         ltk.Div.__init__(self)
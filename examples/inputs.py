@@ -4,6 +4,8 @@ import logging
 import ltk
 from pyscript import window # type: ignore
 
+NAME = "Inputs"
+
 search = window.URLSearchParams.new(window.location.search)
 runtime = search.get("runtime") or "mpy"
 logger = logging.getLogger()
@@ -141,7 +143,7 @@ def create():
         )
         .height(708)
         .attr("id", "inputs")
-        .attr("name", "Inputs")
+        .attr("name", NAME)
     )
 
 themes = [
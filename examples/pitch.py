@@ -2,6 +2,8 @@
 
 import ltk
 
+NAME = "Pitch"
+
 script = [ {
         "title": "Intro",
         "duration": 10,
@@ -151,5 +153,5 @@ def create():
                 .css("height", 32)
         )
         .attr("id", "pitch")
-        .attr("name", "Pitch")
+        .attr("name", NAME)
     )
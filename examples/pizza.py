@@ -2,6 +2,8 @@
 
 import ltk
 
+NAME = "Pizza"
+
 class Order(ltk.Model):
     pizza_type: str = "Cheese"
     specialties: str = "None"
@@ -70,6 +72,6 @@ def create():
             ltk.Break(),
             ltk.Text("").attr("id", "summary")
         )
-        .attr("name", "Pizza")
+        .attr("name", NAME)
     )
 
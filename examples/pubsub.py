@@ -4,10 +4,15 @@ import ltk
 import random
 from polyscript import XWorker
 
+NAME = "PubSub"
+
 # Workers only work when server sets CORS, COOP, COEP headers
 # See https://jeff.glass/post/whats-new-pyscript-2023-11-1/ for more details
 worker = XWorker("./examples/worker.py", config="./examples/worker.toml", type="micropython")
 
+# Send all messages published in one tick to the worker as a single frame
+ltk.register_worker("remote_fan", worker, batch=True)
+
 fan = ltk.Preformatted("")
 
 ltk.subscribe(
@@ -49,5 +54,5 @@ def create():
                     .addClass("fan"),
             ),
         )
-        .attr("name", "PubSub")
+        .attr("name", NAME)
     )
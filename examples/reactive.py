@@ -2,6 +2,8 @@
 
 import ltk
 
+NAME = "Reactive"
+
 DELIVERY_OPTIONS = ["1-day", "2-day", "pickup"]
 
 class Product(ltk.Model):
@@ -11,12 +13,11 @@ class Product(ltk.Model):
     warranty: bool = False
     service: bool = True
     delivery: int = 1
-    summary: str = ""
 
-    def changed(self, name, value):
-        if name == "summary":
-            return
-        self.summary = f"""
+    @ltk.computed
+    def summary(self):
+        # Only computed again when one of the fields used here changes.
+        return f"""
             {self.count} * {self.name} =
             ${round(self.count * self.price):,}
             {'including warranty' if self.warranty else ''}
@@ -37,12 +38,15 @@ def increment_count(event):
     product1.count += 10
 
 def order_hammers(event):
-    product2.name = "Hammer"
-    product2.count = 10
-    product2.price = 100.0
-    product2.warranty = True
-    product2.delivery = 2
-    product2.service = False
+    # Update all fields at once, so the form and the summary are only refreshed once.
+    product2.update(
+        name="Hammer",
+        count=10,
+        price=100.0,
+        warranty=True,
+        delivery=2,
+        service=False,
+    )
 
 def create_form(name, product):
     return ltk.VBox(
@@ -109,7 +113,7 @@ def create():
                 .css("padding", 12),
         )
         .attr("id", "reactive")
-        .attr("name", "Reactive")
+        .attr("name", NAME)
     )
 
 def row(label, *widgets):
@@ -2,6 +2,8 @@
 
 import ltk
 
+NAME = "Splits"
+
 def create():
 
     return(
@@ -20,5 +22,5 @@ def create():
         )
         .css("height", 800)
         .css("font-size", 32)
-        .attr("name", "Splits")
+        .attr("name", NAME)
     )
@@ -2,6 +2,8 @@
 
 import ltk
 
+NAME = "Styling"
+
 def create():
 
     def click(event):
@@ -52,7 +54,7 @@ def create():
 
             ltk.Text("").attr("id", "style-msg")
         )
-        .attr("name", "Styling")
+        .attr("name", NAME)
     )
 
     # For this example, we are injecting a new style tag from Python.
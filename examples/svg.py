@@ -2,6 +2,8 @@
 
 import ltk
 
+NAME = "SVG"
+
 def create():
 
     def ellipse_clicked():
@@ -41,5 +43,5 @@ def create():
             """),
             ltk.Heading3("Click the yellow ellipse to change the SVG's background color."),
         )
-        .attr("name", "SVG")
+        .attr("name", NAME)
     )
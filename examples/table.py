@@ -1,7 +1,10 @@
 # LTK - Copyright 2024 - All Rights Reserved - chrislaffra.com - See LICENSE 
 
+import math
 import ltk
 
+NAME = "Tables"
+
 def get_averages():
     return {
         "Afghanistan": 12.6,
@@ -41,6 +44,12 @@ def create():
                 ],
             ),
             ltk.Heading4("Tip: resize the country column using the orange handle."),
+            ltk.create("<h1>DataGrid with 100,000 rows</h1>"),
+            ltk.DataGrid({
+                "Row": range(100000),
+                "Sine": [round(math.sin(n / 100), 4) for n in range(100000)],
+            }).css("height", 300),
+            ltk.Heading4("Tip: click a column title to sort, drag its right edge to resize."),
         )
-        .attr("name", "Tables")
+        .attr("name", NAME)
     )
\ No newline at end of file
@@ -2,6 +2,8 @@
 
 import ltk
 
+NAME = "TicTacToe"
+
 def create():
     @ltk.callback
     def choose(event):
@@ -34,7 +36,7 @@ def create():
             ltk.Label("The CSS:"),
             ltk.TextArea("CSS will be loaded here...").addClass("tictactoe-css"),
         )
-        .attr("name", "TicTacToe")
+        .attr("name", NAME)
     )
 
 ltk.get(
@@ -9,6 +9,6 @@ def handle_message(sender, topic, data):
 
 subscribe = xworker.sync.subscribe
 publish = xworker.sync.publish
-xworker.sync.handler = handle_message
+ltk.receive_frames(xworker.sync, handle_message)
 
 subscribe("Worker-Fan", "message", "remote_fan")
\ No newline at end of file
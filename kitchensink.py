@@ -27,17 +27,24 @@ def getsource(file):
 ltk.find("#progress").remove()
 ltk.find("#title").append(f" took {window.startTime() / 1000:.3f}s to load")
 
-tabs = ltk.Tabs(
-    ltk.HBox(
-        example
+def create_example(file, create):
+    return ltk.HBox(
+        create()
             .addClass("example"),
         ltk.Code("python", getsource(file))
             .attr("file", file)
             .css("margin-left", 20)
             .width("95%")
             .height(800)
-    ).attr("name", example.attr("name"))
-    for file, example in examples.items
+    )
+
+
+tabs = ltk.Tabs(
+    [
+        (name, lambda file=file, create=create: create_example(file, create))
+        for file, name, create in examples.items
+    ],
+    prefetch=True,
 )
 
 @ltk.callback
@@ -60,5 +67,6 @@ ltk.find(window.document.body).append(
 )
 
 def load():
+    ltk.startup.mark("kitchensink ready")
     logger.info("Kitchensink Ready")
 
@@ -2,16 +2,88 @@
 Copyright 2024 - All Rights Reserved - chrislaffra.com - See LICENSE
 
 LTK (Little Toolkit) is a library for building client-side web applications using Python and CSS.
+
+Subsystems that most apps do not need, such as the Logger, Canvas, Tutorial, and Inspector,
+are loaded the first time they are used, for instance with ltk.Logger(). The time spent
+importing each part of LTK is kept in ltk.import_times and shown by ltk.import_report().
+The timeline of the whole startup, including first paint, is recorded by ltk.startup.
 """
 
-from ltk.jquery import *
-from ltk.widgets import *
-from ltk.pubsub import *
-from ltk.logger import *
-
-(
-    ltk.Link("https://github.com/pyscript/ltk", "built with LTK")
-        .addClass("ltk-built-with")
-        .attr("target", "_blank")
-        .appendTo(window.jQuery(window.document.body))
-)
+import logging
+import sys
+
+import pyscript # pylint: disable=import-error
+
+from ltk import startup
+
+startup.mark("interpreter ready")
+
+import_times = {}
+_LAZY_IMPORTS = {
+    "Logger": "ltk.logger",
+    "Canvas": "ltk.canvas",
+    "Step": "ltk.tutorial",
+    "Tutorial": "ltk.tutorial",
+    "Inspector": "ltk.inspector",
+}
+
+
+_phase_start = [startup.milliseconds()]
+
+
+def _phase(name):
+    end = startup.milliseconds()
+    import_times[name] = (end - _phase_start[0]) / 1000
+    startup.record(f"import {name}", _phase_start[0], end)
+    _phase_start[0] = end
+
+
+from ltk.jquery import * # pylint: disable=wrong-import-position
+_phase("ltk.jquery")
+if not pyscript.RUNNING_IN_WORKER:
+    startup._observe() # pylint: disable=protected-access
+from ltk.widgets import * # pylint: disable=wrong-import-position
+_phase("ltk.widgets")
+from ltk.pubsub import * # pylint: disable=wrong-import-position
+_phase("ltk.pubsub")
+
+logging.getLogger('root').setLevel(logging.DEBUG) # set by ltk.logger, before it was loaded lazily
+
+
+def __getattr__(name):
+    if not name in _LAZY_IMPORTS:
+        raise AttributeError(f"module 'ltk' has no attribute '{name}'")
+    module_name = _LAZY_IMPORTS[name]
+    if not module_name in sys.modules:
+        start = startup.milliseconds()
+        attribute = module_name.split(".")[-1]
+        shadowed = globals().get(attribute)
+        __import__(module_name)
+        if shadowed is not None:
+            globals()[attribute] = shadowed # such as ltk.logger, which is not the ltk.logger module
+        end = startup.milliseconds()
+        import_times[module_name] = (end - start) / 1000
+        startup.record(f"import {module_name}", start, end)
+    value = getattr(sys.modules[module_name], name)
+    globals()[name] = value
+    return value
+
+
+def import_report():
+    """ Returns a report of the time spent importing each part of LTK, in milliseconds """
+    lines = [f"{name:16} {seconds * 1000:8.1f}ms" for name, seconds in import_times.items()]
+    lines.append(f"{'total':16} {sum(import_times.values()) * 1000:8.1f}ms")
+    return "\n".join(lines)
+
+
+def _add_built_with():
+    (
+        Link("https://github.com/pyscript/ltk", "built with LTK")
+            .addClass("ltk-built-with")
+            .attr("target", "_blank")
+            .appendTo(window.jQuery(window.document.body))
+    )
+
+if not pyscript.RUNNING_IN_WORKER:
+    schedule(_add_built_with, "ltk-built-with", priority="idle")
+_phase("ltk")
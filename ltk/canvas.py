@@ -0,0 +1,106 @@
+"""
+LTK - Copyright 2024 - All Rights Reserved - chrislaffra.com - See LICENSE
+"""
+
+from ltk.jquery import window
+from ltk.widgets import DEFAULT_CSS
+from ltk.widgets import Widget
+
+
+class Canvas(Widget):
+    """  Wraps an HTML element of type <canvas> """
+    classes = [ "ltk-canvas" ]
+    tag = "canvas"
+
+    def __init__(self, style=None) -> None:
+        self._context = None
+        self._font = None
+        self._fill_style = None
+        self._stroke_style = None
+        Widget.__init__(self, style or DEFAULT_CSS)
+
+    def __getattr__(self, name):
+        try:
+            return getattr(self.element, name)
+        except: # pylint: disable=bare-except
+            try:
+                return getattr(self.context, name)
+            except: # pylint: disable=bare-except
+                error = f"Widget {self} does not have attribute {name}"
+                raise AttributeError(error) # pylint: disable=raise-missing-from
+
+    def __setattr__(self, name, value):
+        if name != "_context" and self._context and hasattr(self._context, name):
+            setattr(self._context, name, value)
+        elif name != "_context" and hasattr(self.element, name):
+            setattr(self.element, name, value)
+        else:
+            super().__setattr__(name, value)
+
+    @property
+    def context(self):
+        """ The context for the canvas """
+        if self._context is None:
+            self._context = self.element[0].getContext("2d")
+        return self._context
+
+    @property
+    def stroke_style(self):
+        """ The stroke style for the canvas """
+        return self._stroke_style
+
+    @stroke_style.setter
+    def stroke_style(self, value):
+        if self._stroke_style != value:
+            self._stroke_style = value
+            self.context.strokeStyle = value
+
+    @property
+    def fill_style(self):
+        """ The fill style for the canvas """
+        return self._fill_style
+
+    @fill_style.setter
+    def fill_style(self, value):
+        if self._fill_style != value:
+            self._fill_style = value
+            self.context.fillStyle = value
+
+    @property
+    def font(self):
+        """ The font for the canvas """
+        return self._font
+
+    @font.setter
+    def font(self, value):
+        if self._font != value:
+            self._font = value
+            self.context.font = value
+
+    def line(self, x1, y1, x2, y2):
+        """ Draws a line on the canvas """
+        window.canvas.line(self.context, x1, y1, x2, y2)
+
+    def text(self, x, y, text): # pylint: disable=arguments-differ
+        """ Draws the outline of a text on the canvas """
+        window.canvas.text(self.context, x, y, text)
+
+    def fill_text(self, x, y, text):
+        """ Fills a text on the canvas """
+        self.context.fillText(text, x, y)
+
+    def rect(self, x, y, w, h):
+        """ Draws a rectangle on the canvas """
+        window.canvas.rect(self.context, x, y, w, h)
+
+    def fill_rect(self, x, y, w, h):
+        """ Fills a rectangle on the canvas """
+        self.context.fillRect(x, y, w, h)
+
+    def circle(self, x, y, radius):
+        """ Draws a circle on the canvas """
+        window.canvas.circle(self.context, x, y, radius)
+
+    def fill_circle(self, x, y, radius):
+        """ Fills a circle on the canvas """
+        window.canvas.fillCircle(self.context, x, y, radius)
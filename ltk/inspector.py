@@ -0,0 +1,99 @@
+"""
+LTK - Copyright 2024 - All Rights Reserved - chrislaffra.com - See LICENSE
+
+The inspector highlights a widget when hovering over it while holding Shift+Ctrl.
+It is loaded the first time a widget is inspected.
+"""
+
+from ltk.jquery import create
+from ltk.jquery import find
+from ltk.jquery import to_js
+from ltk.jquery import window
+from ltk.widgets import _get_caller
+
+INSPECT_IGNORE_ATTRIBUTES = set([
+    "jquery",
+    "element",
+    "length",
+    "DEBUG",
+    "instances",
+    "INSPECT",
+    "highlighted",
+])
+
+
+class Inspector(object):
+    """ Highlights a widget """
+
+    def __init__(self):
+        self.top = create("<div>").addClass("ltk-highlight-top").appendTo("body")
+        self.left = create("<div>").addClass("ltk-highlight-left").appendTo("body")
+        self.bottom = create("<div>").addClass("ltk-highlight-bottom").appendTo("body")
+        self.right = create("<div>").addClass("ltk-highlight-right").appendTo("body")
+        self.details = create("<div>").addClass("ltk-highlight-details").appendTo("body")
+
+    def show(self, widget):
+        """ Show the highlight """
+        top = widget.offset().top
+        left = widget.offset().left
+        width = widget.outerWidth()
+        height = widget.outerHeight()
+        self.top.css(to_js({ "display": "block", "top": top, "left": left, "width": width }))
+        self.left.css(to_js({ "display": "block", "top": top, "left": left, "height": height }))
+        self.bottom.css(to_js({
+            "display": "block", "top": top + height - 2, "left": left, "width": width,
+        }))
+        self.right.css(to_js({
+            "display": "block", "top": top, "left": left + width - 2, "height": height,
+        }))
+        self.details.css("display", "block") \
+            .html(f"""
+                An LTK Python widget of class <tt>{widget.__class__.__name__}</tt><ul>
+                <li>{widget.__class__.__doc__.replace("<", "&lt;")}
+                {self.get_attrs(widget)}
+                {self.get_classes(widget)}
+                <li>id = {widget.attr("id")}
+                <li>{self.get_creation_link(widget)}
+                <li>{widget.children().length} children
+            """)
+        details_left = max(0, left - self.details.outerWidth() + 2) \
+             if left + width > find("body").width() * 3 / 4 else left + width - 2
+        self.details.css(to_js({ "left": details_left, "top": top }))
+
+    def hide(self):
+        """ Hide the highlight """
+        find(".ltk-highlight-top, .ltk-highlight-left, .ltk-highlight-bottom, "
+             ".ltk-highlight-right, .ltk-highlight-details").css("display", "none")
+
+    def get_classes(self, widget):
+        """ Show the classes of a widget """
+        return f"<li>classes = [{', '.join(widget.element[0].classList.toString().split())}]<//li>"
+
+    def get_attrs(self, widget):
+        """ Show the attributes of a widget """
+        result = []
+        for name, value in widget.__dict__.items():
+            if name.startswith("_") or name in INSPECT_IGNORE_ATTRIBUTES:
+                continue
+            value = str(value)
+            if "<bound" in value or "<JsProxy" in value:
+                continue
+            result.append(f"{name} = {value}")
+        return ("<li>" if result else "") + "<li>".join(result)
+
+    def get_creation_link(self, widget):
+        """ Show where the widget was created """
+        caller = widget._caller # pylint: disable=protected-access
+        if caller is None:
+            return "Run with PyOdide to show where this widget was created"
+        home = window.development_location
+        filename = caller.f_code.co_filename.replace("/home/pyodide/", "")
+        lineno = caller.f_lineno
+        abspath = f"{home}/{filename}"
+        url = f"vscode://file:/{abspath}:{lineno}"
+        return f"Created at: <a href={url}>{filename}:{lineno}</a>"
+
+    @classmethod
+    def get_caller(cls):
+        """ Get the first caller that is not in widgets.py """
+        return _get_caller()
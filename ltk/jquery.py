@@ -8,6 +8,9 @@ import time
 
 import pyscript # pylint: disable=import-error
 from pyscript import window # pylint: disable=import-error
+
+from ltk import startup
+
 try:
     import pyodide # pylint: disable=import-error
 except:
@@ -16,9 +19,9 @@ except:
 
 __all__ = [
     "parse_int", "parse_float", "local_storage", "find", "create", "find_list", "to_js",
-    "to_py", "schedule", "repeat", "cancel", "get", "delete", "get_time", "post", "async_proxy",
-    "observe", "proxy", "get_url_parameter", "set_url_parameter", "push_state", "inject_script",
-    "inject_css", "callback", "jQuery",
+    "to_py", "schedule", "repeat", "cancel", "measure", "mutate", "get", "delete", "get_time", "post", "async_proxy",
+    "observe", "proxy", "destroy_proxy", "get_url_parameter", "set_url_parameter", "push_state",
+    "inject_script", "inject_css", "callback", "jQuery",
 ]
 
 
@@ -41,6 +44,17 @@ parse_int = window.parseInt
 parse_float = window.parseFloat
 local_storage = window.localStorage
 timers = {}
+idle_tasks = {}
+measurements = {}
+mutations = {}
+clock = {
+    "timer": None, "due": 0, "timer_proxy": None, "idle": False, "idle_proxy": None,
+    "tick": None, "seconds": 0.0,
+}
+frame = { "count": 0, "phase": None, "requested": False, "proxy": None }
+PRIORITIES = [ "frame", "normal", "idle" ]
+MAX_FRAME_ROUNDS = 8
+IDLE_BUDGET_SECONDS = 0.008
 jQuery = window.jQuery
 
 
@@ -103,6 +117,19 @@ def get_time():
     return window.get_time() / 1000
 
 
+def now():
+    """ Returns a clock in seconds with millisecond precision, to measure short durations. """
+    if MICROPYTHON and hasattr(time, "ticks_ms"):
+        # time.time() has a resolution of one second on MicroPython, and ticks_ms wraps around,
+        # so add up the ticks elapsed since the previous call
+        tick = time.ticks_ms()
+        if clock["tick"] is not None:
+            clock["seconds"] += time.ticks_diff(tick, clock["tick"]) / 1000
+        clock["tick"] = tick
+        return clock["seconds"]
+    return time.time()
+
+
 def find_list(selector, parent=None):
     """ Returns a list of jQuery objects for the given selector. """
     elements = parent.find(selector) if parent else window.jQuery(selector)
@@ -154,42 +181,169 @@ class object_url(): # pylint: disable=invalid-name
         window.URL.revokeObjectURL(self.url)
 
 
-def schedule(python_function, key, timeout_seconds=0):
+def schedule(python_function, key, timeout_seconds=0, priority="normal"):
     """
     Schedules the given Python function to run after the given timeout.
     If a function with the same key is already scheduled, it will be cancelled
     and a new scheduling is performed.
+
+    The priority decides how the function runs once the timeout expires:
+     - "normal": right away, from a timer.
+     - "frame": in the write phase of the next animation frame, see mutate.
+     - "idle": when the browser is idle, in batches that fit the idle deadline.
+
+    All scheduled functions share a single JavaScript timer and a single proxy, no matter
+    how often they are rescheduled. Timeouts are measured with now(), which has millisecond
+    resolution on MicroPython too, so delays shorter than a second are honored there.
     """
     if not python_function:
         raise ValueError(f"schedule: Expecting a function, not {python_function}")
     if not isinstance(key, str):
         raise ValueError(f"schedule: key should be a string, not {type(key)}")
-    if key in timers:
-        window.clearTimeout(timers[key])
-        del timers[key]
-    timers[key] = window.setTimeout(proxy(python_function), int(timeout_seconds * 1000))
+    if not priority in PRIORITIES:
+        raise ValueError(f"schedule: priority should be one of {PRIORITIES}, not {priority}")
+    timers[key] = [now() + timeout_seconds, python_function, None, priority]
+    _arm_timer()
 
 
-def repeat(python_function, key, timeout_seconds=1):
+def repeat(python_function, key, timeout_seconds=1, priority="normal"):
     """
     Schedules the given Python function to run every given timeout in seconds.
     If a function with the same key is already scheduled, it will be cancelled
-    and a new scheduling is performed.
+    and a new scheduling is performed. See schedule for the meaning of priority.
     """
-    if key in timers:
-        window.clearInterval(timers[key])
-        del timers[key]
-    timers[key] = window.setInterval(proxy(python_function), int(timeout_seconds * 1000))
+    if not priority in PRIORITIES:
+        raise ValueError(f"repeat: priority should be one of {PRIORITIES}, not {priority}")
+    timers[key] = [now() + timeout_seconds, python_function, timeout_seconds, priority]
+    _arm_timer()
 
 
 def cancel(key):
     """ Cancels the scheduled function with the given key. """
-    if key in timers:
-        try:
-            window.clearTimeout(timers[key])
-        except: # pylint: disable=bare-except
-            window.clearInterval(timers[key])
-        del timers[key]
+    timers.pop(key, None)
+    idle_tasks.pop(key, None)
+    measurements.pop(key, None)
+    mutations.pop(key, None)
+
+
+def _arm_timer():
+    if not timers:
+        return
+    due = min(task[0] for task in timers.values())
+    if clock["timer"] is not None:
+        if clock["due"] <= due:
+            return
+        window.clearTimeout(clock["timer"])
+    if not clock["timer_proxy"]:
+        clock["timer_proxy"] = proxy(_run_timers)
+    clock["due"] = due
+    clock["timer"] = window.setTimeout(clock["timer_proxy"], max(0, int((due - now()) * 1000)))
+
+
+def _run_timers(*args): # pylint: disable=unused-argument
+    clock["timer"] = None
+    current = now()
+    for key, task in list(timers.items()):
+        when, function, interval, priority = task
+        if when > current + 0.001 or timers.get(key) is not task:
+            continue
+        if interval is not None:
+            task[0] = max(current, when + interval)
+        else:
+            del timers[key]
+        if priority == "frame":
+            mutate(function, key)
+        elif priority == "idle":
+            idle_tasks[key] = function
+            _request_idle()
+        else:
+            _call(function, "scheduled")
+    _arm_timer()
+
+
+def _request_idle():
+    if not clock["idle"]:
+        clock["idle"] = True
+        if not clock["idle_proxy"]:
+            clock["idle_proxy"] = proxy(_run_idle)
+        if hasattr(window, "requestIdleCallback"):
+            window.requestIdleCallback(clock["idle_proxy"])
+        else:
+            window.setTimeout(clock["idle_proxy"], 1)
+
+
+def _run_idle(deadline=None):
+    clock["idle"] = False
+    try:
+        budget = deadline.timeRemaining() / 1000
+    except: # pylint: disable=bare-except
+        budget = IDLE_BUDGET_SECONDS
+    end = now() + budget
+    while idle_tasks:
+        key = next(iter(idle_tasks))
+        _call(idle_tasks.pop(key), "idle")
+        if now() >= end:
+            break
+    if idle_tasks:
+        _request_idle()
+
+
+def _call(function, kind):
+    try:
+        function()
+    except Exception as e: # pylint: disable=broad-except
+        error(f"Error in {kind} function {function}: {e}")
+
+
+def measure(python_function, key=None):
+    """
+    Schedules the given Python function to run in the read phase of the next animation frame.
+    All functions scheduled with measure run before the ones scheduled with mutate, so code
+    that reads the layout of the DOM, such as width() or offset(), does not force a reflow
+    for every read. If a function with the same key is already scheduled, it is replaced.
+    """
+    measurements[python_function if key is None else key] = python_function
+    _request_frame()
+
+
+def mutate(python_function, key=None):
+    """
+    Schedules the given Python function to run in the write phase of the next animation frame.
+    Use this for code that changes the DOM, such as css(). Reads scheduled during the write
+    phase run in another read phase of the same frame.
+    If a function with the same key is already scheduled, it is replaced.
+    """
+    mutations[python_function if key is None else key] = python_function
+    _request_frame()
+
+
+def _request_frame():
+    if not frame["requested"]:
+        frame["requested"] = True
+        if not frame["proxy"]:
+            frame["proxy"] = proxy(_run_frame)
+        window.requestAnimationFrame(frame["proxy"])
+
+
+def _run_frame(*args): # pylint: disable=unused-argument
+    frame["requested"] = False
+    for _ in range(MAX_FRAME_ROUNDS):
+        if not measurements and not mutations:
+            break
+        frame["count"] += 1
+        _run_phase("measure", measurements)
+        _run_phase("mutate", mutations)
+    frame["phase"] = None
+    if measurements or mutations:
+        _request_frame()
+
+
+def _run_phase(phase, queue):
+    frame["phase"] = phase
+    functions = list(queue.values())
+    queue.clear()
+    for function in functions:
+        _call(function, phase)
 
 
 def get(url, handler, kind="json", headers=None):
@@ -308,6 +462,18 @@ def proxy(function):
 window.proxy = proxy
 
 
+def destroy_proxy(function_proxy):
+    """
+    Releases a proxy returned by proxy(), after which JavaScript can no longer call it.
+    On MicroPython, this does nothing.
+    """
+    if PYODIDE and function_proxy:
+        try:
+            function_proxy.destroy()
+        except: # pylint: disable=bare-except
+            pass
+
+
 def get_url_parameter(key):
     """ Returns the current document's URL parameter. """
     return window.URLSearchParams.new(window.document.location.search).get(key)
@@ -368,5 +534,6 @@ def inject_css(file_or_url_or_text, at_end=True):
 _fix_time_on_micropython()
 
 if not pyscript.RUNNING_IN_WORKER:
-    inject_script("ltk/ltk.js", at_end=False)
-    inject_css("ltk/ltk.css", at_end=False)
+    with startup.phase("inject ltk.js and ltk.css"):
+        inject_script("ltk/ltk.js", at_end=False)
+        inject_css("ltk/ltk.css", at_end=False)
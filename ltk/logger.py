@@ -26,6 +26,7 @@ class Logger(ltk.Div):
     }
     levels = dict((value, key) for key, value in icons.items())
     last_width = 0
+    last_trace = 0
 
     def __init__(self):
         self.log_ui = ltk.VBox(ltk.Div().height(28)).attr("id", "ltk-log-ui")
@@ -45,6 +46,8 @@ class Logger(ltk.Div):
         self._setup_console()
         self._setup_py_error()
         self._filter_rows()
+        ltk.pubsub.start_trace()
+        ltk.repeat(self._show_trace, "ltk-logger-trace", 1, priority="idle")
 
     def resize(self):
         """  Resize the log list """
@@ -77,10 +80,17 @@ class Logger(ltk.Div):
         self.last_width = self.element.width()
 
     def _changed(self, element=None): # pylint: disable=unused-argument
-        if self.element.width() != self.last_width:
-            ltk.find(".ltk-log-header").css("width", self.width())
-            ltk.find(".ltk-log-buttons").css("right", 10)
-            self.last_width = self.element.width()
+        ltk.measure(self._measure, f"{self}.changed")
+
+    def _measure(self):
+        width = self.element.width()
+        if width != self.last_width:
+            self.last_width = width
+            ltk.mutate(lambda: self._resize(width), f"{self}.resize")
+
+    def _resize(self, width):
+        ltk.find(".ltk-log-header").css("width", width)
+        ltk.find(".ltk-log-buttons").css("right", 10)
 
     def _set_level(self, selected):
         self.level = self.levels[selected]
@@ -150,15 +160,16 @@ class Logger(ltk.Div):
                 window.console.orig_log(*args)
             self._filter_rows()
             self.animate(ltk.to_js({"opacity": 1}), 1300)
-            self._check_pubsub(message)
             self._check_network(message)
             self._check_events(message)
         except Exception as e: # pylint: disable=broad-except
             print("Log error:", e)
 
-    def _check_pubsub(self, message):
-        if message.startswith("[Pubsub]"):
-            self.sequence_ui.log(*json.loads(message[9:]))
+    def _show_trace(self):
+        """ Show the messages published since the last time in the sequence diagram """
+        for number, sender, receiver, topic, data in ltk.pubsub.get_trace(self.last_trace):
+            self.sequence_ui.log("", sender, receiver, topic, str(data)[:32])
+            self.last_trace = number
 
     def _check_network(self, message):
         if message.startswith("[Network]"):
@@ -260,19 +271,32 @@ class _Call(ltk.Div):
         ltk.schedule(self.set_position, f"{self}.set_position")
 
     def set_position(self):
-        """ Set position for this call """
-        left = min(self.sender.title.position().left, self.receiver.title.position().left)
-        right = max(self.sender.title.position().left, self.receiver.title.position().left)
-        top = self.sender.title.position().top
-        width = self.sender.title.width()
-        height = self.sender.title.height()
-
-        self.css("width", right - left)
-        self.css("left", round(left + width / 2 + 8))
-        self.css("top", round(top + height * 2 + 26 + self.index * 32))
-        self.label.css("opacity", 0).css("width", self.width())
+        """ Set position for this call in the next animation frame """
+        ltk.measure(self._measure, f"{self}.measure")
+
+    def _measure(self):
+        sender = self.sender.title.geometry()
+        receiver = self.receiver.title.geometry()
+        ltk.mutate(
+            lambda: self._set_position(
+                min(sender["left"], receiver["left"]),
+                max(sender["left"], receiver["left"]),
+                sender["top"],
+                sender["width"],
+                sender["height"],
+            ),
+            f"{self}.set_position"
+        )
+
+    def _set_position(self, left, right, top, width, height): # pylint: disable=too-many-arguments
+        self.css({
+            "width": right - left,
+            "left": round(left + width / 2 + 8),
+            "top": round(top + height * 2 + 26 + self.index * 32),
+        })
+        self.label.css({ "opacity": 0, "width": right - left })
         self.label.animate(ltk.to_js({ "opacity": 1 }), 1500)
-        self.dot.set_position()
+        self.dot.set_position(right - left)
 
 
 class _Dot(ltk.Div):
@@ -288,22 +312,25 @@ class _Dot(ltk.Div):
         self.addClass("ltk-arrow ltk-arrow-left" if reverse else "ltk-arrow ltk-arrow-right")
         self.line = line
 
-    def get_start(self):
+    def get_start(self, width=None):
         """ Get start position for this dot"""
-        return self.line.width() - 5 if self.reverse else -5
+        width = self.line.width() if width is None else width
+        return width - 5 if self.reverse else -5
 
-    def get_stop(self):
+    def get_stop(self, width=None):
         """ Get stop position for this dot"""
-        return -5 if self.reverse else self.line.width() - 5
+        width = self.line.width() if width is None else width
+        return -5 if self.reverse else width - 5
 
-    def set_position(self):
+    def set_position(self, width=None):
         """ Set position for this dot"""
-        self.css("left", self.get_start())
+        width = self.line.width() if width is None else width
         if self.animated:
-            self.css("left", self.get_stop())
+            self.css("left", self.get_stop(width))
         else:
+            self.css("left", self.get_start(width))
             self.animated = True
-            self.animate(ltk.to_js({ "left": self.get_stop() }), 1000)
+            self.animate(ltk.to_js({ "left": self.get_stop(width) }), 1000)
 
 
 class _SequenceDiagram(ltk.HBox):
@@ -311,6 +338,7 @@ class _SequenceDiagram(ltk.HBox):
     components = {}
     calls = []
     last_width = 0
+    forced = False
 
     def __init__(self):
         ltk.HBox.__init__(self,
@@ -324,12 +352,21 @@ class _SequenceDiagram(ltk.HBox):
 
     def changed(self, element=None, force=False): # pylint: disable=unused-argument
         """ Called when the element is changed """
-        if force or self.element.width() != self.last_width:
-            ltk.find(".ltk-sequence-header").width(self.width())
-            self.closest("td").width(self.width())
-            self.last_width = self.element.width()
-            for call in self.calls:
-                call.set_position()
+        self.forced = self.forced or force
+        ltk.measure(self._measure, f"{self}.changed")
+
+    def _measure(self):
+        width = self.element.width()
+        if self.forced or width != self.last_width:
+            self.forced = False
+            self.last_width = width
+            ltk.mutate(lambda: self._resize(width), f"{self}.resize")
+
+    def _resize(self, width):
+        ltk.find(".ltk-sequence-header").width(width)
+        self.closest("td").width(width)
+        for call in self.calls:
+            call.set_position()
 
     def log(self, kind, sender_name, receiver_name, topic, data):
         """ Log a message """
@@ -30,6 +30,225 @@
         }
     }
 
+    window.ltkBuild = (html, ops, events, dispatch, ...slots) => {
+        const root = $(html);
+        const elements = {};
+        root.find("[ltk_id]").addBack("[ltk_id]").each(function() {
+            elements[this.getAttribute("ltk_id")] = $(this);
+        });
+        root.find("ltk-slot").each(function() {
+            $(this).replaceWith(slots[this.getAttribute("index")]);
+        });
+        for (const [id, method, args] of JSON.parse(ops)) {
+            elements[id][method](...args);
+        }
+        for (const [id, type] of JSON.parse(events)) {
+            ltkListen(type, id, dispatch, elements[id]);
+        }
+        return root;
+    }
+
+    window.ltkPatch = (root, patch, dispatch, ...slots) => {
+        const { fragments, children, updates, events } = JSON.parse(patch);
+        const elements = {};
+        const lookup = id => {
+            if (!elements[id]) {
+                elements[id] = root.attr("ltk_id") === id ? root : $(root[0].querySelector(`[ltk_id="${id}"]`));
+            }
+            return elements[id];
+        }
+        const built = fragments.map(html => {
+            const fragment = $(html);
+            fragment.find("[ltk_id]").addBack("[ltk_id]").each(function() {
+                elements[this.getAttribute("ltk_id")] = $(this);
+            });
+            fragment.find("ltk-slot").each(function() {
+                $(this).replaceWith(slots[this.getAttribute("index")]);
+            });
+            return fragment;
+        });
+        for (const [parentId, specs] of children) {
+            const parent = lookup(parentId)[0];
+            const nodes = [];
+            for (const spec of specs) {
+                if ("id" in spec) nodes.push(lookup(spec.id)[0]);
+                else if ("fragment" in spec) nodes.push(...built[spec.fragment].get());
+                else if ("slot" in spec) nodes.push(...$(slots[spec.slot]).get());
+                else nodes.push(...$.parseHTML(spec.html));
+            }
+            const kept = new Set(nodes);
+            $(Array.from(parent.childNodes).filter(node => !kept.has(node))).remove();
+            nodes.forEach((node, index) => {
+                if (parent.childNodes[index] !== node) {
+                    parent.insertBefore(node, parent.childNodes[index] || null);
+                }
+            });
+        }
+        for (const [id, method, args] of updates) {
+            lookup(id)[method](...args);
+        }
+        for (const [id, type] of events) {
+            ltkListen(type, id, dispatch, lookup(id));
+        }
+    }
+
+    window.ltkWrite = (writes, ...elements) => {
+        JSON.parse(writes).forEach((write, index) => {
+            for (const method in write) {
+                elements[index][method](write[method]);
+            }
+        });
+    }
+
+    window.ltkGeometry = element => {
+        const position = element.position() || { left: 0, top: 0 };
+        const offset = element.offset() || { left: 0, top: 0 };
+        return JSON.stringify({
+            width: element.width(),
+            height: element.height(),
+            outer_width: element.outerWidth(),
+            outer_height: element.outerHeight(),
+            left: position.left,
+            top: position.top,
+            offset_left: offset.left,
+            offset_top: offset.top,
+            scroll_top: element.scrollTop(),
+            scroll_left: element.scrollLeft(),
+        });
+    }
+
+    window.ltkHeights = (...elements) => {
+        return JSON.stringify(elements.map(element => element.outerHeight()));
+    }
+
+    const startupEvents = [];
+    var startupRecord = null;
+
+    const startupEvent = (name, time) => {
+        startupEvents.push([name, time]);
+        if (startupRecord) startupRecord(name, time);
+    }
+
+    const firstAppend = new MutationObserver(mutations => {
+        for (const mutation of mutations) {
+            for (const node of mutation.addedNodes) {
+                if (node.nodeType === 1 && (node.hasAttribute("ltk_id") || node.querySelector("[ltk_id]"))) {
+                    firstAppend.disconnect();
+                    return startupEvent("first append to body", performance.now());
+                }
+            }
+        }
+    });
+    firstAppend.observe(document.documentElement, { childList: true, subtree: true });
+
+    if (window.PerformanceObserver) {
+        try {
+            new PerformanceObserver(list => {
+                for (const entry of list.getEntries()) {
+                    startupEvent(entry.name, entry.startTime);
+                }
+            }).observe({ type: "paint", buffered: true });
+        } catch(e) {
+            // paint timing is not supported in this browser
+        }
+    }
+
+    window.ltkStartup = record => {
+        startupRecord = record;
+        for (const [name, time] of startupEvents) {
+            record(name, time);
+        }
+    }
+
+    const listeners = {};
+    var removed = [];
+    var removedTimer = null;
+    var onRemove = null;
+
+    const takeRemoved = () => {
+        const ids = removed;
+        removed = [];
+        return JSON.stringify(ids);
+    }
+
+    const release = id => {
+        for (const type in listeners) {
+            listeners[type].delete(id);
+        }
+        removed.push(id);
+        if (onRemove && !removedTimer) {
+            removedTimer = setTimeout(() => {
+                removedTimer = null;
+                if (removed.length) onRemove(takeRemoved());
+            }, 0);
+        }
+    }
+
+    // elements with delegated handlers that are dropped without ever being removed by jQuery
+    const collected = window.FinalizationRegistry ? new FinalizationRegistry(release) : null;
+    const registered = new WeakSet();
+
+    window.ltkListen = (type, id, dispatch, element) => {
+        if (!listeners[type]) {
+            listeners[type] = new Set();
+            $(document).on(type, "[ltk_id]", function(event, ...args) {
+                const id = this.getAttribute("ltk_id");
+                if (listeners[type].has(id)) {
+                    return dispatch(id, type, event, ...args);
+                }
+            });
+        }
+        listeners[type].add(id);
+        const node = element && element[0];
+        if (collected && node && !registered.has(node)) {
+            registered.add(node);
+            collected.register(node, id, node);
+        }
+    }
+
+    const cleanData = $.cleanData;
+    $.cleanData = function(elements) {
+        for (var n = 0; n < elements.length; n++) {
+            const node = elements[n];
+            const id = node.getAttribute && node.getAttribute("ltk_id");
+            if (id) {
+                if (collected && registered.has(node)) {
+                    collected.unregister(node);
+                    registered.delete(node);
+                }
+                release(id);
+            }
+        }
+        return cleanData.apply(this, arguments);
+    }
+
+    window.ltkOnRemove = callback => {
+        onRemove = callback;
+    }
+
+    window.ltkRemove = element => {
+        element.remove();
+        return takeRemoved();
+    }
+
+    window.ltkInspect = (show, hide) => {
+        var showing = false;
+        $(document).on("mousemove", event => {
+            if (event.shiftKey && event.ctrlKey) {
+                const element = $(event.target).closest("[ltk_id]");
+                if (element.length) {
+                    showing = true;
+                    show(element);
+                }
+            } else if (showing) {
+                showing = false;
+                hide();
+            }
+        });
+    }
+
+    $(document).on("wheel", ".ltk-input", () => {}); // ensure Chrome handles wheel events
+
     window.table = () => {
         return $("<table>").addClass("ltk-table");
     }
@@ -49,30 +268,99 @@
         header.find(".ltk-table-title").eq(column).text(title)
     }
 
-    window.tableCell = (table, column, row) => {
-        for (var n=table.find(".ltk-table-row").length; n<=row; n++) {
-            $("<tr>")
-                .addClass("ltk-table-row")
-                .addClass(`ltk-row-${n}`)
-                .appendTo(table);
+    const tableRowsChanged = records => {
+        // changes inside a cell, such as setting its text, keep the index valid
+        return records.some(record => !(record.target.closest && record.target.closest("td, th")));
+    }
+
+    const tableIndex = table => {
+        const element = table[0];
+        if (!element.ltkIndex) {
+            const observer = new MutationObserver(records => {
+                if (tableRowsChanged(records)) element.ltkIndex.stale = true;
+            });
+            observer.observe(element, { childList: true, subtree: true });
+            element.ltkIndex = { observer, stale: true, rows: [], cells: [] };
+        }
+        const index = element.ltkIndex;
+        if (index.stale || tableRowsChanged(index.observer.takeRecords())) {
+            index.rows = table.find(".ltk-table-row").get();
+            index.cells = index.rows.map(row => $(row).find(".ltk-table-cell").get());
+            index.stale = false;
+        }
+        return index;
+    }
+
+    const tableCellElement = (table, column, row) => {
+        const index = tableIndex(table);
+        var added = false;
+        for (var n=index.rows.length; n<=row; n++) {
+            const rowElement = document.createElement("tr");
+            rowElement.className = `ltk-table-row ltk-row-${n}`;
+            const container = n ? index.rows[n - 1].parentNode : table[0]; // the table or its tbody
+            container.appendChild(rowElement);
+            index.rows.push(rowElement);
+            index.cells.push([]);
+            added = true;
         }
-        const rowElement = table.find(".ltk-table-row").eq(row)
-        for (var n=rowElement.find(".ltk-table-cell").length; n<=column; n++) {
-            $("<td>")
-                .addClass("ltk-table-cell")
-                .addClass(`ltk-row-${row}`)
-                .addClass(`ltk-col-${n}`)
-                .appendTo(rowElement);
+        const cells = index.cells[row];
+        for (var n=cells.length; n<=column; n++) {
+            const cell = document.createElement("td");
+            cell.className = `ltk-table-cell ltk-row-${row} ltk-col-${n}`;
+            index.rows[row].appendChild(cell);
+            cells.push(cell);
+            added = true;
         }
-        return rowElement.find(".ltk-table-cell").eq(column)
+        if (added) index.observer.takeRecords(); // the index already has the rows and cells we added
+        return cells[column];
+    }
+
+    window.tableCell = (table, column, row) => {
+        return $(tableCellElement(table, column, row))
     }
 
     window.tableGet = (table, column, row) => {
-        return tableCell(table, column, row).text()
+        return tableCellElement(table, column, row).textContent
     }
 
     window.tableSet = (table, column, row, value) => {
-        tableCell(table, column, row).text(value)
+        tableCellElement(table, column, row).textContent = value
+    }
+
+    window.tableSetRange = (table, row, column, values) => {
+        JSON.parse(values).forEach((rowValues, rowOffset) => {
+            rowValues.forEach((value, columnOffset) => {
+                tableCellElement(table, column + columnOffset, row + rowOffset).textContent = value
+            });
+        });
+    }
+
+    window.ltkGrid = (body, update) => {
+        const { rows, columns, values, row_height, height, width } = JSON.parse(update);
+        const element = body[0];
+        const count = rows.length * columns.length;
+        while (element.children.length < count) {
+            const cell = document.createElement("div");
+            cell.className = "ltk-datagrid-cell";
+            element.appendChild(cell);
+        }
+        while (element.children.length > count) {
+            element.lastChild.remove();
+        }
+        var n = 0;
+        rows.forEach((top, row) => {
+            columns.forEach(([left, cellWidth], column) => {
+                const cell = element.children[n++];
+                cell.style.transform = `translate(${left}px, ${top}px)`;
+                cell.style.width = `${cellWidth}px`;
+                cell.style.height = `${row_height}px`;
+                if (cell.textContent !== values[row][column]) {
+                    cell.textContent = values[row][column];
+                }
+            });
+        });
+        element.style.height = `${height}px`;
+        element.style.width = `${width}px`;
     }
 
     window.ltk_get = (url, success, dataType, error, headers) => {
@@ -10,17 +10,20 @@ This allows its use in Workers, which may not want to include any UIs.
  - A receiver registers for events using `subscribe`.
  - A sender broadcasts events using `publish`.
  - Communication between the main UI and workers is done using the `xworker.sync`.
+ - Workers registered with `batch=True` receive all messages published in one tick as a
+   single frame, see `register_worker` and `receive_frames`.
 
 See https://github.com/pyscript/polyscript/tree/main/docs#xworker
 """
 
 import json
 import logging
+import sys
 
 __all__ = [
     "TOPIC_CRITICAL", "TOPIC_INFO", "TOPIC_DEBUG", "TOPIC_ERROR", "TOPIC_WARNING", "TOPIC_CRITICAL",
     "TOPIC_REQUEST", "TOPIC_RESPONSE", "TOPIC_WORKER_RUN", "TOPIC_WORKER_RESULT",
-    "publish", "subscribe", "register_worker"
+    "publish", "subscribe", "unsubscribe", "register_worker", "receive_frames"
 ]
 
 TOPIC_INFO = "log.info"
@@ -35,34 +38,236 @@ TOPIC_WORKER_RUN = "worker.run"
 TOPIC_WORKER_RESULT = "worker.result"
 TOPIC_WORKER_READY = "worker.ready"
 
+MAX_CACHED_TOPICS = 1024
+
 
 _logger = logging.getLogger('root')
-_log_topics = {
-    "log.info": _logger.info,
-    "log.debug": _logger.debug,
-    "log.error": _logger.error,
-    "log.warning": _logger.warning,
-    "log.critical": _logger.critical,
+_log_levels = {
+    "log.info": logging.INFO,
+    "log.debug": logging.DEBUG,
+    "log.error": logging.ERROR,
+    "log.warning": logging.WARNING,
+    "log.critical": logging.CRITICAL,
 }
 
 
+def _is_logged(level):
+    """ Returns whether a message at the level would be handled, before building it """
+    if not _logger.isEnabledFor(level):
+        return False
+    handlers = _logger.handlers
+    if not handlers:
+        return level >= logging.WARNING # only the last resort handler would show it
+    return any(handler.level <= level for handler in handlers)
+
+
+def _defer(function, key):
+    """ Call the function in the next tick using the LTK scheduler, or right away without LTK """
+    jquery = sys.modules.get("ltk.jquery")
+    if jquery:
+        jquery.schedule(function, key)
+    else:
+        function()
+
+
+class _Trace():
+    """ A ring buffer with the most recently published messages """
+    __slots__ = ("records", "size", "count")
+
+    def __init__(self, size):
+        self.records = [None] * size
+        self.size = size
+        self.count = 0
+
+    def add(self, sender, receiver, topic, data):
+        self.records[self.count % self.size] = (self.count + 1, sender, receiver, topic, data)
+        self.count += 1
+
+    def since(self, number):
+        records = (self.records[n % self.size] for n in range(max(number, self.count - self.size), self.count))
+        return [record for record in records if record] # a resized buffer can have gaps
+
+    def resize(self, size):
+        recent = self.since(0)[-size:]
+        self.records = [None] * size
+        self.size = size
+        for record in recent:
+            self.records[(record[0] - 1) % size] = record
+
+
+class _Subscription():
+    __slots__ = ("receiver", "topic", "handler", "order")
+
+    def __init__(self, receiver, topic, handler, order):
+        self.receiver = receiver
+        self.topic = topic
+        self.handler = handler
+        self.order = order
+
+
+class _TopicNode():
+    """ A node in the trie of wildcard subscriptions, with one level for each part of a topic """
+    __slots__ = ("children", "subscriptions")
+
+    def __init__(self):
+        self.children = {}
+        self.subscriptions = []
+
+    def match(self, parts, index, found):
+        """ Add the subscriptions that match the parts of a topic, starting at index, to found """
+        everything = self.children.get("#")
+        if everything:
+            found.extend(everything.subscriptions) # "#" matches any number of remaining parts
+        if index == len(parts):
+            found.extend(self.subscriptions)
+            return
+        part = parts[index]
+        for key in (part,) if part == "*" else (part, "*"):
+            child = self.children.get(key)
+            if child:
+                child.match(parts, index + 1, found)
+
+
 class _PubSub():
+    """
+    Delivers published data to the subscribers of a topic.
+
+    Topics consist of parts separated by dots, such as "log.info". Subscriptions can use
+    wildcards, with "*" matching exactly one part, as in "log.*", and "#" matching any number
+    of remaining parts, as in "worker.#". Subscriptions to exact topics are found in a dict,
+    and wildcard subscriptions in a trie. The subscriptions that match a published topic are
+    cached until the next subscribe or unsubscribe, so publishing costs the same no matter
+    how many subscriptions there are. The cache is emptied when it holds MAX_CACHED_TOPICS
+    topics, so apps that publish to ever new topics do not grow it without bound.
+    """
     def __init__(self):
-        self.subscribers = []
+        self.topics = {}
+        self.wildcards = _TopicNode()
+        self.matches = {}
         self.workers = {}
-   
+        self.batched = {}
+        self.outbound = {}
+        self.count = 0
+        self.trace = None
+        self.sample_rate = 1.0
+        self.sampled = 0.0
+
+    def _match(self, topic):
+        found = list(self.topics.get(topic, []))
+        self.wildcards.match(topic.split("."), 0, found)
+        found.sort(key=lambda subscription: subscription.order)
+        if len(self.matches) >= MAX_CACHED_TOPICS:
+            self.matches.clear()
+        self.matches[topic] = found
+        return found
+
     def publish(self, sender, receiver, topic, data):
-        for subscriber, subscribed_topic, handler in self.subscribers:
-            if topic == subscribed_topic:
-                if isinstance(handler, str):
-                    self.workers[handler].sync.handler(sender, topic, json.dumps(data))
-                else:
-                    handler(data)
-            log = _log_topics.get(topic, _logger.info)
-            log(f"[Pubsub] {json.dumps(['', sender, receiver, topic, str(data)[:32]])}")
+        """ Deliver the data to all handlers subscribed to the topic """
+        subscriptions = self.matches.get(topic)
+        if subscriptions is None:
+            subscriptions = self._match(topic)
+        for subscription in subscriptions:
+            handler = subscription.handler
+            if isinstance(handler, str):
+                self._send(handler, sender, topic, data)
+            else:
+                handler(data)
+        if self.trace is not None:
+            self._trace(sender, receiver, topic, data)
+        level = _log_levels.get(topic, logging.INFO)
+        if _is_logged(level):
+            _logger.log(level, f"[Pubsub] {json.dumps(['', sender, receiver, topic, str(data)[:32]])}")
+
+    def _trace(self, sender, receiver, topic, data):
+        """ Add the message to the trace, if it is in the sampled fraction """
+        if self.sample_rate < 1:
+            self.sampled += self.sample_rate
+            if self.sampled < 1:
+                return
+            self.sampled -= 1
+        self.trace.add(sender, receiver, topic, data)
+
+    def start_trace(self, size=256, sample_rate=1.0):
+        """
+        Keep the most recent published messages in a ring buffer of the given size, to be
+        read with get_trace. Only the given fraction of messages is traced. Logging is not
+        sampled: every message is still logged when its level is enabled.
+        Calling it again keeps the messages traced so far, so readers can continue with
+        get_trace from the last number they saw.
+        """
+        if self.trace is None:
+            self.trace = _Trace(size)
+        elif self.trace.size != size:
+            self.trace.resize(size)
+        self.sample_rate = sample_rate
+
+    def get_trace(self, since=0):
+        """
+        Returns the traced messages after the message with the given number, as tuples of
+        (number, sender, receiver, topic, data). Older messages may have been overwritten.
+        """
+        return self.trace.since(since) if self.trace else []
 
     def subscribe(self, receiver, topic, handler):
-        self.subscribers.append([receiver, topic, handler])
+        """
+        Subscribe the handler to the topic. The handler is called with the data of each
+        publish, or is the name of a worker to send the data to.
+        """
+        self.count += 1
+        subscription = _Subscription(receiver, topic, handler, self.count)
+        if "*" in topic or "#" in topic:
+            node = self.wildcards
+            for part in topic.split("."):
+                node = node.children.setdefault(part, _TopicNode())
+            node.subscriptions.append(subscription)
+        else:
+            self.topics.setdefault(topic, []).append(subscription)
+        self.matches.clear()
+
+    def unsubscribe(self, receiver, topic=None, handler=None):
+        """ Remove the subscriptions of the receiver, optionally only those for the topic or handler """
+        def keep(subscription):
+            return not (
+                subscription.receiver == receiver and
+                (topic is None or subscription.topic == topic) and
+                (handler is None or subscription.handler == handler)
+            )
+
+        for name in list(self.topics):
+            self.topics[name] = [subscription for subscription in self.topics[name] if keep(subscription)]
+            if not self.topics[name]:
+                del self.topics[name]
+        nodes = [self.wildcards]
+        while nodes:
+            node = nodes.pop()
+            node.subscriptions = [subscription for subscription in node.subscriptions if keep(subscription)]
+            nodes.extend(node.children.values())
+        self.matches.clear()
+
+    def _send(self, name, sender, topic, data):
+        conflate = self.batched.get(name)
+        if conflate is None:
+            self.workers[name].sync.handler(sender, topic, json.dumps(data))
+            return
+        first = not self.outbound
+        queue = self.outbound.get(name)
+        if queue is None:
+            queue = self.outbound[name] = {} if conflate else []
+        if conflate:
+            queue.pop(topic, None) # keep only the latest value for each topic
+            queue[topic] = [sender, topic, data]
+        else:
+            queue.append([sender, topic, data])
+        if first:
+            _defer(self.flush, f"ltk-pubsub-flush-{id(self)}")
+
+    def flush(self):
+        """ Send the messages queued for each batched worker as a single frame """
+        outbound = self.outbound
+        self.outbound = {}
+        for name, queue in outbound.items():
+            messages = list(queue.values()) if isinstance(queue, dict) else queue
+            self.workers[name].sync.handle_frame(json.dumps(messages))
 
     def worker_publish(self, sender, receiver, topic, data):
         try:
@@ -71,14 +276,50 @@ class _PubSub():
             pass
         self.publish(sender, receiver, topic, data)
 
-    def register_worker(self, name, worker):
+    def worker_publish_frame(self, frame):
+        """ Publish the messages a worker packed into one frame, as [sender, receiver, topic, data] lists """
+        for sender, receiver, topic, data in json.loads(frame):
+            self.publish(sender, receiver, topic, data)
+
+    def register_worker(self, name, worker, batch=False, conflate=False):
+        """
+        Register a worker, so it can subscribe to topics and publish messages.
+
+        Args:
+            name:str: The name the worker uses as the handler when it subscribes.
+            worker: The XWorker.
+            batch:bool: Whether to send all messages published for the worker in one tick
+                as a single frame, which the worker receives using receive_frames.
+            conflate:bool: Whether a batch only keeps the latest message for each topic.
+        """
         self.workers[name] = worker
+        if batch:
+            self.batched[name] = conflate
         worker.sync.subscribe = self.subscribe
         worker.sync.publish = self.worker_publish
+        worker.sync.publish_frame = self.worker_publish_frame
+
+
+def receive_frames(sync, handler):
+    """
+    Call this in a worker registered with batch=True, to have the handler called with
+    (sender, topic, data) for each message in the frames sent by the main thread.
+
+    Example:
+        ltk.receive_frames(xworker.sync, handle_message)
+    """
+    def handle_frame(frame):
+        for sender, topic, data in json.loads(frame):
+            handler(sender, topic, data)
+    sync.handler = lambda sender, topic, data: handler(sender, topic, json.loads(data))
+    sync.handle_frame = handle_frame
 
 
 _pubsub = _PubSub()
 
+start_trace = _pubsub.start_trace
+get_trace = _pubsub.get_trace
 subscribe = _pubsub.subscribe
+unsubscribe = _pubsub.unsubscribe
 publish = _pubsub.publish
-register_worker = _pubsub.register_worker
\ No newline at end of file
+register_worker = _pubsub.register_worker
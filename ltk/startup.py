@@ -0,0 +1,115 @@
+"""
+LTK - Copyright 2024 - All Rights Reserved - chrislaffra.com - See LICENSE
+
+A timeline of the startup of an LTK app, to find out where a cold start spends its time.
+
+LTK records when the interpreter is ready, how long its own import and the injection of
+its JavaScript and CSS take, when the first widget is created, when the first widget is
+added to the page, when the browser first paints, and how long each lazily created tab
+takes to construct. Apps add their own phases:
+
+    with ltk.startup.phase("load data"):
+        data = load_data()
+    ltk.startup.mark("app ready")
+
+Times are in milliseconds since the page started loading, like performance.now().
+The timeline is available as a dict from ltk.startup.report() and can be saved with
+ltk.startup.download() as a Chrome trace, to be opened in chrome://tracing or Perfetto.
+"""
+
+import json
+import time
+
+from pyscript import window # pylint: disable=import-error
+
+__all__ = [
+    "milliseconds", "record", "mark", "phase", "report", "chrome_trace", "download"
+]
+
+events = []
+
+
+def _clock():
+    return time.ticks_ms() if hasattr(time, "ticks_ms") else time.time() * 1000
+
+
+_origin = float(window.performance.now()) - _clock() # avoid a call into JavaScript for each event
+
+
+def milliseconds():
+    """ Returns the time in milliseconds since the page started loading """
+    return _origin + _clock()
+
+
+def record(name, start, end):
+    """ Records a phase that started and ended at the given times, in milliseconds """
+    events.append({ "name": name, "start": start, "duration": end - start })
+
+
+def mark(name, at=None):
+    """ Records that something happened now, or at the given time in milliseconds """
+    if at is None:
+        at = milliseconds()
+    record(name, at, at)
+
+
+class phase(): # pylint: disable=invalid-name
+    """
+    Records how long the code inside the `with` block takes.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = milliseconds()
+        return self
+
+    def __exit__(self, *args):
+        record(self.name, self.start, milliseconds())
+
+
+def report():
+    """
+    Returns the startup timeline as a dict, with the events sorted by start time.
+    Each event has a name, a start time, and a duration in milliseconds. Events
+    that mark a moment in time have a duration of zero.
+    """
+    timeline = sorted(events, key=lambda event: event["start"])
+    return {
+        "events": timeline,
+        "total": max([event["start"] + event["duration"] for event in timeline] or [0]),
+    }
+
+
+def chrome_trace():
+    """ Returns the startup timeline as JSON in the Chrome trace event format """
+    trace = []
+    for event in report()["events"]:
+        entry = {
+            "name": event["name"],
+            "cat": "ltk",
+            "ph": "X" if event["duration"] else "i",
+            "ts": round(event["start"] * 1000),
+            "pid": 1,
+            "tid": 1,
+        }
+        if event["duration"]:
+            entry["dur"] = round(event["duration"] * 1000)
+        else:
+            entry["s"] = "g"
+        trace.append(entry)
+    return json.dumps({ "traceEvents": trace, "displayTimeUnit": "ms" })
+
+
+def download(filename="ltk-startup.json"):
+    """ Saves the startup timeline as a Chrome trace file """
+    from ltk.jquery import create, object_url # pylint: disable=import-outside-toplevel
+    with object_url(chrome_trace(), "application/json") as url:
+        create("<a>").attr("href", url).attr("download", filename)[0].click()
+
+
+def _observe():
+    """ Records the first time a widget is added to the page and the first paints """
+    from ltk.jquery import proxy # pylint: disable=import-outside-toplevel
+    window.ltkStartup(proxy(lambda name, at: mark(name, float(at))))
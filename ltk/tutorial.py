@@ -0,0 +1,109 @@
+"""
+LTK - Copyright 2024 - All Rights Reserved - chrislaffra.com - See LICENSE
+
+Tutorials that guide the user through the UI, one step at a time.
+"""
+
+from ltk.jquery import find
+from ltk.jquery import proxy
+from ltk.jquery import schedule
+from ltk.jquery import to_js
+from ltk.jquery import window
+from ltk.widgets import Div
+from ltk.widgets import HBox
+from ltk.widgets import Text
+
+
+class Step(Div):
+    """ Represents a step in a tutorial """
+    classes = [ "ltk-step" ]
+
+    def __init__(self, widget, buttons, content):
+        Div.__init__(self, buttons, content)
+        self.content = content
+        self.widget = widget
+        self.draggable()
+        self.draggable("option", "drag", self._proxy(lambda *args: (
+            schedule(self.show_arrow, "ltk-step-draw-arrow")
+        )))
+        self.on("mouseenter", lambda event: self.show_arrow())
+
+    def show(self):
+        """ Shows the tutorial step """
+        if not getattr(self.widget, "is")(":visible"):
+            return
+        find(".ltk-step").remove()
+        self.appendTo(find("body"))
+        self.css(to_js({
+            "visibility": "visible",
+            "position": "absolute",
+            "opacity": 1,
+            "left": self.widget.offset().left + self.widget.outerWidth() + 100,
+            "top": self.widget.offset().top,
+            "width": "fit-content",
+        }))
+        self.show_arrow()
+
+    def show_arrow(self):
+        """ Shows the arrow to indicate which widget the step is for """
+        find(".leader-line").remove()
+        source = self.element
+        target = self.widget.element if hasattr(self.widget, "element") else self.widget
+        schedule(lambda: window.addArrow(source, target), "ltk-step-show-arrow")
+
+    def hide(self):
+        """ Hides the tutorial step """
+        self.remove()
+
+
+class Tutorial():
+    """ Creates a tutorial """
+    tag = None
+
+    def __init__(self, steps):
+        self.steps = steps
+        self.index = 0
+        self.steps = steps
+
+    def run(self):
+        """ Runs the tutorial """
+        self.index = 0
+        self.show()
+
+    def close(self):
+        """ Closes the tutorial """
+        find(".leader-line, .ltk-step").remove()
+
+    def previous(self):
+        """ Goes to the previous step """
+        self.close()
+        if self.index > 0:
+            self.index -= 1
+            self.show()
+
+    def next(self):
+        """ Goes to the next step """
+        self.close()
+        if self.index < len(self.steps):
+            self.index += 1
+            self.show()
+
+    def event(self, index):
+        """ Handles the event for the current step """
+        if index == self.index:
+            self.next()
+
+    def show(self):
+        """ Shows the current step """
+        if self.index < 0 or self.index >= len(self.steps):
+            return
+        selector, event, content = self.steps[self.index]
+        buttons = HBox(
+            Text("⟸").on("click", lambda *args: self.previous()),
+            Text("⟹").on("click", lambda *args: self.next()),
+            Text("x").on("click", lambda *args: self.close()),
+        ).addClass("ltk-step-buttons")
+        widget = find(selector)
+        Step(widget, buttons, content).show()
+        index = self.index
+        widget.on(event, proxy(lambda *args: self.event(index)))
@@ -8,13 +8,29 @@ import json
 import logging
 import math
 import inspect
+import sys
+from array import array
 
+try:
+    import weakref
+except ImportError:
+    weakref = None # MicroPython
+
+import pyscript # pylint: disable=import-error
+
+from ltk import startup
 from ltk.jquery import callback
 from ltk.jquery import create
+from ltk.jquery import destroy_proxy
+from ltk.jquery import dumps
 from ltk.jquery import find
+from ltk.jquery import frame
 from ltk.jquery import get_time
 from ltk.jquery import inject_css
 from ltk.jquery import inject_script
+from ltk.jquery import measure
+from ltk.jquery import mutate
+from ltk.jquery import now
 from ltk.jquery import object_url
 from ltk.jquery import proxy
 from ltk.jquery import schedule
@@ -23,117 +39,240 @@ from ltk.jquery import window
 
 BROWSER_SHORTCUTS = [ "Cmd+N","Cmd+T","Cmd+W", "Cmd+Q" ]
 DEFAULT_CSS = {}
+STREAM_BUDGET_SECONDS = 0.008
+STORE_DELAY_SECONDS = 0.5
+MAX_STORE_DELAY_SECONDS = 5
+MAX_ITEM_EVENTS = 100
+MAX_BATCH_ROUNDS = 100
+IMMUTABLE_TYPES = (str, int, float, bool, tuple, type(None))
 shortcuts = {}
 timers = {}
-INSPECT_IGNORE_ATTRIBUTES = set([
-    "jquery",
-    "element",
-    "length",
-    "DEBUG",
-    "instances",
-    "INSPECT",
-    "highlighted",
-])
-
+_unsaved = {}
+_manifests = {}
+_dirty_manifests = set()
+_schemas = {}
+_reads = [] # the attributes read by each computed attribute that is running
+listening = { "click": False, "keydown": False, "pagehide": False }
+_unsaved_since = { "time": None }
 logger = logging.getLogger("root")
     
-class Inspector(object):
-    """ Highlights a widget """
+_WIDGET_MODULES = ("ltk/widgets.py", "ltk/canvas.py", "ltk/inspector.py", "ltk/tutorial.py")
+_MOVED_WIDGETS = {
+    "Canvas": "ltk.canvas",
+    "Step": "ltk.tutorial",
+    "Tutorial": "ltk.tutorial",
+    "Inspector": "ltk.inspector",
+}
+
+
+def __getattr__(name):
+    """ Loads the widgets that moved to their own module, for code that imports them from here """
+    if not name in _MOVED_WIDGETS:
+        raise AttributeError(f"module 'ltk.widgets' has no attribute '{name}'")
+    __import__(_MOVED_WIDGETS[name])
+    return getattr(sys.modules[_MOVED_WIDGETS[name]], name)
+
+
+def _get_caller():
+    """ Get the first caller that is not in one of the LTK modules that define widgets """
+    caller = inspect.currentframe()
+    while caller:
+        if not any(module in caller.f_code.co_filename for module in _WIDGET_MODULES):
+            return caller
+        caller = caller.f_back
+
+
+def _get_inspector():
+    """ Create the Inspector the first time a widget is inspected """
+    if Widget._inspector is None: # pylint: disable=protected-access
+        from ltk.inspector import Inspector # pylint: disable=import-outside-toplevel
+        Widget._inspector = Inspector() # pylint: disable=protected-access
+    return Widget._inspector # pylint: disable=protected-access
+
+
+widgets = weakref.WeakValueDictionary() if weakref else {}
+window.getWidget = proxy(lambda element: widgets.get(element.attr("ltk_id")))
+
+VOID_TAGS = set([
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source",
+    "track", "wbr",
+])
+DELEGATED_EVENTS = set([
+    "click", "dblclick", "contextmenu", "mousedown", "mouseup", "mouseover", "mouseout",
+    "mousemove", "pointerdown", "pointerup", "pointermove", "touchstart", "touchend",
+    "keydown", "keyup", "keypress", "input", "change", "focusin", "focusout", "wheel",
+])
+event_handlers = {}
 
-    def __init__(self):
-        self.top = create("<div>").addClass("ltk-highlight-top").appendTo("body")
-        self.left = create("<div>").addClass("ltk-highlight-left").appendTo("body")
-        self.bottom = create("<div>").addClass("ltk-highlight-bottom").appendTo("body")
-        self.right = create("<div>").addClass("ltk-highlight-right").appendTo("body")
-        self.details = create("<div>").addClass("ltk-highlight-details").appendTo("body")
-
-    def show(self, widget):
-        """ Show the highlight """
-        top = widget.offset().top
-        left = widget.offset().left
-        width = widget.outerWidth()
-        height = widget.outerHeight()
-        self.top.css("display", "block").css("top", top).css("left", left).width(width)
-        self.left.css("display", "block").css("left", left).css("top", top).height(height)
-        self.bottom.css("display", "block").css("top", top + height - 2).css("left", left) \
-            .width(width)
-        self.right.css("display", "block").css("left", left + width - 2).css("top", top) \
-            .height(height)
-        self.details.css("display", "block") \
-            .html(f"""
-                An LTK Python widget of class <tt>{widget.__class__.__name__}</tt><ul>
-                <li>{widget.__class__.__doc__.replace("<", "&lt;")}
-                {self.get_attrs(widget)}
-                {self.get_classes(widget)}
-                <li>id = {widget.attr("id")}
-                <li>{self.get_creation_link(widget)}
-                <li>{widget.children().length} children
-            """)
-        details_left = max(0, left - self.details.outerWidth() + 2) \
-             if left + width > find("body").width() * 3 / 4 else left + width - 2
-        self.details.css("left", details_left).css("top", top)
-
-    def hide(self):
-        """ Hide the highlight """
-        self.top.css("display", "none")
-        self.left.css("display", "none")
-        self.bottom.css("display", "none")
-        self.right.css("display", "none")
-        self.details.css("display", "none")
-
-    def get_classes(self, widget):
-        """ Show the classes of a widget """
-        return f"<li>classes = [{', '.join(widget.element[0].classList.toString().split())}]<//li>"
-
-    def get_attrs(self, widget):
-        """ Show the attributes of a widget """
-        result = []
-        for name, value in widget.__dict__.items():
-            if name.startswith("_") or name in INSPECT_IGNORE_ATTRIBUTES:
-                continue
-            value = str(value)
-            if "<bound" in value or "<JsProxy" in value:
-                continue
-            result.append(f"{name} = {value}")
-        return ("<li>" if result else "") + "<li>".join(result)
-
-    def get_creation_link(self, widget):
-        """ Show where the widget was created """
-        caller = widget._caller # pylint: disable=protected-access
-        if caller is None:
-            return "Run with PyOdide to show where this widget was created"
-        home = window.development_location
-        filename = caller.f_code.co_filename.replace("/home/pyodide/", "")
-        lineno = caller.f_lineno
-        abspath = f"{home}/{filename}"
-        url = f"vscode://file:/{abspath}:{lineno}"
-        return f"Created at: <a href={url}>{filename}:{lineno}</a>"
 
-    @classmethod
-    def get_caller(cls):
-        """ Get the first caller that is not in widgets.py """
-        frame = inspect.currentframe()
-        while frame:
-            if not "ltk/widgets.py" in frame.f_code.co_filename:
-                return frame
-            frame = frame.f_back
+def _escape(text):
+    return str(text).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
 
+def _dispatch_event(ltk_id, event_type, *args):
+    """ Called by the document-level listener in ltk.js for a widget that has handlers """
+    result = None
+    for handler in event_handlers.get(ltk_id, {}).get(event_type, []):
+        result = handler(*args)
+    return result
+
+_dispatch_proxy = proxy(_dispatch_event)
+
+
+def _release_widgets(ltk_ids):
+    """ Called by ltk.js with the ids of elements that were removed using jQuery or garbage collected """
+    for ltk_id in json.loads(ltk_ids):
+        event_handlers.pop(ltk_id, None)
+        widget = widgets.get(ltk_id)
+        if widget:
+            widget._release() # pylint: disable=protected-access
+
+if not pyscript.RUNNING_IN_WORKER:
+    window.ltkOnRemove(proxy(_release_widgets))
+
+
+class deferred(): # pylint: disable=invalid-name
+    """
+    Defers DOM creation for all widgets constructed inside a `with ltk.deferred():` block.
+
+    Calls such as css, attr, addClass, text, html and append are recorded in Python, and
+    so are delegated handlers, see Widget.on. With `ltk.deferred(delegate=True)`, handlers
+    registered in the block are delegated unless on is called with delegate=False.
+    The first time the element of a deferred widget is needed, for instance when it is
+    appended to the document, its entire widget tree is created with a single call into
+    JavaScript, instead of a handful of jQuery calls per widget.
+    """
+    depth = 0
+    delegating = 0
+
+    def __init__(self, delegate=False):
+        self.delegate = delegate
+
+    def __enter__(self):
+        deferred.depth += 1
+        deferred.delegating += 1 if self.delegate else 0
+        return self
 
-widgets = {}
-window.getWidget = proxy(lambda element: widgets[element.attr("ltk_id")])
+    def __exit__(self, *args):
+        deferred.depth -= 1
+        deferred.delegating -= 1 if self.delegate else 0
+
+
+class _Deferred():
+    """ The recorded state of a widget whose DOM element has not been created yet """
+
+    def __init__(self, tag, classes):
+        self.tag = tag
+        self.classes = " ".join(classes).split()
+        self.attrs = {}
+        self.style = {}
+        self.content = []
+        self.ops = []
+        self.event_types = []
+        self.root = None
+
+
+dirty_widgets = []
+
+
+def _flush_writes():
+    """ Apply the writes recorded by Widget.transaction, using one call into JavaScript """
+    dirty = [widget for widget in dirty_widgets if widget._writes] # pylint: disable=protected-access
+    dirty_widgets.clear()
+    writes = [widget._writes for widget in dirty] # pylint: disable=protected-access
+    for widget in dirty:
+        widget._writes = None # pylint: disable=protected-access
+    if dirty:
+        window.ltkWrite(dumps(writes), *[widget.element for widget in dirty])
+
+
+class _Builder():
+    """ Turns deferred widgets into HTML, plus the writes and event types to apply once created """
+
+    def __init__(self):
+        self.ops = []
+        self.events = []
+        self.slots = []
+        self.built = []
+
+    def render(self, widget):
+        """ Return the HTML for a deferred widget and all its deferred descendants """
+        html = []
+        self._render(widget, html)
+        return "".join(html)
+
+    def _render(self, widget, html):
+        state = widget._deferred # pylint: disable=protected-access
+        ltk_id = widget._ltk_id # pylint: disable=protected-access
+        self.built.append(state)
+        html.append(f'<{state.tag} ltk_id="{ltk_id}" class="{" ".join(state.classes)}">')
+        if state.style:
+            self.ops.append([ltk_id, "css", [state.style]])
+        if state.attrs:
+            self.ops.append([ltk_id, "attr", [state.attrs]])
+        self.ops.extend([ltk_id, method, args] for method, args in state.ops)
+        self.events.extend([ltk_id, event_type] for event_type in state.event_types)
+        for child in state.content:
+            if isinstance(child, Widget) and child._deferred and not child._deferred.root: # pylint: disable=protected-access
+                self._render(child, html)
+            elif isinstance(child, str):
+                html.append(child)
+            else:
+                html.append(f'<ltk-slot index="{len(self.slots)}"></ltk-slot>')
+                self.slots.append(self.slot(child))
+        if state.tag not in VOID_TAGS:
+            html.append(f"</{state.tag}>")
+
+    @classmethod
+    def slot(cls, child):
+        """ Return the element to insert for a child that is not rendered as HTML """
+        return child.element if isinstance(child, Widget) else child
+
+
+def _materialize(*widgets):
+    """
+    Creates the DOM for deferred widgets and all their deferred descendants at once.
+    Returns a jQuery object with the elements of the given widgets.
+    """
+    builder = _Builder()
+    html = "".join(builder.render(widget) for widget in widgets)
+    root = window.ltkBuild(html, dumps(builder.ops), json.dumps(builder.events), _dispatch_proxy, *builder.slots)
+    for state in builder.built:
+        state.root = root
+    return root
+
+
+def _create_elements(children):
+    """ Creates the elements for all deferred widgets in children with a single call into JavaScript """
+    pending = [
+        child for child in children
+        if isinstance(child, Widget) and child._deferred and not child._deferred.root # pylint: disable=protected-access
+    ]
+    if pending:
+        elements = _materialize(*pending)
+        for index, child in enumerate(pending):
+            child.element = elements.eq(index)
 
 
 class Widget(object):
     """Base class for LTK widgets."""
     classes = []
     instances = {}
-    element = None
     tag = "div"
 
     DEBUG = True
     INSPECT = True
 
-    _inspector = Inspector() if INSPECT else None
+    _inspector = None
+    _created = False
+    _element = None
+    _deferred = None
+    _proxies = None
+    _bindings = None
+    _writes = None
+    _geometry = None
+    _ltk_id = None
+    _count = 0
 
 
     def __init__(self, *args):
@@ -145,26 +284,95 @@ class Widget(object):
 
         Sets:
             self.element: The jQuery element representing this widget.
+                Inside a `with ltk.deferred():` block, the element is created on first use.
         """
-        self.element = (
-            window.jQuery(f"<{self.tag}>")
-                .addClass(" ".join(self.classes))
-                .append(*self._flatten(args))
-        )
-        widgets[str(id(self))] = self
-        self.attr("ltk_id", str(id(self)))
+        if deferred.depth:
+            self._deferred = _Deferred(self.tag, self.classes)
+            self._deferred.content = self._collect(args)
+        else:
+            self.element = (
+                window.jQuery(f"<{self.tag}>")
+                    .addClass(" ".join(self.classes))
+                    .append(*self._flatten(args))
+            )
+        Widget._count += 1
+        self._ltk_id = str(Widget._count)
+        widgets[self._ltk_id] = self
+        if not Widget._created:
+            Widget._created = True
+            startup.mark("first widget")
+        self.attr("ltk_id", self._ltk_id)
         self._handle_css(args)
         if Widget.INSPECT:
-            self.on("mousemove", proxy(lambda event: self._on_mousemove(event)))
-            self._caller = Inspector.get_caller()
-
-    def _on_mousemove(self, event):
-        """Handle mousemove event."""
-        if event.shiftKey and event.ctrlKey:
-            Widget._inspector.show(self)
-            event.stopPropagation()
+            self._caller = _get_caller()
+
+    @property
+    def element(self):
+        """ The jQuery element for this widget, created on first use for deferred widgets """
+        if self._writes:
+            writes, self._writes = self._writes, None
+            window.ltkWrite(dumps([writes]), self.element)
+        state = self._deferred
+        if state is not None:
+            if state.root is None:
+                self._element = _materialize(self)
+            else:
+                self._element = state.root.find(f"[ltk_id='{self._ltk_id}']")
+            self._deferred = None
+        return self._element
+
+    @element.setter
+    def element(self, element):
+        self._deferred = None
+        self._element = element
+
+    def _recording(self):
+        """ Returns the deferred state of this widget while its DOM element has not been created """
+        state = self._deferred
+        return state if state is not None and state.root is None else None
+
+    def transaction(self):
+        """
+        Start a write transaction for this widget and return the widget itself.
+
+        Subsequent css, attr, prop, addClass, width and height writes are recorded in Python.
+        At the next animation frame, the writes for all widgets in a transaction are applied
+        with one call into JavaScript, using a single css, attr, and prop call per element.
+        Any other use of the widget's element applies its recorded writes first.
+
+        Example:
+            widget.transaction().css("top", top).css("left", left).width(width)
+        """
+        if self._writes is None and not self._recording():
+            self._writes = {}
+            dirty_widgets.append(self)
+            mutate(_flush_writes, "ltk-flush-writes")
+        return self
+
+    def geometry(self):
+        """
+        Returns the geometry of this widget as a dict with width, height, outer_width,
+        outer_height, left and top relative to the offset parent, offset_left and
+        offset_top relative to the document, and scroll_top and scroll_left, using
+        a single call into JavaScript.
+
+        Inside a function scheduled with ltk.measure, the result is cached until the
+        read phase ends, so widgets measured by several functions are only read once.
+        """
+        if frame["phase"] == "measure" and self._geometry and self._geometry[0] == frame["count"]:
+            return self._geometry[1]
+        geometry = json.loads(window.ltkGeometry(self.element))
+        if frame["phase"] == "measure":
+            self._geometry = (frame["count"], geometry)
+        return geometry
+
+    def _write(self, method, value, key=None):
+        """ Record a write in the current transaction """
+        if key is None:
+            self._writes[method] = value
         else:
-            Widget._inspector.hide()
+            self._writes.setdefault(method, {})[key] = value
+        return self
 
     def _handle_css(self, args):
         """Apply CSS styles passed in the args to the widget.
@@ -189,21 +397,28 @@ class Widget(object):
             list: A flat list containing the child widgets and any
                 grandchildren widgets.
         """
-        result = []
+        return [
+            child.element if isinstance(child, Widget) else child
+            for child in self._collect(children)
+        ]
+
+    def _collect(self, children):
+        """ Flatten a list of children, like _flatten, but keep widgets as they are. """
+        return list(self._iterate(children))
+
+    def _iterate(self, children):
+        """ Yield the flattened children one at a time, only draining generators as needed. """
         for child in children:
             if isinstance(child, dict):
                 continue
-            elif isinstance(child, Widget):
-                result.append(child.element)
             elif type(child).__name__ == "generator":
-                result.extend(self._flatten(child))
+                yield from self._iterate(child)
             elif isinstance(child, list):
-                result.extend(self._flatten(child))
+                yield from self._iterate(child)
             elif isinstance(child, (int, float, bool)):
-                result.append(str(child))
+                yield str(child)
             else:
-                result.append(child)
-        return result
+                yield child
 
     def debug(self, *args):
         """ log a message to the console """
@@ -221,7 +436,50 @@ class Widget(object):
         set_widget_value()
         self.addClass(f"ltk-model-{attribute.model.__class__.__name__.lower()}-{attribute.name}")
         attribute.listeners.append(set_widget_value)
-        self.on("change", proxy(lambda event: schedule(set_model_value, f"set model {self}")))
+        if self._bindings is None:
+            self._bindings = []
+        self._bindings.append((attribute, set_widget_value))
+        self.on("change", lambda event: schedule(set_model_value, f"set model {self}"), delegate=True)
+
+    def dispose(self):
+        """
+        Remove this widget and all its descendants from the DOM and release their resources.
+
+        This releases the event handlers and proxies the widgets created, and detaches them
+        from any model attributes they are bound to. Widgets whose elements are removed using
+        jQuery's remove, empty, or html are released automatically, just like jQuery
+        releases the data and events attached to those elements.
+        """
+        if self._recording():
+            for child in self._deferred.content:
+                if isinstance(child, Widget):
+                    child.dispose()
+            self._release()
+        else:
+            _release_widgets(window.ltkRemove(self.element))
+
+    destroy = dispose
+
+    def _release(self):
+        """ Release the resources held by this widget. Overridden by subclasses. """
+        ltk_id = self._ltk_id
+        widgets.pop(ltk_id, None)
+        event_handlers.pop(ltk_id, None)
+        for attribute, listener in self._bindings or []:
+            if listener in attribute.listeners:
+                attribute.listeners.remove(listener)
+        for function_proxy in self._proxies or []:
+            destroy_proxy(function_proxy)
+        self._bindings = None
+        self._proxies = None
+
+    def _proxy(self, function):
+        """ Create a proxy for the given function that is released when this widget is disposed """
+        function_proxy = proxy(function)
+        if self._proxies is None:
+            self._proxies = []
+        self._proxies.append(function_proxy)
+        return function_proxy
 
     def set_value(self, value):
         """ Set the value of the widget. """
@@ -232,7 +490,7 @@ class Widget(object):
 
     def _set_value(self, value):
         """ To be overridden by subclasses. """
-        self.element.html(value)
+        self.html(value)
 
     def get_value(self):
         """ Get the value of the widget. """
@@ -254,6 +512,12 @@ class Widget(object):
             prop:(str,dict): The CSS property or map to set/get
             value:Any The CSS value to set. Numeric values auto-convert to "px"
         """
+        if self._recording() and (isinstance(prop, dict) or value is not None):
+            self._deferred.style.update(prop if isinstance(prop, dict) else { prop: value })
+            return self
+        if self._writes is not None and (isinstance(prop, dict) or value is not None):
+            self._writes.setdefault("css", {}).update(prop if isinstance(prop, dict) else { prop: value })
+            return self
         if isinstance(prop, dict):
             prop = to_js(prop)
         return self.element.css(prop, value) if value is not None else self.element.css(prop)
@@ -270,6 +534,13 @@ class Widget(object):
                 If value is None, this gets the value as a string. 
                 Otherwise, it sets the value, which needs to be a string.
         """
+        if self._recording() and value is not None:
+            self._deferred.attrs[name] = value
+            return self
+        if self._recording() and name in self._deferred.attrs:
+            return self._deferred.attrs[name]
+        if self._writes is not None and value is not None:
+            return self._write("attr", value, name)
         try:
             return self.element.attr(name, value) if value is not None else self.element.attr(name)
         except Exception as e:
@@ -291,6 +562,11 @@ class Widget(object):
                 If value is None, this gets the value as a string. 
                 Otherwise, it sets the value, which needs to be a string.
         """
+        if self._recording() and value is not None:
+            self._deferred.ops.append(["prop", [name, value]])
+            return self
+        if self._writes is not None and value is not None:
+            return self._write("prop", value, name)
         return self.element.prop(name, value) if value is not None else self.element.prop(name)
 
     def val(self, value=None):
@@ -305,6 +581,9 @@ class Widget(object):
                 If value is None, this gets the value as a string. 
                 Otherwise, it sets the value, which needs to be a string.
         """
+        if self._recording() and value is not None:
+            self._deferred.ops.append(["val", [value]])
+            return self
         return self.element.val(value) if value is not None else self.element.val()
 
     def height(self, value=None):
@@ -323,6 +602,10 @@ class Widget(object):
                 If value is None, this gets the current height of the DOM element as a number. 
                 Otherwise, it sets the height.
         """
+        if self._recording() and value is not None:
+            return self.css("height", value)
+        if self._writes is not None and value is not None:
+            return self._write("height", value)
         return self.element.height(value) if value is not None else self.element.height()
 
     def width(self, value=None):
@@ -341,6 +624,10 @@ class Widget(object):
                 If value is None, this gets the current width of the DOM element as a number. 
                 Otherwise, it sets the width.
         """
+        if self._recording() and value is not None:
+            return self.css("width", value)
+        if self._writes is not None and value is not None:
+            return self._write("width", value)
         return self.element.width(value) if value is not None else self.element.width()
 
     def find(self, selector):
@@ -370,6 +657,12 @@ class Widget(object):
         Args:
             classes:(str,list): One or more space-separated classes or a list of classes to be added
         """
+        if self._recording():
+            self._deferred.classes.extend(" ".join(classes).split() if isinstance(classes, list) else classes.split())
+            return self
+        if self._writes is not None:
+            added = " ".join(classes) if isinstance(classes, list) else classes
+            return self._write("addClass", f"{self._writes.get('addClass', '')} {added}".strip())
         return self.element.addClass(classes)
 
     def removeClass(self, classes): # pylint: disable=invalid-name
@@ -379,6 +672,10 @@ class Widget(object):
         Args:
             classes:(str,list): One or more space-separated classes or a list of classes to remove
         """
+        if self._recording():
+            removed = " ".join(classes).split() if isinstance(classes, list) else classes.split()
+            self._deferred.classes = [name for name in self._deferred.classes if not name in removed]
+            return self
         return self.element.removeClass(classes)
 
     def children(self, selector=None):
@@ -404,6 +701,9 @@ class Widget(object):
         Args:
             text:str: A string that to replace the current widget's DOM tree with.
         """
+        if self._recording() and text is not None:
+            self._deferred.content = [_escape(text)]
+            return self
         return self.element.text() if text is None else self.element.text(text)
 
     def html(self, html=None):
@@ -419,6 +719,9 @@ class Widget(object):
         Args:
             text:str: A string that to replace the current widget's DOM tree with.
         """
+        if self._recording() and html is not None:
+            self._deferred.content = self._collect([html])
+            return self
         return self.element.html() if html is None else self.element.html(html)
 
     def append(self, *children):
@@ -429,8 +732,67 @@ class Widget(object):
         Args:
             selector:str: A string containing a selector expression to match elements against.
         """
+        if self._recording():
+            self._deferred.content.extend(self._collect(children))
+            return self
         return self.element.append(*self._flatten(children))
 
+    def stream(self, children, done=None, progress=None, budget_seconds=STREAM_BUDGET_SECONDS):
+        """
+        Append children progressively, instead of building all of them before anything is shown.
+
+        Children, usually a generator, are created in deferred mode until the time budget for
+        the current animation frame is used up. That chunk is then appended with a single call
+        into JavaScript, and the next chunk is created in the next animation frame. This keeps
+        the page responsive and shows the first children right away.
+
+        Args:
+            children: A generator or list of children, accepted in the same forms as append.
+            done:function: An optional function that is called when all children are appended.
+            progress:function: An optional function that is called with the number of children
+                appended so far, after every chunk.
+            budget_seconds:float: The time to spend creating children per animation frame.
+
+        Example:
+            ltk.VBox().stream(
+                (ltk.Text(line) for line in lines),
+                done=lambda: print("all lines shown"),
+            )
+        """
+        pending = self._iterate([children])
+        key = f"ltk-stream-{self._ltk_id}"
+        count = [0]
+
+        def step():
+            if widgets.get(self._ltk_id) is not self:
+                return
+            chunk = []
+            finished = False
+            end = now() + budget_seconds
+            with deferred():
+                while True:
+                    try:
+                        chunk.append(next(pending))
+                    except StopIteration:
+                        finished = True
+                        break
+                    if now() >= end:
+                        break
+            _create_elements(chunk)
+            if chunk:
+                self.element.append(*self._flatten(chunk))
+                count[0] += len(chunk)
+                if progress:
+                    progress(count[0])
+            if finished:
+                if done:
+                    done()
+            else:
+                schedule(step, key, priority="frame")
+
+        schedule(step, key, priority="frame")
+        return self
+
     def appendTo(self, target): # pylint: disable=invalid-name
         """
         Append the current widget at the end of the children list in target.
@@ -445,12 +807,28 @@ class Widget(object):
         """
         Remove all DOM elements and event handlers in the current widget's DOM tree. 
         """
+        if self._recording():
+            self._deferred.content = []
+            return self
         return self.element.empty()
 
-    def on(self, events, selector=None, data=None, handler=None):
+    def on(self, events, selector=None, data=None, handler=None, delegate=None):
         """
         Register an event handler for DOM or application-level events.
 
+        Calls jQuery's on method, see https://api.jquery.com/on, which binds the handler
+        to the element using a proxy. To create many widgets with handlers, pass
+        delegate=True. Handlers for the native bubbling events in DELEGATED_EVENTS are
+        then kept in a Python table and called by a single document-level listener per
+        event type, routed by the widget's ltk_id attribute, without a proxy or listener
+        per widget. Delegated handlers only fire while the widget is attached to the
+        document, and run after the handlers bound directly to its ancestors, so calling
+        stopPropagation in a delegated handler does not stop those. Other events, such
+        as custom events sent with trigger, are always bound directly. LTK does not keep
+        widgets alive for their delegated handlers. The handlers are released when the
+        widget is disposed, when jQuery removes its element, or when the browser collects
+        an element that was never added to the document.
+
         Args:
             events:str: A string containing one or more space-separated event types and
                 optional namespaces, such as "click" or "keydown.myPlugin".
@@ -458,8 +836,30 @@ class Widget(object):
                 that trigger the event. If the selector is None or omitted, the event
                 is always triggered when it reaches the selected element.
             handler:function A Python function that is called when the event happens.
+            delegate:bool: Whether to use the document-level listener, see above. Defaults
+                to False, or to True inside a `with ltk.deferred(delegate=True):` block.
+
+        Returns:
+            The jQuery element, or the widget itself when a deferred widget records a
+            delegated handler, just like css and attr.
         """
-        return self.element.on(events, selector, data, proxy(handler))
+        if handler is None and data is None and not isinstance(selector, str):
+            selector, handler = None, selector
+        event_types = events.split()
+        if delegate is None:
+            delegate = deferred.delegating > 0
+        if delegate and selector is None and data is None and all(
+            event_type in DELEGATED_EVENTS for event_type in event_types
+        ):
+            ltk_id = self._ltk_id
+            for event_type in event_types:
+                event_handlers.setdefault(ltk_id, {}).setdefault(event_type, []).append(handler)
+                if self._recording():
+                    self._deferred.event_types.append(event_type)
+                else:
+                    window.ltkListen(event_type, ltk_id, _dispatch_proxy, self.element)
+            return self if self._recording() else self.element
+        return self.element.on(events, selector, data, self._proxy(handler))
 
     def animate(self, properties, duration=400, easing="swing", complete=None):
         """
@@ -475,7 +875,7 @@ class Widget(object):
         """
         if isinstance(properties, dict):
             properties = to_js(properties)
-        return self.element.animate(properties, duration, easing, complete and proxy(complete))
+        return self.element.animate(properties, duration, easing, complete and self._proxy(complete))
 
     def __getattr__(self, name):
         try:
@@ -483,6 +883,9 @@ class Widget(object):
         except Exception as e:
             raise AttributeError(f"Widget {self.__class__.__name__} does not have attribute {name}") from e
 
+    def __getitem__(self, index):
+        return self.element[index]
+
     def toJSON(self, *args): # pylint: disable=invalid-name
         """ Return a JSON representation of the widget """
         return f"[{self.__class__.__name__}|{','.join(args)}]"
@@ -539,36 +942,266 @@ class Text(Widget):
         return self.element.html()
 
     def _set_value(self, value):
-        return self.element.html(value)
+        return self.html(value)
 
 
-class Model():
-    """ A model that can be bound to a widget """
+class _Node():
+    """ A snapshot of a widget description, as returned by the render function of a Renderer """
 
-    def __init__(self, **kwargs):
-        fields = [
+    def __init__(self, widget):
+        self.widget = widget
+        self.state = widget._deferred # pylint: disable=protected-access
+        self.kind = (widget.__class__, self.state.tag) if self.state else None
+        self.key = self.state.attrs.get("key") if self.state else None
+        self.children = [
+            _Node(child) if isinstance(child, Widget) else child
+            for child in (self.state.content if self.state else [])
+        ]
+
+    def nodes(self):
+        """ Yield this node and all its descendant nodes """
+        yield self
+        for child in self.children:
+            if isinstance(child, _Node):
+                yield from child.nodes()
+
+
+class Renderer(Widget):
+    """
+    Shows the widget returned by a render function and redraws it by patching the DOM.
+
+    The render function is called inside a `with ltk.deferred(delegate=True):` block, so it
+    returns a description of the UI rather than DOM elements, and its click, key, and input
+    handlers are delegated, see Widget.on. On refresh, the new description is
+    compared with the previous one. Children are matched by their "key" attribute, or by
+    position and type when they have no key. Matched widgets keep their existing DOM
+    elements and event listeners. Only changed classes, styles, attributes, and text are
+    written, and new, moved, and removed children are applied with one call into JavaScript.
+
+    Example:
+        todo_list = ltk.Renderer(lambda: ltk.VBox(
+            ltk.Text(todo.title).attr("key", todo.id)
+            for todo in todos
+        ))
+        ...
+        todo_list.refresh()
+    """
+    classes = [ "ltk-renderer" ]
+
+    def __init__(self, render, style=None):
+        self.render = render
+        self.tree = None
+        Widget.__init__(self, style or DEFAULT_CSS)
+        self.refresh()
+
+    def refresh(self):
+        """ Call the render function and patch the DOM to match the widget it returns """
+        with deferred(delegate=True):
+            widget = self.render()
+        tree = _Node(widget)
+        if self.tree is None:
+            self.append(widget)
+        else:
+            patch = { "fragments": [], "children": [], "updates": [], "events": [] }
+            builder = _Builder()
+            self._reconcile(self._ltk_id, [self.tree], [tree], patch, builder)
+            patch["updates"].extend(builder.ops)
+            patch["events"].extend(builder.events)
+            if any(patch.values()):
+                window.ltkPatch(self.element, dumps(patch), _dispatch_proxy, *builder.slots)
+            for node in tree.nodes():
+                if node.state:
+                    node.state.root = self.element
+        self.tree = tree
+        return widget
+
+    def _reconcile(self, parent_id, old_children, new_children, patch, builder):
+        """ Match new children to old ones by key or by position and type, and patch them """
+        keyed = {}
+        unkeyed = {}
+        for node in old_children:
+            if isinstance(node, _Node) and node.state:
+                if node.key is None:
+                    unkeyed.setdefault(node.kind, []).append(node)
+                else:
+                    keyed[node.key] = node
+        for nodes in unkeyed.values():
+            nodes.reverse()
+        specs = []
+        for child in new_children:
+            if isinstance(child, str):
+                specs.append({ "html": child })
+                continue
+            if not isinstance(child, _Node) or not child.state:
+                specs.append({ "slot": len(builder.slots) })
+                builder.slots.append(_Builder.slot(child.widget if isinstance(child, _Node) else child))
+                continue
+            if child.key is None:
+                match = unkeyed.get(child.kind) and unkeyed[child.kind].pop()
+            else:
+                match = keyed.pop(child.key, None)
+                if match and match.kind != child.kind:
+                    match = None
+            if match:
+                self._diff(match, child, patch, builder)
+            else:
+                specs.append({ "fragment": len(patch["fragments"]) })
+                patch["fragments"].append(builder.render(child.widget))
+                continue
+            specs.append({ "id": child.widget._ltk_id }) # pylint: disable=protected-access
+        old_ids = [
+            node.widget._ltk_id if isinstance(node, _Node) and node.state else None # pylint: disable=protected-access
+            for node in old_children
+        ]
+        if any(not "id" in spec for spec in specs) or [spec["id"] for spec in specs] != old_ids:
+            patch["children"].append([parent_id, specs])
+
+    def _diff(self, old, new, patch, builder):
+        """ Patch the element of an old node to match a new node and let the new widget adopt it """
+        ltk_id = old.widget._ltk_id # pylint: disable=protected-access
+        before, after = old.state, new.state
+        updates = patch["updates"]
+        added = [name for name in after.classes if not name in before.classes]
+        removed = [name for name in before.classes if not name in after.classes]
+        if added:
+            updates.append([ltk_id, "addClass", [" ".join(added)]])
+        if removed:
+            updates.append([ltk_id, "removeClass", [" ".join(removed)]])
+        style = { name: value for name, value in after.style.items() if before.style.get(name) != value }
+        style.update({ name: "" for name in before.style if not name in after.style })
+        if style:
+            updates.append([ltk_id, "css", [style]])
+        attrs = {
+            name: value for name, value in after.attrs.items()
+            if name != "ltk_id" and before.attrs.get(name) != value
+        }
+        if attrs:
+            updates.append([ltk_id, "attr", [attrs]])
+        for name in before.attrs:
+            if not name in after.attrs:
+                updates.append([ltk_id, "removeAttr", [name]])
+        if after.ops != before.ops:
+            updates.extend([ltk_id, method, args] for method, args in after.ops)
+        if all(isinstance(child, str) for child in old.children + new.children):
+            if "".join(old.children) != "".join(new.children):
+                updates.append([ltk_id, "html", ["".join(new.children)]])
+        else:
+            self._reconcile(ltk_id, old.children, new.children, patch, builder)
+        self._adopt(old.widget, new.widget, ltk_id)
+        patch["events"].extend([ltk_id, event_type] for event_type in after.event_types)
+
+    def _adopt(self, old, new, ltk_id):
+        """ Let the new widget take over the DOM element and registry entries of the old one """
+        old._release() # pylint: disable=protected-access
+        new_id = new._ltk_id # pylint: disable=protected-access
+        widgets.pop(new_id, None)
+        new._ltk_id = ltk_id # pylint: disable=protected-access
+        widgets[ltk_id] = new
+        handlers = event_handlers.pop(new_id, None)
+        if handlers:
+            event_handlers[ltk_id] = handlers
+        if old._element is not None: # pylint: disable=protected-access
+            new.element = old._element # pylint: disable=protected-access
+
+
+class _ModelBatch():
+    """
+    Collects the changes made to a model and notifies its listeners once, when the
+    outermost batch ends. A batch that ends with an exception is discarded without
+    notifying anyone.
+    """
+    def __init__(self, model):
+        self.model = model
+
+    def __enter__(self):
+        model = self.model
+        if model._batch is None: # pylint: disable=protected-access
+            object.__setattr__(model, "_batch", {})
+        object.__setattr__(model, "_batch_depth", model._batch_depth + 1) # pylint: disable=protected-access
+        return model
+
+    def __exit__(self, exc_type, *args):
+        model = self.model
+        object.__setattr__(model, "_batch_depth", model._batch_depth - 1) # pylint: disable=protected-access
+        if model._batch_depth: # pylint: disable=protected-access
+            return
+        if exc_type:
+            object.__setattr__(model, "_batch", None)
+            return
+        changes = {}
+        rounds = 0
+        while model._batch: # pylint: disable=protected-access
+            rounds += 1
+            if rounds > MAX_BATCH_ROUNDS:
+                fields = list(model._batch) # pylint: disable=protected-access
+                object.__setattr__(model, "_batch", None)
+                raise ValueError(f"{model.__class__.__name__}.changed keeps changing {fields}")
+            pending = model._batch # pylint: disable=protected-access
+            object.__setattr__(model, "_batch", {}) # fields set by changed() join this batch
+            for name, attribute in pending.items():
+                changes[name] = attribute
+                model.changed(name, attribute.value)
+        object.__setattr__(model, "_batch", None)
+        for attribute in changes.values():
+            attribute.notify()
+
+
+class _Schema():
+    """ The fields and computed attributes of a Model class, found once for each class """
+    __slots__ = ("fields", "computed")
+
+    def __init__(self, cls):
+        self.fields = [
             name
-            for name,value in self.__class__.__dict__.items()
-            if not name.startswith("__") and not callable(value)
+            for name, value in cls.__dict__.items()
+            if not name.startswith("__") and not callable(value) and not isinstance(value, computed)
         ]
-        for name in fields:
-            object.__setattr__(self, name,
-                ModelAttribute(self, name, getattr(self.__class__, name))
-            )
+        self.computed = [
+            (name, value.function)
+            for name, value in cls.__dict__.items()
+            if isinstance(value, computed)
+        ]
+
+
+def _get_schema(cls):
+    schema = _schemas.get(cls)
+    if schema is None:
+        schema = _schemas[cls] = _Schema(cls)
+    return schema
+
+
+class Model():
+    """
+    A model that can be bound to a widget.
+
+    The fields of a model are found once for each class. Values passed to the constructor
+    are set without calling changed or notifying listeners, as there are none yet.
+    """
+
+    _batch = None
+    _batch_depth = 0
+    _version = 0
+    _journal = None
+    _item_events = None
+
+    def __init__(self, **kwargs):
+        cls = self.__class__
+        schema = _get_schema(cls)
+        state = self.__dict__
+        for name in schema.fields:
+            state[name] = ModelAttribute(self, name, getattr(cls, name)) # the default can change
+        for name, function in schema.computed:
+            state[name] = ComputedAttribute(self, name, function)
         for name, value in kwargs.items():
-            if not name in fields:
-                raise ValueError(f"Argument '{name}' not found in {fields} for {self.__class__.__name__}")
-            getattr(self, name).set_value(value)
+            if not name in schema.fields:
+                raise ValueError(f"Argument '{name}' not found in {schema.fields} for {cls.__name__}")
+            attribute = state[name]
+            attribute._value = attribute._observe(attribute._coerce(value)) # pylint: disable=protected-access
 
     def __setattr__(self, name: str, value):
         try:
             if hasattr(self, name) and isinstance(getattr(self, name), ModelAttribute):
-                attribute = getattr(self, name)
-                attribute.set_value(value)
-                try:
-                    self.changed(name, value)
-                except Exception as e: #  pylint: disable=broad-except
-                    print(e)
+                getattr(self, name).set_value(value)
             else:
                 object.__setattr__(self, name, value)
         except Exception as e: # pylint: disable=broad-except
@@ -580,6 +1213,91 @@ class Model():
                 pass
             raise e
 
+    def batch(self):
+        """
+        Returns a context manager that collects the changes made to this model and
+        notifies the listeners of each changed attribute once, when the block ends.
+
+        Example:
+            with product.batch():
+                product.name = "Hammer"
+                product.price = 100.0
+        """
+        return _ModelBatch(self)
+
+    def update(self, **fields):
+        """ Set the given fields in one batch, notifying each listener only once """
+        with self.batch():
+            for name, value in fields.items():
+                attribute = getattr(self, name, None)
+                if not isinstance(attribute, ModelAttribute):
+                    raise ValueError(f"Field '{name}' not found in {self.__class__.__name__}")
+                attribute.set_value(value)
+
+    def get_version(self):
+        """ Returns the version of this model, which increases with every change """
+        return self._version
+
+    def _record(self, name, event=None):
+        """ Record the version in which the field changed, and the item events of lists and dicts """
+        state = self.__dict__
+        version = state["_version"] = self._version + 1
+        if self._journal is None:
+            state["_journal"] = {}
+            state["_item_events"] = {}
+        if event is None:
+            self._journal[name] = version
+            self._item_events.pop(name, None) # older item events no longer apply
+            return
+        item_events = self._item_events.get(name)
+        if item_events is None: # covers all changes after the field was last set as a whole
+            item_events = self._item_events[name] = (self._journal.get(name, 0), [])
+        self._journal[name] = version
+        item_events[1].append((version, event))
+        if len(item_events[1]) > MAX_ITEM_EVENTS:
+            self._item_events[name] = (version, []) # older diffs send the whole value instead
+
+    def diff(self, since=None):
+        """
+        Returns a patch with the changes made to this model after the given version, to be
+        applied to another copy of the model with apply_patch. Changed fields are sent with
+        their value. Lists and dicts that only had items changed are sent as the item events,
+        see ModelAttribute. Without a version, the patch contains all fields.
+
+        Example:
+            patch = model.diff(since=last_synced)
+            last_synced = patch["version"]
+            send(json.dumps(patch))
+        """
+        state = self.__dict__
+        patch = { "version": self._version, "fields": {}, "items": {} }
+        if since is None:
+            names = _get_schema(self.__class__).fields
+        else:
+            names = [name for name, version in (self._journal or {}).items() if version > since]
+        for name in names:
+            item_events = (self._item_events or {}).get(name)
+            if since is not None and item_events and item_events[0] <= since:
+                patch["items"][name] = [event for version, event in item_events[1] if version > since]
+            else:
+                patch["fields"][name] = state[name].get_value()
+        return patch
+
+    def apply_patch(self, patch):
+        """ Apply a patch created by diff on another copy of this model, in one batch """
+        with self.batch():
+            for name, value in patch.get("fields", {}).items():
+                getattr(self, name).set_value(value)
+            for name, events in patch.get("items", {}).items():
+                container = getattr(self, name).value
+                for event in events:
+                    if event["type"] == "splice":
+                        container.splice(event["index"], event["removed"], event["inserted"])
+                    elif event["type"] == "set":
+                        container[event["key"]] = event["value"]
+                    else:
+                        del container[event["key"]]
+
     def decode(self, json_encoding: str):
         """ Decode the JSON encoding of the model """
         try:
@@ -590,10 +1308,10 @@ class Model():
 
     def encode(self):
         """ Encode the model as JSON """
+        state = self.__dict__
         return json.dumps({
-            name: value.get_value()
-            for name, value in self.__dict__.items()
-            if isinstance(value, ModelAttribute)
+            name: state[name].get_value()
+            for name in _get_schema(self.__class__).fields
         })
 
     def changed(self, name, value):
@@ -608,41 +1326,167 @@ class Model():
         return f"{self.__class__.__name__}({fields})"
 
 class LocalStorageModel(Model):
-    """ A model that is stored in the browser's local storage """
+    """
+    A model that is stored in the browser's local storage.
+
+    Changes are written behind: they are collected and saved when the browser is idle,
+    STORE_DELAY_SECONDS after the last change, or when the page is hidden or closed.
+    Models that keep changing are saved at least every MAX_STORE_DELAY_SECONDS.
+    Only the fields that changed since the last save are encoded again. Call flush()
+    to save the changes right away.
+    """
 
     __store = window.localStorage
 
     def __init__(self, _key=None, **kwargs):
         Model.__init__(self)
         _key = _key or f"{self.__class__.__name__}-{get_time()}"
-        self.decode(self.__store.getItem(_key))
+        self._restore(self.__store.getItem(_key))
+        self._encoded = {}
+        self._dirty = set()
         self._key = _key
 
+    def _restore(self, json_encoding):
+        """ Set the stored values without notifying anyone, as nothing changed """
+        try:
+            values = json.loads(json_encoding)
+        except: # pylint: disable=bare-except
+            return
+        for name, value in values.items():
+            attribute = self.__dict__.get(name)
+            if isinstance(attribute, ModelAttribute) and not isinstance(attribute, ComputedAttribute):
+                attribute._value = attribute._observe(attribute._coerce(value)) # pylint: disable=protected-access
+
     def changed(self, name, value):
         """ Called when an attribute of the model has changed """
         if hasattr(self, "_key"):
-            self.__store.setItem(self._key, self.encode())
-    
+            self._dirty.add(name)
+            _unsaved[self._key] = self
+            _save_models_later()
+
+    def flush(self):
+        """ Save the changes made to this model to local storage now """
+        self._write()
+        _save_manifests()
+
+    def _write(self):
+        """ Save the changes made to this model, leaving a new key in the manifest to be saved later """
+        _unsaved.pop(self._key, None)
+        if not self._dirty and self._encoded:
+            return
+        for name in _get_schema(self.__class__).fields:
+            if name in self._dirty or not name in self._encoded:
+                self._encoded[name] = json.dumps(self.__dict__[name].get_value())
+        self._dirty = set()
+        fields = ", ".join(f"{json.dumps(name)}: {value}" for name, value in self._encoded.items())
+        self.__store.setItem(self._key, f"{{{fields}}}")
+        manifest = self._manifest()
+        if not self._key in manifest:
+            manifest[self._key] = True
+            _dirty_manifests.add(self.__class__)
+
     def remove(self):
         """ Remove the model from local storage """
+        _unsaved.pop(self._key, None)
         self.__store.removeItem(self._key)
+        if self._manifest().pop(self._key, None):
+            _dirty_manifests.discard(self.__class__)
+            self._save_manifest()
+
+    @classmethod
+    def _manifest(cls):
+        """
+        Returns the keys of all stored models of this class, kept in local storage under
+        a single key, so they can be found without scanning all keys in local storage.
+        """
+        manifest_key = f"ltk-manifest-{cls.__name__}"
+        if not manifest_key in _manifests:
+            try:
+                keys = json.loads(cls.__store.getItem(manifest_key))
+            except: # pylint: disable=bare-except
+                keys = [ # created by an older version of LTK
+                    key for key in window.Object.keys(cls.__store)
+                    if key.startswith(f"{cls.__name__}-")
+                ]
+                cls.__store.setItem(manifest_key, json.dumps(keys))
+            _manifests[manifest_key] = dict.fromkeys(keys, True)
+        return _manifests[manifest_key]
+
+    @classmethod
+    def _save_manifest(cls):
+        cls.__store.setItem(f"ltk-manifest-{cls.__name__}", json.dumps(list(cls._manifest())))
 
     @classmethod
     def load(cls):
-        """ Load all models of this type from local storage """
-        return [
-            cls(key) for key in window.Object.keys(cls.__store)
-            if key.startswith(f"{cls.__name__}-")
-        ]
+        """
+        Load all models of this type from local storage.
+
+        The models are read and decoded from local storage when one of their
+        attributes is used for the first time.
+        """
+        return [_LazyModel(cls, key) for key in cls._manifest()]
+
+
+class _LazyModel():
+    """
+    Stands in for a LocalStorageModel until one of its attributes is used.
+    It reports the class of the model, so isinstance and the model schema work.
+    """
+
+    def __init__(self, cls, key):
+        object.__setattr__(self, "_cls", cls)
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_model", None)
+
+    @property
+    def __class__(self):
+        return self._cls
+
+    def _load(self):
+        if self._model is None:
+            object.__setattr__(self, "_model", self._cls(self._key))
+        return self._model
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+    def __repr__(self):
+        return repr(self._load())
 
 
 class ModelAttribute():
-    """ A specific attribute of a Model """
+    """
+    A specific attribute of a Model.
+
+    List and dict values are held as an ObservableList or ObservableDict. Changes to
+    their items notify the listeners, and are passed as events to the item_listeners,
+    which are called with the attribute and the event, so they can update only what changed:
+     - {"type": "splice", "index": 2, "removed": 1, "inserted": ["a", "b"]} for lists.
+     - {"type": "set", "key": "a", "value": 1} for dicts and for list items.
+     - {"type": "delete", "key": "a"} for dicts.
+    """
+    __slots__ = ("model", "name", "_value", "listeners", "item_listeners")
+
     def __init__(self, model: Model, name: str, value):
         self.model = model
         self.name = name
-        self.value = value
+        self._value = self._observe(value)
         self.listeners = []
+        self.item_listeners = []
+
+    @property
+    def value(self):
+        """ The value of the attribute, recorded as a dependency while a computed attribute runs """
+        if _reads:
+            _reads[-1][id(self)] = self
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
 
     def get_value(self):
         """ Get the value of the attribute """
@@ -650,16 +1494,49 @@ class ModelAttribute():
 
     def set_value(self, value):
         """ Set the value of the attribute """
+        typed_value = self._coerce(value)
+        if typed_value == self.value:
+            return
+        self._value = self._observe(typed_value)
+        self._changed()
+        return self.value
+
+    def _coerce(self, value):
+        """ Convert the value to the type of the current value, if possible """
+        kind = type(self.value)
+        if kind is type(value) and not kind in (ObservableList, ObservableDict):
+            return value
         try:
-            typed_value = type(self.value)(value)
+            return kind(value)
         except Exception: # pylint: disable=broad-except
-            typed_value = value
-        if typed_value == self.value:
+            return value
+
+    def _observe(self, value):
+        """ Hold lists and dicts as observable containers that report changes to this attribute """
+        if isinstance(value, (list, dict)) and getattr(value, "attribute", None) is not self:
+            if type(value) in (ObservableList, ObservableDict) and value.attribute is None:
+                value.attribute = self # created by _coerce, not observed by anyone yet
+                return value
+            if isinstance(value, list) and type(value) in (list, ObservableList):
+                return ObservableList(value, self)
+            if isinstance(value, dict) and type(value) in (dict, ObservableDict):
+                return ObservableDict(value, self)
+        return value
+
+    def _item_changed(self, event):
+        for listener in self.item_listeners:
+            listener(self, event)
+        self._changed(event)
+
+    def _changed(self, event=None):
+        """ Tell the model and the listeners about a change, or add it to the current batch """
+        model = self.model
+        model._record(self.name, event) # pylint: disable=protected-access
+        if model._batch is not None: # pylint: disable=protected-access
+            model._batch[self.name] = self # pylint: disable=protected-access
             return
-        self.value = typed_value
-        self.model.changed(self.name, self.value)
+        model.changed(self.name, self.value)
         self.notify()
-        return self.value
 
     def notify(self):
         """ Notify listeners of the change """
@@ -667,12 +1544,14 @@ class ModelAttribute():
             listener(self)
 
     def __getattr__(self, name):
-        # handle calls to list.push or similar apis on the attribute.
+        # handle calls to list.append or similar apis on the attribute.
         try:
-            schedule(self.notify, f"ltk-model-nofity-{id(self)}") # assume there was a side effect
-            return getattr(self.value, name)
+            value = getattr(self.value, name)
         except Exception as e:
             raise AttributeError(f"Model attribute {self.model.__class__.__name__}.{self.name} of type {type(self.value)} does not have attribute {name}") from e
+        if callable(value) and not isinstance(self.value, IMMUTABLE_TYPES + (ObservableList, ObservableDict)):
+            schedule(self.notify, f"ltk-model-notify-{id(self)}") # the method may change the value
+        return value
 
     def __int__(self): return int(self.value)         # pylint: disable=multiple-statements
     def __bool__(self): return bool(self.value)        # pylint: disable=multiple-statements
@@ -755,18 +1634,476 @@ class ModelAttribute():
             raise TypeError(f"'{type(self.value).__name__}' object does not support item access")
         
     def __setitem__(self, key, value):
-        if isinstance(self.value, (list, dict)):
+        if isinstance(self.value, (ObservableList, ObservableDict)):
             self.value[key] = value
-            self.model.changed(self.name, self.value)
-            self.notify()
+        elif isinstance(self.value, (list, dict)):
+            self.value[key] = value
+            self._changed()
         else:
             raise TypeError(f"'{type(self.value).__name__}' object does not support item assignment")
 
+    def __delitem__(self, key):
+        del self.value[key]
+
+    def __len__(self):
+        return len(self.value)
+
+    def __contains__(self, item):
+        return item in self.value
 
     def __repr__(self):
         return f'"{self.value}"' if isinstance(self.value, str) else repr(self.value)
 
 
+class ObservableList(list):
+    """ A list held by a ModelAttribute, which it tells about every change, see ModelAttribute """
+
+    def __init__(self, items=(), attribute=None):
+        list.__init__(self, items)
+        self.attribute = attribute
+
+    def _splice(self, index, removed, inserted):
+        if self.attribute is not None:
+            self.attribute._item_changed({ # pylint: disable=protected-access
+                "type": "splice", "index": index, "removed": removed, "inserted": inserted
+            })
+
+    def _replace_all(self, method, *args):
+        count = len(self)
+        result = method(self, *args)
+        self._splice(0, count, list(self))
+        return result
+
+    def _index(self, index):
+        return min(max(index + len(self) if index < 0 else index, 0), len(self))
+
+    def splice(self, index, removed, inserted):
+        """ Remove a number of items at the index and insert the given items there """
+        index = self._index(index)
+        inserted = list(inserted)
+        list.__setitem__(self, slice(index, index + removed), inserted)
+        self._splice(index, removed, inserted)
+
+    def append(self, item):
+        list.append(self, item)
+        self._splice(len(self) - 1, 0, [item])
+
+    def extend(self, items):
+        index = len(self)
+        items = list(items)
+        list.extend(self, items)
+        self._splice(index, 0, items)
+
+    def insert(self, index, item):
+        index = self._index(index)
+        list.insert(self, index, item)
+        self._splice(index, 0, [item])
+
+    def pop(self, index=-1):
+        item = list.pop(self, index)
+        self._splice(index + len(self) + 1 if index < 0 else index, 1, [])
+        return item
+
+    def remove(self, item):
+        index = self.index(item)
+        list.pop(self, index)
+        self._splice(index, 1, [])
+
+    def clear(self):
+        count = len(self)
+        list.clear(self)
+        self._splice(0, count, [])
+
+    def __setitem__(self, key, value):
+        if isinstance(key, slice):
+            self._replace_all(list.__setitem__, key, value)
+        else:
+            list.__setitem__(self, key, value)
+            if self.attribute is not None:
+                self.attribute._item_changed({ "type": "set", "key": self._index(key), "value": value }) # pylint: disable=protected-access
+
+    def __delitem__(self, key):
+        if isinstance(key, slice):
+            self._replace_all(list.__delitem__, key)
+        else:
+            index = self._index(key)
+            list.__delitem__(self, key)
+            self._splice(index, 1, [])
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __imul__(self, count):
+        return self._replace_all(list.__imul__, count)
+
+    def sort(self, *args, **kwargs):
+        self._replace_all(list.sort, *args, **kwargs)
+
+    def reverse(self):
+        self._replace_all(list.reverse)
+
+
+class ObservableDict(dict):
+    """ A dict held by a ModelAttribute, which it tells about every change, see ModelAttribute """
+
+    def __init__(self, items=(), attribute=None):
+        dict.__init__(self, items)
+        self.attribute = attribute
+
+    def _event(self, event_type, key, *value):
+        if self.attribute is not None:
+            event = { "type": event_type, "key": key }
+            if value:
+                event["value"] = value[0]
+            self.attribute._item_changed(event) # pylint: disable=protected-access
+
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._event("set", key, value)
+
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._event("delete", key)
+
+    def pop(self, key, *default):
+        present = key in self
+        value = dict.pop(self, key, *default)
+        if present:
+            self._event("delete", key)
+        return value
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        self._event("delete", key)
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if not key in self:
+            self[key] = default
+        return self[key]
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        for key in list(self):
+            del self[key]
+
+
+class computed(): # pylint: disable=invalid-name
+    """
+    Decorates a method of a Model that computes a value from other attributes of the model.
+
+    The result is cached. The model attributes read while the method runs are recorded,
+    including reads made through helper methods or other models, and the value is only
+    computed again, on its next read, after one of them changed. Widgets bound to the
+    computed attribute are checked once after a series of changes, and only updated when
+    its value actually differs.
+
+    Example:
+        class Product(ltk.Model):
+            count: int = 10
+            price: float = 50.0
+
+            @ltk.computed
+            def total(self):
+                return self.count * self.price
+
+        ltk.Text(product.total)
+    """
+    def __init__(self, function):
+        self.function = function
+
+
+class ComputedAttribute(ModelAttribute):
+    """ A model attribute with a value that is computed from other attributes, see computed """
+    __slots__ = ("function", "dependencies", "dependents", "dirty", "pending", "shown")
+    def __init__(self, model: Model, name: str, function): # pylint: disable=super-init-not-called
+        self.model = model
+        self.name = name
+        self.listeners = []
+        self.item_listeners = []
+        self.function = function
+        self.dependencies = []
+        self.dependents = [] # the computed attributes that read this one
+        self._value = None
+        self.dirty = True
+        self.pending = False
+        self.shown = None
+
+    @property
+    def value(self):
+        """ The computed value, computed again when one of its dependencies changed """
+        if _reads:
+            _reads[-1][id(self)] = self
+        if self.dirty:
+            self._compute()
+        return self._value
+
+    def _subscribers(self, dependency):
+        return dependency.dependents if isinstance(dependency, ComputedAttribute) else dependency.listeners
+
+    def _compute(self):
+        for dependency in self.dependencies:
+            subscribers = self._subscribers(dependency)
+            if self._invalidate in subscribers:
+                subscribers.remove(self._invalidate)
+        reads = {}
+        _reads.append(reads)
+        try:
+            value = self.function(self.model)
+            if isinstance(value, ModelAttribute):
+                value = value.value
+        finally:
+            _reads.pop()
+        self._value = value
+        self.dirty = False
+        self.dependencies = list(reads.values())
+        for dependency in self.dependencies:
+            self._subscribers(dependency).append(self._invalidate)
+
+    def _invalidate(self, _=None):
+        """ Mark the value as stale, and check it for the listeners later, see _refresh """
+        if self.dirty:
+            return
+        self.dirty = True
+        for dependent in list(self.dependents):
+            dependent()
+        if self.listeners and not self.pending:
+            self.pending = True
+            self.shown = self._value
+            schedule(self._refresh, f"ltk-computed-{id(self)}")
+
+    def _refresh(self):
+        """ Notify the listeners if the value differs from the one they were last shown """
+        self.pending = False
+        shown, self.shown = self.shown, None
+        if self.listeners and self.value != shown:
+            self.notify()
+
+    def set_value(self, value):
+        raise ValueError(f"Cannot set computed attribute {self.model.__class__.__name__}.{self.name}")
+
+
+class ModelCollection():
+    """
+    An ordered collection of models, identified by a key, that can be bound to container widgets.
+
+    A bound container shows a row widget for each model, created by a row factory. Adding,
+    removing, or moving a model only inserts, removes, or moves the row of that model.
+    Models that stay in the collection keep their row, and changes to their fields are
+    shown by the widgets bound to those fields.
+
+    Args:
+        models: The initial models.
+        key:str|function: The name of the attribute that identifies a model, or a function
+            that returns the key for a model.
+
+    Example:
+        todos = ltk.ModelCollection(Todo.load(), key="id")
+        todos.bind(ltk.VBox(), lambda todo: ltk.Input(todo.note))
+        todos.append(Todo(id="milk", note="Buy milk"))
+    """
+
+    def __init__(self, models=(), key="id"):
+        self.key = key
+        self.models = []
+        self.index = {}
+        self.listeners = []
+        for model in models:
+            self.append(model)
+
+    def get_key(self, model):
+        """ Returns the key that identifies the given model """
+        if callable(self.key):
+            return self.key(model)
+        value = getattr(model, self.key)
+        return value.get_value() if isinstance(value, ModelAttribute) else value
+
+    def get(self, key, default=None):
+        """ Returns the model with the given key """
+        return self.index.get(key, default)
+
+    def __len__(self):
+        return len(self.models)
+
+    def __iter__(self):
+        return iter(self.models)
+
+    def __getitem__(self, index):
+        return self.models[index]
+
+    def _notify(self, event):
+        for listener in self.listeners:
+            listener(event)
+
+    def append(self, model):
+        """ Add the model at the end of the collection """
+        self.insert(len(self.models), model)
+
+    def insert(self, index, model):
+        """ Insert the model at the given index """
+        key = self.get_key(model)
+        if key in self.index:
+            raise ValueError(f"A model with key {key} is already in the collection")
+        index = min(max(index, 0), len(self.models))
+        self.models.insert(index, model)
+        self.index[key] = model
+        self._notify({ "type": "splice", "index": index, "removed": 0, "inserted": [model] })
+
+    def remove(self, model):
+        """ Remove the model from the collection """
+        self.pop(self.models.index(model))
+
+    def pop(self, index=-1):
+        """ Remove the model at the given index and return it """
+        index = index + len(self.models) if index < 0 else index
+        model = self.models.pop(index)
+        del self.index[self.get_key(model)]
+        self._notify({ "type": "splice", "index": index, "removed": 1, "inserted": [] })
+        return model
+
+    def move(self, model, index):
+        """ Move the model to the given index """
+        start = self.models.index(model)
+        self.models.pop(start)
+        index = min(max(index, 0), len(self.models))
+        self.models.insert(index, model)
+        if start != index:
+            self._notify({ "type": "move", "from": start, "to": index })
+
+    def set(self, models):
+        """
+        Replace the models in this collection. Models with a key that is already in the
+        collection are kept, and get the field values of the new model with that key.
+        Bound containers only create, remove, and move the rows that need it.
+        """
+        kept = []
+        index = {}
+        for model in models:
+            key = self.get_key(model)
+            existing = self.index.get(key)
+            if existing is not None and existing is not model:
+                with existing.batch():
+                    for name in _get_schema(model.__class__).fields:
+                        getattr(existing, name).set_value(getattr(model, name).get_value())
+                model = existing
+            kept.append(model)
+            index[key] = model
+        self.models = kept
+        self.index = index
+        self._notify({ "type": "replace", "models": list(kept) })
+
+    def sort(self, key=None, reverse=False):
+        """ Sort the models in place, moving as few rows as possible in bound containers """
+        self.set(sorted(self.models, key=key, reverse=reverse))
+
+    def bind(self, container, create_row):
+        """
+        Show a row for each model in the container, created by calling create_row with the model.
+        The container should have no other children than the rows.
+        """
+        binding = _CollectionBinding(self, container, create_row)
+        self.listeners.append(binding.apply)
+        if container._bindings is None: # pylint: disable=protected-access
+            container._bindings = [] # pylint: disable=protected-access
+        container._bindings.append((self, binding.apply)) # pylint: disable=protected-access
+        return container
+
+
+class _CollectionBinding():
+    """ Keeps the rows in a container in sync with a ModelCollection """
+
+    def __init__(self, collection, container, create_row):
+        self.collection = collection
+        self.container = container
+        self.create_row = create_row
+        self.keys = [collection.get_key(model) for model in collection.models]
+        self.rows = { key: create_row(model) for key, model in zip(self.keys, collection.models) }
+        container.append([self.rows[key] for key in self.keys])
+
+    def apply(self, event):
+        """ Update the rows for the given change to the collection """
+        if event["type"] == "splice":
+            self._splice(event["index"], event["removed"], event["inserted"])
+        elif event["type"] == "move":
+            key = self.keys.pop(event["from"])
+            self.keys.insert(event["to"], key)
+            self._place(self.rows[key], event["to"])
+        else:
+            self._replace(event["models"])
+
+    def _place(self, row, index):
+        """ Put the element of the row at the index, assuming self.keys already has it there """
+        if index + 1 < len(self.keys):
+            self.rows[self.keys[index + 1]].element.before(row.element)
+        else:
+            self.container.element.append(row.element)
+
+    def _splice(self, index, removed, inserted):
+        for key in self.keys[index:index + removed]:
+            self.rows.pop(key).dispose()
+        del self.keys[index:index + removed]
+        for offset, model in enumerate(inserted):
+            key = self.collection.get_key(model)
+            self.keys.insert(index + offset, key)
+            self.rows[key] = self.create_row(model)
+            self._place(self.rows[key], index + offset)
+
+    def _replace(self, models):
+        keys = [self.collection.get_key(model) for model in models]
+        wanted = set(keys)
+        for key in self.keys:
+            if not key in wanted:
+                self.rows.pop(key).dispose()
+        position = { key: n for n, key in enumerate(key for key in self.keys if key in wanted) }
+        stay = _longest_increasing([position.get(key, -1) for key in keys])
+        self.keys = keys
+        following = None
+        for n in range(len(keys) - 1, -1, -1):
+            key = keys[n]
+            row = self.rows.get(key)
+            if row is None:
+                row = self.rows[key] = self.create_row(models[n])
+            elif n in stay:
+                following = row
+                continue
+            if following is None:
+                self.container.element.append(row.element)
+            else:
+                following.element.before(row.element)
+            following = row
+
+
+def _longest_increasing(values):
+    """ Returns the indexes of a longest increasing subsequence of the non-negative values """
+    tails = [] # index of the smallest tail of an increasing subsequence of each length
+    previous = [-1] * len(values)
+    for n, value in enumerate(values):
+        if value < 0:
+            continue
+        low, high = 0, len(tails)
+        while low < high:
+            middle = (low + high) // 2
+            if values[tails[middle]] < value:
+                low = middle + 1
+            else:
+                high = middle
+        previous[n] = tails[low - 1] if low else -1
+        if low == len(tails):
+            tails.append(n)
+        else:
+            tails[low] = n
+    result = set()
+    n = tails[-1] if tails else -1
+    while n >= 0:
+        result.add(n)
+        n = previous[n]
+    return result
+
+
 class Input(Widget):
     """ Wraps an HTML element of type <input> """
     classes = [ "ltk-input" ]
@@ -775,10 +2112,9 @@ class Input(Widget):
     def __init__(self, value, style=None):
         Widget.__init__(self, style or DEFAULT_CSS)
         self.set_value(value)
-        self.on("wheel", proxy(lambda event: None)) # ensure Chrome handles wheel events
 
     def _set_value(self, value):
-        self.element.val(str(value))
+        self.val(str(value))
 
     def _get_value(self):
         return self.element.val()
@@ -791,7 +2127,7 @@ class Checkbox(Widget):
 
     def __init__(self, checked, style=None):
         Widget.__init__(self, style or DEFAULT_CSS)
-        self.element.prop("type", "checkbox")
+        self.prop("type", "checkbox")
         self.set_value(checked)
 
     def check(self, checked):
@@ -830,7 +2166,7 @@ class Slider(Widget):
             "range": "min",
         }))
         self.set_value(value)
-        self.on("slidechange", proxy(lambda *args: self.trigger("change")))
+        self.on("slidechange", lambda *args: self.trigger("change"))
 
     def _set_value(self, value):
         if value != self._get_value():
@@ -864,7 +2200,7 @@ class Switch(HBox):
             self.checkbox
                 .attr("id", element_id)
                 .addClass("ltk-switch-checkbox")
-                .on("change", proxy(toggle_edit)),
+                .on("change", toggle_edit),
             Label("")
                 .attr("value", "edit:")
                 .attr("for", element_id)
@@ -906,7 +2242,7 @@ class Label(Widget):
             element = self.input_widget.element if isinstance(self.input_widget, Widget) else self.input_widget
             self.element.empty().append(element, value)
         else:
-            self.element.html(value)
+            self.html(value)
 
 
 class Button(Widget):
@@ -924,8 +2260,8 @@ class Button(Widget):
             style:dict [optional] CSS values to set on the element
         """
         Widget.__init__(self, style or DEFAULT_CSS)
-        self.element.html(label)
-        self.on("click", proxy(click))
+        self.html(label)
+        self.on("click", click)
 
 
 class Link(Text):
@@ -1013,14 +2349,40 @@ class ListItem(Container):
 
 
 class Tabs(Widget):
-    """ Wraps an HTML element of type jQueryUI tabs """
+    """
+    Wraps an HTML element of type jQueryUI tabs.
+
+    Tabs can be widgets with a "name" attribute, or (label, factory) tuples. A factory is
+    a function that returns the widget for the panel. It is only called when the tab is
+    activated for the first time, so only the visible tab is created at startup.
+
+    Args:
+        *tabs: The tabs, as widgets or (label, factory) tuples.
+        max_panels:int: The maximum number of panels created by a factory to keep. When more
+            are created, the least recently activated inactive panel is disposed, to be
+            created again by its factory when it is activated again.
+        prefetch:bool: Whether to create the panels of the neighboring tabs when the browser
+            is idle, so they show without delay when activated.
+
+    Example:
+        ltk.Tabs(
+            ltk.Text("Home").attr("name", "Home"),
+            ("Reports", create_reports),
+            prefetch=True,
+        )
+    """
     classes = [ "ltk-tabs" ]
     tag = "div"
     count = 0
 
-    def __init__(self, *tabs):
+    def __init__(self, *tabs, max_panels=None, prefetch=False):
         self.name = f"ltk-tabs-{Tabs.count}"
         Tabs.count += 1
+        self.max_panels = max_panels
+        self.prefetch = prefetch
+        self.panels = []
+        self.factories = {}
+        self.created = []
         self.labels = UnorderedList()
         Widget.__init__(self, self.labels)
         self.attr("id", self.name)
@@ -1028,15 +2390,67 @@ class Tabs(Widget):
             self.add_tab(tab)
         self._handle_css(tabs)
         self.tabs()
-        self.on("tabsactivate", proxy(lambda *args: self.find(".ltk-split-pane").trigger("layout")))
-
-    def add_tab(self, tab):
-        """ Adds a new tab """
-        tab_id = f"{self.name}-{self.labels.children().length}"
+        self.on("tabsbeforeactivate", lambda event, ui: self._before_activate(ui))
+        self.on("tabsactivate", lambda *args: self.find(".ltk-split-pane").trigger("layout"))
+        schedule(lambda: self._load(self.active()), f"{self.name}-load") # after any call to activate
+
+    def add_tab(self, tab, label=None):
+        """ Adds a new tab, either a widget or a factory function with a label """
+        if isinstance(tab, tuple):
+            label, tab = tab
+        tab_id = f"{self.name}-{len(self.panels)}"
+        panel = Div()
+        panel.attr("id", tab_id)
+        if label is not None and callable(tab):
+            self.factories[len(self.panels)] = label, tab
+        else:
+            panel.append(tab)
+            label = label or tab.attr("name")
         self.labels.append(
-            ListItem().append(Link(f"#{tab_id}").text(tab.attr("name")))
+            ListItem().append(Link(f"#{tab_id}").text(label))
         )
-        self.append(Div(tab).attr("id", tab_id))
+        self.panels.append(panel)
+        self.append(panel)
+
+    def _before_activate(self, ui):
+        tab_id = ui.newPanel.attr("id")
+        if tab_id and tab_id.startswith(f"{self.name}-"):
+            self._load(int(tab_id.split("-")[-1]))
+
+    def _load(self, index):
+        """ Create the panel at the given index, evict old panels, and prefetch neighbors """
+        if not index in self.factories:
+            return
+        self._create(index)
+        self.created.remove(index)
+        self.created.append(index)
+        self._evict(index)
+        if self.prefetch:
+            for neighbor in [index + 1, index - 1]:
+                if neighbor in self.factories and not neighbor in self.created:
+                    schedule(lambda neighbor=neighbor: self._prefetch(neighbor), f"{self.name}-prefetch-{neighbor}", priority="idle")
+
+    def _create(self, index):
+        if not index in self.created:
+            label, factory = self.factories[index]
+            with startup.phase(f"tab {label}"):
+                self.panels[index].append(factory())
+            self.created.insert(0, index)
+
+    def _prefetch(self, index):
+        if not index in self.created:
+            self._create(index)
+            self._evict(self.active())
+
+    def _evict(self, active):
+        if self.max_panels is None:
+            return
+        for index in list(self.created):
+            if len(self.created) <= self.max_panels:
+                break
+            if index != active:
+                self.created.remove(index)
+                self.panels[index].empty()
 
     def active(self):
         """ Returns the index of the active tab """
@@ -1062,7 +2476,7 @@ class File(Widget):
 
     def __init__(self, handler=None, style=None):
         Widget.__init__(self, style or DEFAULT_CSS)
-        self.element.attr("type", "file")
+        self.attr("type", "file")
 
         @callback
         def _handle_content(event):
@@ -1095,7 +2509,7 @@ class DatePicker(Widget):
 
     def __init__(self, style=None):
         Widget.__init__(self, style or DEFAULT_CSS)
-        self.element.attr("type", "date")
+        self.attr("type", "date")
 
 
 class ColorPicker(Widget):
@@ -1105,7 +2519,7 @@ class ColorPicker(Widget):
 
     def __init__(self, style=None):
         Widget.__init__(self, style or DEFAULT_CSS)
-        self.element.attr("type", "color")
+        self.attr("type", "color")
 
 
 class RadioGroup(VBox):
@@ -1139,6 +2553,7 @@ class Table(Widget):
         Widget.__init__(self)
         self.element = (
             window.table()
+                .attr("ltk_id", self._ltk_id)
                 .addClass(" ".join(self.classes))
                 .append(*self._flatten(rows))
         )
@@ -1155,6 +2570,26 @@ class Table(Widget):
         """ Sets the value of a cell """
         window.tableSet(self.element, column, row, str(value))
 
+    def set_range(self, row, column, matrix):
+        """
+        Sets the values of a block of cells using a single call into JavaScript.
+
+        Args:
+            row:int: The index of the first row of the block
+            column:int: The index of the first column of the block
+            matrix:list: A list of rows, where each row is a list of values
+        """
+        values = [[str(value) for value in values] for values in matrix]
+        window.tableSetRange(self.element, row, column, json.dumps(values))
+
+    def set_rows(self, start, rows):
+        """ Sets the values of consecutive rows, starting at row start, using a single call into JavaScript """
+        self.set_range(start, 0, rows)
+
+    def set_column(self, column, values, start=0):
+        """ Sets the values of a column, starting at row start, using a single call into JavaScript """
+        self.set_range(start, column, [[value] for value in values])
+
 
 class TableRow(Widget):
     """ Wraps an HTML element of type <tr> """
@@ -1174,6 +2609,422 @@ class TableData(Widget):
     tag = "td"
 
 
+class _HeightIndex():
+    """ The heights of the rows in a VirtualList, kept in a Fenwick tree to find offsets quickly """
+
+    def __init__(self, count, height):
+        self.count = count
+        self.heights = [height] * count
+        self.tree = [0] + self.heights
+        for index in range(1, count + 1):
+            parent = index + (index & -index)
+            if parent <= count:
+                self.tree[parent] += self.tree[index]
+
+    def extend(self, count, height):
+        """ Add rows with the given estimated height """
+        for _ in range(count):
+            self.count += 1
+            self.heights.append(height)
+            lowest = self.count & -self.count
+            self.tree.append(height + self.offset(self.count - 1) - self.offset(self.count - lowest))
+
+    def set(self, index, height):
+        """ Set the measured height of a row """
+        delta = height - self.heights[index]
+        self.heights[index] = height
+        index += 1
+        while index <= self.count:
+            self.tree[index] += delta
+            index += index & -index
+
+    def offset(self, index):
+        """ Return the sum of the heights of the rows before the given row """
+        total = 0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+    def find(self, offset):
+        """ Return the index of the row at the given offset """
+        index = 0
+        step = 1 << self.count.bit_length()
+        while step:
+            if index + step <= self.count and self.tree[index + step] <= offset:
+                index += step
+                offset -= self.tree[index]
+            step >>= 1
+        return min(index, self.count - 1)
+
+
+class VirtualList(Widget):
+    """
+    Shows a long list of rows while only creating widgets for the rows that are visible.
+
+    Rows are positioned absolutely inside a scrolling container. While scrolling, rows
+    that move out of view are reused for rows that move into view. Row heights start at
+    an estimate and are measured once shown, so rows can have different heights.
+
+    Args:
+        items: A Python sequence with the items to show, or the number of rows.
+        create_row: A function that receives the index of a row and returns a widget for it.
+            By default, a Text widget is created with the item at that index.
+        update_row: A function that receives a row widget and the index of the row it now shows.
+            By default, the text of the row is set to the item at that index. When None is passed
+            with a custom create_row, rows that move out of view are disposed instead.
+        row_height: The estimated height of a row in pixels.
+        overscan: The number of rows to render above and below the visible rows.
+
+    Example:
+        ltk.VirtualList(
+            100_000,
+            lambda index: ltk.HBox(ltk.Text(index), ltk.Text(names[index])),
+        ).css("height", 400)
+    """
+    classes = [ "ltk-virtual-list" ]
+
+    def __init__(self, items, create_row=None, update_row=None, row_height=24, overscan=8, style=None):
+        Widget.__init__(self, style or DEFAULT_CSS)
+        if create_row is None:
+            create_row = lambda index: Text(_escape(self.items[index]))
+            update_row = update_row or (lambda row, index: row.text(str(self.items[index])))
+        self.create_row = create_row
+        self.update_row = update_row
+        self.row_height = row_height
+        self.overscan = overscan
+        self.items = []
+        self.index = _HeightIndex(0, row_height)
+        self.rows = {}
+        self.tops = {}
+        self.pool = []
+        self.viewport = (0, 0)
+        self.spacer = Div()
+        self.spacer.addClass("ltk-virtual-spacer")
+        self.append(self.spacer)
+        self.on("scroll", lambda event: self.layout())
+        self.on("layout", lambda event: self.layout())
+        self._window_resize = self._proxy(lambda *args: self.layout())
+        window.addEventListener("resize", self._window_resize)
+        self.set_items(items)
+
+    def set_items(self, items):
+        """
+        Show a new sequence of items, or a new number of rows. The rows currently in view
+        are updated. Measured heights are kept when rows are only added at the end.
+        """
+        count = items if isinstance(items, int) else len(items)
+        self.items = items
+        if count < self.index.count:
+            self.index = _HeightIndex(count, self.row_height)
+        else:
+            self.index.extend(count - self.index.count, self.row_height)
+        for index in list(self.rows):
+            self._release_row(index)
+        self.layout()
+
+    def layout(self):
+        """ Render the rows in view in the next animation frame """
+        measure(self._measure, f"virtual-list-{self._ltk_id}")
+
+    def scroll_to(self, index):
+        """ Scroll the list so that the row at the given index is at the top """
+        mutate(lambda: self.element.scrollTop(self.index.offset(index)), f"virtual-list-scroll-{self._ltk_id}")
+
+    def _measure(self):
+        geometry = self.geometry()
+        self.viewport = (geometry["scroll_top"], geometry["height"])
+        mutate(self._render, f"virtual-list-{self._ltk_id}")
+
+    def _render(self):
+        scroll_top, height = self.viewport
+        if self.index.count:
+            first = max(0, self.index.find(scroll_top) - self.overscan)
+            last = min(self.index.count - 1, self.index.find(scroll_top + height) + self.overscan)
+        else:
+            first, last = 0, -1
+        for index in [index for index in self.rows if index < first or index > last]:
+            self._release_row(index)
+        created = []
+        for index in range(first, last + 1):
+            if index in self.rows:
+                continue
+            if self.pool:
+                row = self.pool.pop()
+                self.update_row(row, index)
+            else:
+                with deferred():
+                    row = self.create_row(index)
+                    row.addClass("ltk-virtual-row")
+                created.append(row)
+            self.rows[index] = row
+        self._position(first, last)
+        _create_elements(created)
+        self.append(*created)
+        self.spacer.transaction().css("height", self.index.offset(self.index.count))
+        measure(self._measure_rows, f"virtual-list-rows-{self._ltk_id}")
+
+    def _position(self, first, last):
+        for index in range(first, last + 1):
+            top = self.index.offset(index)
+            if self.tops.get(index) != top:
+                self.tops[index] = top
+                self.rows[index].transaction().css({ "top": top, "display": "" })
+
+    def _release_row(self, index):
+        row = self.rows.pop(index)
+        self.tops.pop(index, None)
+        if self.update_row:
+            self.pool.append(row)
+            row.transaction().css("display", "none")
+        else:
+            row.dispose()
+
+    def _measure_rows(self):
+        indexes = sorted(self.rows)
+        if not indexes:
+            return
+        heights = json.loads(window.ltkHeights(*[self.rows[index].element for index in indexes]))
+        changed = False
+        for index, height in zip(indexes, heights):
+            if height and height != self.index.heights[index]:
+                self.index.set(index, height)
+                changed = True
+        if changed:
+            self.layout()
+
+    def _release(self):
+        window.removeEventListener("resize", self._window_resize)
+        Widget._release(self)
+
+
+def _column_store(values):
+    """ Store the values of a column in a typed array, or keep them as is for NumPy arrays """
+    if hasattr(values, "dtype"):
+        return values
+    values = list(values)
+    try:
+        if all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+            return array("q", values)
+        if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+            return array("d", values)
+    except (OverflowError, ValueError):
+        pass
+    return values
+
+
+class DataGrid(Widget):
+    """
+    Shows a large table with data stored in Python as columns, only creating elements
+    for the cells that are visible.
+
+    Numeric columns are stored in typed arrays, NumPy arrays are used as they are.
+    Sorting computes a permutation of the rows per column, and filtering computes a
+    bitmap per column. Both are kept as indexes, so sorting and filtering again only
+    combines them and redraws the visible cells, using a single call into JavaScript.
+    Column titles can be resized by dragging their right edge and sort when clicked.
+
+    Args:
+        columns:dict: The column names mapped to sequences of values of equal length
+        row_height:int: The height of each row in pixels
+        column_width:int: The initial width of each column in pixels
+        overscan:int: The number of rows to render above and below the visible rows
+
+    Example:
+        grid = ltk.DataGrid({
+            "symbol": symbols,
+            "price": numpy.array(prices),
+        }).css("height", 600)
+        grid.sort("price", descending=True)
+        grid.filter("symbol", lambda symbol: symbol.startswith("A"))
+    """
+    classes = [ "ltk-datagrid" ]
+
+    def __init__(self, columns, row_height=24, column_width=120, overscan=4, style=None):
+        Widget.__init__(self, style or DEFAULT_CSS)
+        self.row_height = row_height
+        self.column_width = column_width
+        self.overscan = overscan
+        self.names = []
+        self.columns = {}
+        self.widths = []
+        self.titles = []
+        self.sorts = {}
+        self.predicates = {}
+        self.filters = {}
+        self.sorting = None
+        self.count = 0
+        self.mask = None
+        self.view = range(0)
+        self.viewport = (0, 0, 0, 0)
+        self.header = Div()
+        self.header.addClass("ltk-datagrid-header")
+        self.header.css("height", row_height)
+        self.body = Div()
+        self.body.addClass("ltk-datagrid-body")
+        self.append(self.header, self.body)
+        for name, values in columns.items():
+            self.set_column(name, values)
+        self.on("scroll", lambda event: self.layout())
+        self.on("layout", lambda event: self.layout())
+        self._window_resize = self._proxy(lambda *args: self.layout())
+        window.addEventListener("resize", self._window_resize)
+
+    def set_column(self, name, values):
+        """
+        Set the values of an existing column, or add a new column at the end.
+        Raises a ValueError when the other columns have a different number of values.
+        """
+        store = _column_store(values)
+        for other, column in self.columns.items():
+            if other != name and len(column) != len(store):
+                raise ValueError(f"Column {name} has {len(store)} values, but column {other} has {len(column)}")
+        if not name in self.columns:
+            self._add_title(name)
+        self.columns[name] = store
+        self.count = len(store)
+        self.sorts.pop(name, None)
+        if name in self.predicates:
+            self.filters[name] = self._bitmap(name, self.predicates[name])
+            self._combine_filters()
+        self._update_view()
+
+    def sort(self, name=None, descending=False):
+        """ Sort the rows by the values in the given column, or show them in their original order """
+        self.sorting = (name, descending) if name else None
+        self._update_view()
+
+    def filter(self, name, predicate=None):
+        """
+        Only show rows for which the predicate returns True for the value in the given column.
+        For NumPy columns, the predicate receives the entire column and returns a boolean array,
+        such as `lambda prices: prices > 100`. Pass None as predicate to remove the filter.
+        """
+        if predicate is None:
+            self.predicates.pop(name, None)
+            self.filters.pop(name, None)
+        else:
+            self.predicates[name] = predicate
+            self.filters[name] = self._bitmap(name, predicate)
+        self._combine_filters()
+        self._update_view()
+
+    def layout(self):
+        """ Render the visible cells in the next animation frame """
+        measure(self._measure, f"datagrid-{self._ltk_id}")
+
+    def _add_title(self, name):
+        index = len(self.names)
+        self.names.append(name)
+        self.widths.append(self.column_width)
+        title = Div(_escape(name))
+        title.addClass("ltk-datagrid-title")
+        title.css({ "left": sum(self.widths[:-1]), "width": self.column_width, "height": self.row_height })
+        title.on("click", lambda event: self._click_title(event, name))
+        title.on("resize", lambda event, ui: self._resize_column(index, ui.size.width))
+        title.element.resizable(to_js({ "handles": "e" }))
+        self.titles.append(title)
+        self.header.append(title)
+
+    def _click_title(self, event, name):
+        if window.jQuery(event.target).hasClass("ui-resizable-handle"):
+            return
+        descending = self.sorting == (name, False)
+        self.sort(name, descending)
+
+    def _resize_column(self, index, width):
+        self.widths[index] = width
+        left = sum(self.widths[:index + 1])
+        for title, width in zip(self.titles[index + 1:], self.widths[index + 1:]):
+            title.transaction().css("left", left)
+            left += width
+        self.layout()
+
+    def _permutation(self, name, descending):
+        """ Returns the row order for the column, keeping rows with equal values in their original order """
+        sorts = self.sorts.setdefault(name, {})
+        if not descending in sorts:
+            values = self.columns[name]
+            if hasattr(values, "argsort") and descending:
+                last = len(values) - 1
+                sorts[descending] = last - values[::-1].argsort(kind="stable")[::-1]
+            elif hasattr(values, "argsort"):
+                sorts[descending] = values.argsort(kind="stable")
+            else:
+                order = sorted(range(len(values)), key=values.__getitem__, reverse=descending)
+                sorts[descending] = array("l", order)
+        return sorts[descending]
+
+    def _bitmap(self, name, predicate):
+        values = self.columns[name]
+        if hasattr(values, "dtype"):
+            return predicate(values)
+        return bytearray(1 if predicate(value) else 0 for value in values)
+
+    def _combine_filters(self):
+        bitmaps = list(self.filters.values())
+        if not bitmaps:
+            self.mask = None
+        elif any(hasattr(bitmap, "dtype") for bitmap in bitmaps):
+            import numpy # pylint: disable=import-outside-toplevel,import-error
+            mask = numpy.ones(self.count, dtype=bool)
+            for bitmap in bitmaps:
+                mask &= numpy.asarray(bitmap, dtype=bool)
+            self.mask = mask
+        else:
+            mask = int.from_bytes(bitmaps[0], "little")
+            for bitmap in bitmaps[1:]:
+                mask &= int.from_bytes(bitmap, "little")
+            self.mask = mask.to_bytes(self.count, "little")
+
+    def _update_view(self):
+        order = range(self.count)
+        if self.sorting:
+            order = self._permutation(*self.sorting)
+        mask = self.mask
+        if mask is None:
+            self.view = order
+        elif hasattr(mask, "dtype") and isinstance(order, range):
+            self.view = mask.nonzero()[0]
+        elif hasattr(mask, "dtype") and hasattr(order, "dtype"):
+            self.view = order[mask[order]]
+        else:
+            self.view = array("l", [index for index in order if mask[index]])
+        self.layout()
+
+    def _measure(self):
+        geometry = self.geometry()
+        self.viewport = (geometry["scroll_top"], geometry["scroll_left"], geometry["width"], geometry["height"])
+        mutate(self._render, f"datagrid-{self._ltk_id}")
+
+    def _render(self):
+        scroll_top, scroll_left, width, height = self.viewport
+        count = len(self.view)
+        visible_height = height - self.row_height # the sticky header covers the top of the body
+        first = max(0, int(scroll_top // self.row_height) - self.overscan)
+        last = min(count, math.ceil((scroll_top + visible_height) / self.row_height) + self.overscan)
+        columns = []
+        left = 0
+        for name, column_width in zip(self.names, self.widths):
+            if left + column_width > scroll_left and left < scroll_left + width:
+                columns.append((name, left, column_width))
+            left += column_width
+        rows = [self.view[n] for n in range(first, last)]
+        total_width = left
+        window.ltkGrid(self.body.element, json.dumps({
+            "rows": [n * self.row_height for n in range(first, last)],
+            "columns": [[column_left, column_width] for _, column_left, column_width in columns],
+            "values": [[str(self.columns[name][row]) for name, _, _ in columns] for row in rows],
+            "row_height": self.row_height,
+            "height": count * self.row_height,
+            "width": total_width,
+        }))
+
+    def _release(self):
+        window.removeEventListener("resize", self._window_resize)
+        Widget._release(self)
+
+
 class SplitPane(Div):
     """ Lays out its child widgets horizontally or vertically with a resize handle in the center """
 
@@ -1192,9 +3043,15 @@ class SplitPane(Div):
         self.layout()
 
     def layout(self):
-        """ Lays out the split pane """
+        """ Lays out the split pane in the next animation frame """
+        measure(self._measure, f"layout-{self.key}")
+
+    def _measure(self):
         size = self.get_size(self)
         middle = self.get_size(self.middle)
+        mutate(lambda: self._layout(size, middle), f"layout-{self.key}")
+
+    def _layout(self, size, middle):
         self.set_size(self.first, f"{self.ratio * size + middle}")
         self.set_size(self.last, f"{(1.0 - self.ratio) * size - middle}")
         self.set_position(self.middle, 0)
@@ -1218,7 +3075,7 @@ class SplitPane(Div):
                 .addClass(f"ltk-{self.direction}-split-pane-middle")
                 .draggable()
                 .draggable("option", "axis", self.axis)
-                .draggable("option", "stop", proxy(lambda *args: self.resize())),
+                .draggable("option", "stop", self._proxy(lambda *args: self.resize())),
              self.last
                 .addClass(f"ltk-{self.direction}-split-pane-last")
         )
@@ -1226,11 +3083,16 @@ class SplitPane(Div):
         self.addClass("ltk-split-pane")
         self.restore()
         self.layout()
-        self.on("layout", proxy(
+        self.on("layout",
             lambda event: self.layout() if event.target.id == self.key else None
-        ))
+        )
         schedule(self.layout, f"layout-{self.key}")
-        window.addEventListener("resize", proxy(lambda *args: self.layout()))
+        self._window_resize = self._proxy(lambda *args: self.layout())
+        window.addEventListener("resize", self._window_resize)
+
+    def _release(self):
+        window.removeEventListener("resize", self._window_resize)
+        Div._release(self)
 
 
 class HorizontalSplitPane(SplitPane):
@@ -1296,7 +3158,7 @@ class TextArea(Widget):
 
     def __init__(self, text="", style=None):
         Widget.__init__(self, style or DEFAULT_CSS)
-        self.element.text(text)
+        self.text(text)
 
 
 class Code(Widget):
@@ -1350,7 +3212,7 @@ class MenuLabel(Widget):
 
     def __init__(self, label, style=None):
         Widget.__init__(self, style or DEFAULT_CSS)
-        self.element.html(label)
+        self.html(label)
 
 
 class Menu(Widget):
@@ -1361,8 +3223,7 @@ class Menu(Widget):
         self.label = MenuLabel(label)
         self.popup = MenuPopup(*items)
         Widget.__init__(self, self.label, self.popup, style or DEFAULT_CSS)
-        self.label.on("click", None, None, proxy(lambda event: self.show(event))) # pylint: disable=unnecessary-lambda
-        self.label.on("click", None, None, proxy(lambda event: self.show(event))) # pylint: disable=unnecessary-lambda
+        self.label.on("click", None, None, lambda event: self.show(event)) # pylint: disable=unnecessary-lambda
 
     def replace_other(self, event):
         """ Replaces the menu with the other menu """
@@ -1385,13 +3246,12 @@ class Popup(Widget):
     def show(self, element):
         """ Closes all existing popups and shows the popup """
         _close_all_menus()
+        _listen_for_clicks()
         body_width = window.jQuery(window.document.body).width()
-        (self
-            .appendTo(window.jQuery(window.document.body))
-            .css("top", element.offset().top + 28)
-            .css("left", min(element.offset().left + 2, body_width - self.width() - 12))
-        )
-        schedule(proxy(lambda: self.css("display", "block")), "ltk-menupopup")
+        offset = element.offset()
+        self.appendTo(window.jQuery(window.document.body))
+        left = min(offset.left + 2, body_width - self.width() - 12)
+        self.transaction().css({ "top": offset.top + 28, "left": left, "display": "block" })
         return self
 
     def close(self):
@@ -1416,12 +3276,13 @@ class MenuItem(Widget):
             Text(shortcut).addClass("ltk-menuitem-shortcut"),
         ] if shortcut else [])
         Widget.__init__(self, items, style or DEFAULT_CSS)
-        self.on("click", proxy(lambda event: self.select(event))) # pylint: disable=unnecessary-lambda
-        self.on("select", proxy(lambda event: self.select(event))) # pylint: disable=unnecessary-lambda
+        self.on("click", lambda event: self.select(event)) # pylint: disable=unnecessary-lambda
+        self.on("select", lambda event: self.select(event)) # pylint: disable=unnecessary-lambda
         if shortcut in BROWSER_SHORTCUTS:
             raise ValueError(f"Cannot capture shortcut {shortcut} as the browser won't allow that")
         if shortcut:
             shortcuts[shortcut] = self
+            _handle_shortcuts()
         self.label = label
         self.selected = selected
 
@@ -1443,7 +3304,7 @@ class Select(Widget):
         self.options = options
         self.handler = handler
         self.set_value(selected)
-        self.on("change", proxy(lambda event: schedule(self.changed, f"{self}.changed")))
+        self.on("change", lambda event: schedule(self.changed, f"{self}.changed"))
 
     def get_selected_index(self):
         """  Returns the index of the selected option """
@@ -1502,209 +3363,65 @@ class Option(Text):
     tag = "option"
 
 
-class Step(Div):
-    """ Represents a step in a tutorial """
-    classes = [ "ltk-step" ]
-
-    def __init__(self, widget, buttons, content):
-        Div.__init__(self, buttons, content)
-        self.content = content
-        self.widget = widget
-        self.draggable()
-        self.draggable("option", "drag", proxy(lambda *args: (
-            schedule(self.show_arrow, "ltk-step-draw-arrow")
-        )))
-        self.on("mouseenter", proxy(lambda event: self.show_arrow()))
-
-    def show(self):
-        """ Shows the tutorial step """
-        if not getattr(self.widget, "is")(":visible"):
-            return
-        find(".ltk-step").remove()
-        self.appendTo(find("body"))
-        self.css(to_js({
-            "visibility": "visible",
-            "position": "absolute",
-            "opacity": 1,
-            "left": self.widget.offset().left + self.widget.outerWidth() + 100,
-            "top": self.widget.offset().top,
-            "width": "fit-content",
-        }))
-        self.show_arrow()
-
-    def show_arrow(self):
-        """ Shows the arrow to indicate which widget the step is for """
-        find(".leader-line").remove()
-        source = self.element
-        target = self.widget.element if hasattr(self.widget, "element") else self.widget
-        schedule(proxy(lambda: window.addArrow(source, target)), "ltk-step-show-arrow")
-
-    def hide(self):
-        """ Hides the tutorial step """
-        self.remove()
-
-
-class Tutorial():
-    """ Creates a tutorial """
-    tag = None
-
-    def __init__(self, steps):
-        self.steps = steps
-        self.index = 0
-        self.steps = steps
-
-    def run(self):
-        """ Runs the tutorial """
-        self.index = 0
-        self.show()
-
-    def close(self):
-        """ Closes the tutorial """
-        find(".leader-line, .ltk-step").remove()
-
-    def previous(self):
-        """ Goes to the previous step """
-        self.close()
-        if self.index > 0:
-            self.index -= 1
-            self.show()
-
-    def next(self):
-        """ Goes to the next step """
-        self.close()
-        if self.index < len(self.steps):
-            self.index += 1
-            self.show()
-
-    def event(self, index):
-        """ Handles the event for the current step """
-        if index == self.index:
-            self.next()
-
-    def show(self):
-        """ Shows the current step """
-        if self.index < 0 or self.index >= len(self.steps):
-            return
-        selector, event, content = self.steps[self.index]
-        buttons = HBox(
-            Text("⟸").on("click", proxy(lambda *args: self.previous())),
-            Text("⟹").on("click", proxy(lambda *args: self.next())),
-            Text("x").on("click", proxy(lambda *args: self.close())),
-        ).addClass("ltk-step-buttons")
-        widget = find(selector)
-        Step(widget, buttons, content).show()
-        index = self.index
-        widget.on(event, proxy(lambda *args: self.event(index)))
-
-
-class Canvas(Widget):
-    """  Wraps an HTML element of type <canvas> """
-    classes = [ "ltk-canvas" ]
-    tag = "canvas"
-
-    def __init__(self, style=None) -> None:
-        self._context = None
-        self._font = None
-        self._fill_style = None
-        self._stroke_style = None
-        Widget.__init__(self, style or DEFAULT_CSS)
-
-    def __getattr__(self, name):
-        try:
-            return getattr(self.element, name)
-        except: # pylint: disable=bare-except
-            try:
-                return getattr(self.context, name)
-            except: # pylint: disable=bare-except
-                error = f"Widget {self} does not have attribute {name}"
-                raise AttributeError(error) # pylint: disable=raise-missing-from
-
-    def __setattr__(self, name, value):
-        if name != "_context" and self._context and hasattr(self._context, name):
-            setattr(self._context, name, value)
-        elif name != "_context" and hasattr(self.element, name):
-            setattr(self.element, name, value)
-        else:
-            super().__setattr__(name, value)
-
-    @property
-    def context(self):
-        """ The context for the canvas """
-        if self._context is None:
-            self._context = self.element[0].getContext("2d")
-        return self._context
-
-    @property
-    def stroke_style(self):
-        """ The stroke style for the canvas """
-        return self._stroke_style
-
-    @stroke_style.setter
-    def stroke_style(self, value):
-        if self._stroke_style != value:
-            self._stroke_style = value
-            self.context.strokeStyle = value
+def _close_all_menus(event=None):
+    if event and window.jQuery(event.target).hasClass("ltk-menulabel"):
+        return
+    find(".ltk-menupopup-open").removeClass("ltk-menupopup-open")
+    find(".ltk-menupopup, .ltk-popup").css("display", "none")
 
-    @property
-    def fill_style(self):
-        """ The fill style for the canvas """
-        return self._fill_style
 
-    @fill_style.setter
-    def fill_style(self, value):
-        if self._fill_style != value:
-            self._fill_style = value
-            self.context.fillStyle = value
+def _listen_for_clicks():
+    """ Close menus and popups when clicking elsewhere, listening from the first one shown """
+    if not listening["click"]:
+        listening["click"] = True
+        window.jQuery(window.document.body).on("click", proxy(_close_all_menus))
 
-    @property
-    def font(self):
-        """ The font for the canvas """
-        return self._font
 
-    @font.setter
-    def font(self, value):
-        if self._font != value:
-            self._font = value
-            self.context.font = value
+def _save_models(*args): # pylint: disable=unused-argument
+    """ Save all LocalStorageModels with unsaved changes, and then their manifests """
+    _unsaved_since["time"] = None
+    for model in list(_unsaved.values()):
+        model._write() # pylint: disable=protected-access
+    _save_manifests()
 
-    def line(self, x1, y1, x2, y2):
-        """ Draws a line on the canvas """
-        window.canvas.line(self.context, x1, y1, x2, y2)
 
-    def text(self, x, y, text): # pylint: disable=arguments-differ
-        """ Draws the outline of a text on the canvas """
-        window.canvas.text(self.context, x, y, text)
+def _save_manifests():
+    """ Save the manifest of each LocalStorageModel class that has new models """
+    while _dirty_manifests:
+        _dirty_manifests.pop()._save_manifest() # pylint: disable=protected-access
 
-    def fill_text(self, x, y, text):
-        """ Fills a text on the canvas """
-        self.context.fillText(text, x, y)
 
-    def rect(self, x, y, w, h):
-        """ Draws a rectangle on the canvas """
-        window.canvas.rect(self.context, x, y, w, h)
+def _save_models_later():
+    """ Save models when the browser is idle, listening for the page to hide from the first change """
+    if not listening["pagehide"]:
+        listening["pagehide"] = True
+        save = proxy(_save_models)
+        window.addEventListener("pagehide", save)
+        window.document.addEventListener("visibilitychange", save)
+    current = now()
+    if _unsaved_since["time"] is None:
+        _unsaved_since["time"] = current
+    deadline = _unsaved_since["time"] + MAX_STORE_DELAY_SECONDS # do not postpone saving forever
+    delay = max(0, min(STORE_DELAY_SECONDS, deadline - current))
+    schedule(_save_models, "ltk-save-models", delay, priority="idle")
 
-    def fill_rect(self, x, y, w, h):
-        """ Fills a rectangle on the canvas """
-        self.context.fillRect(x, y, w, h)
 
-    def circle(self, x, y, radius):
-        """ Draws a circle on the canvas """
-        window.canvas.circle(self.context, x, y, radius)
+def _inspect(element):
+    widget = widgets.get(element.attr("ltk_id"))
+    if Widget.INSPECT and widget:
+        _get_inspector().show(widget)
 
-    def fill_circle(self, x, y, radius):
-        """ Fills a circle on the canvas """
-        window.canvas.fillCircle(self.context, x, y, radius)
 
+def _hide_inspector():
+    if Widget._inspector: # pylint: disable=protected-access
+        Widget._inspector.hide() # pylint: disable=protected-access
 
-def _close_all_menus(event=None):
-    if event and window.jQuery(event.target).hasClass("ltk-menulabel"):
-        return
-    find(".ltk-menupopup-open").removeClass("ltk-menupopup-open")
-    find(".ltk-menupopup, .ltk-popup").css("display", "none")
+if Widget.INSPECT and not pyscript.RUNNING_IN_WORKER:
+    window.ltkInspect(proxy(_inspect), proxy(_hide_inspector))
 
-window.jQuery(window.document.body).on("click", proxy(_close_all_menus))
 
 def _handle_shortcuts():
+    """ Handle keyboard shortcuts, listening from the first shortcut that is registered """
     def handle_keydown(event):
         try:
             shortcut = f"{'Cmd+' if event.metaKey else ''}{event.key.upper()}"
@@ -1713,7 +3430,6 @@ def _handle_shortcuts():
         if shortcut in shortcuts:
             event.preventDefault()
             shortcuts[shortcut].select(event)
-    window.jQuery(window.document).on("keydown", proxy(handle_keydown))
-
-
-_handle_shortcuts()
+    if not listening["keydown"]:
+        listening["keydown"] = True
+        window.jQuery(window.document).on("keydown", proxy(handle_keydown))
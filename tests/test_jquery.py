@@ -0,0 +1,126 @@
+# pylint: skip-file
+
+import sys
+import unittest
+import ltk
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from ltk.jquery import _run_frame
+from ltk.jquery import _run_idle
+from ltk.jquery import _run_timers
+from ltk.jquery import window
+
+
+class TestMeasureMutate(unittest.TestCase):
+    def test_reads_before_writes(self):
+        calls = []
+        ltk.mutate(lambda: calls.append("write 1"))
+        ltk.measure(lambda: calls.append("read 1"))
+        ltk.mutate(lambda: calls.append("write 2"))
+        ltk.measure(lambda: calls.append("read 2"))
+        _run_frame()
+        self.assertEqual(calls, ["read 1", "read 2", "write 1", "write 2"])
+
+    def test_coalesce_by_key(self):
+        calls = []
+        for n in range(10):
+            ltk.mutate(lambda n=n: calls.append(n), "key")
+        _run_frame()
+        self.assertEqual(calls, [9])
+
+    def test_read_after_write_runs_in_same_frame(self):
+        calls = []
+        def write():
+            calls.append("write")
+            ltk.measure(lambda: calls.append("read"))
+        ltk.mutate(write)
+        _run_frame()
+        self.assertEqual(calls, ["write", "read"])
+
+
+class TestSchedule(unittest.TestCase):
+    def setUp(self):
+        window.reset_mock()
+
+    def test_debounce_uses_one_timer(self):
+        calls = []
+        for n in range(100):
+            ltk.schedule(lambda n=n: calls.append(n), "debounced")
+        self.assertLessEqual(window.setTimeout.call_count, 1)
+        _run_timers()
+        self.assertEqual(calls, [99])
+
+    def test_cancel(self):
+        calls = []
+        ltk.schedule(lambda: calls.append("run"), "cancelled")
+        ltk.cancel("cancelled")
+        _run_timers()
+        self.assertEqual(calls, [])
+
+    def test_repeat(self):
+        calls = []
+        ltk.repeat(lambda: calls.append("run"), "repeated", 0)
+        _run_timers()
+        _run_timers()
+        ltk.cancel("repeated")
+        _run_timers()
+        self.assertEqual(calls, ["run", "run"])
+
+    def test_frame_priority(self):
+        calls = []
+        ltk.schedule(lambda: calls.append("frame"), "frame task", priority="frame")
+        _run_timers()
+        self.assertEqual(calls, [])
+        _run_frame()
+        self.assertEqual(calls, ["frame"])
+
+    def test_idle_priority_respects_deadline(self):
+        calls = []
+        for n in range(3):
+            ltk.schedule(lambda n=n: calls.append(n), f"idle {n}", priority="idle")
+        _run_timers()
+        deadline = MagicMock()
+        deadline.timeRemaining.return_value = 0
+        _run_idle(deadline)
+        self.assertEqual(calls, [0])
+        deadline.timeRemaining.return_value = 50
+        _run_idle(deadline)
+        self.assertEqual(calls, [0, 1, 2])
+
+    def test_millisecond_resolution_on_micropython(self):
+        calls = []
+        clock = MagicMock()
+        clock.time.return_value = 1000 # whole seconds, like time.time() on MicroPython
+        clock.ticks_ms.return_value = 1000000
+        clock.ticks_diff = lambda end, start: end - start
+        with patch.object(sys.modules["ltk.jquery"], "time", clock):
+            ltk.schedule(lambda: calls.append("run"), "soon", 0.05)
+            clock.ticks_ms.return_value += 20
+            _run_timers()
+            self.assertEqual(calls, [])
+            clock.ticks_ms.return_value += 40
+            _run_timers()
+            self.assertEqual(calls, ["run"])
+
+    def test_tick_counter_wraps_on_micropython(self):
+        calls = []
+        period = 1 << 30
+        clock = MagicMock()
+        clock.ticks_ms.return_value = period - 10
+        clock.ticks_diff = lambda end, start: (end - start + period // 2) % period - period // 2
+        with patch.object(sys.modules["ltk.jquery"], "time", clock):
+            ltk.schedule(lambda: calls.append("run"), "wrapped", 0.05)
+            clock.ticks_ms.return_value = 20
+            _run_timers()
+            self.assertEqual(calls, [])
+            clock.ticks_ms.return_value = 45
+            _run_timers()
+            self.assertEqual(calls, ["run"])
+
+    def test_invalid_priority(self):
+        with self.assertRaises(ValueError):
+            ltk.schedule(lambda: None, "invalid", priority="urgent")
+
+
+if __name__ == '__main__':
+    unittest.main()
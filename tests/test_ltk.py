@@ -0,0 +1,73 @@
+# pylint: skip-file
+
+import json
+import logging
+import sys
+import unittest
+import ltk
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_lazy_submodules(self):
+        self.assertNotIn("ltk.tutorial", sys.modules)
+        tutorial = ltk.Tutorial([])
+        self.assertIn("ltk.tutorial", sys.modules)
+        self.assertIs(ltk.Step, sys.modules["ltk.tutorial"].Step)
+        self.assertIn("ltk.tutorial", ltk.import_times)
+
+    def test_logger_is_not_replaced(self):
+        logger = ltk.logger
+        ltk.Logger
+        self.assertIs(ltk.logger, logger)
+
+    def test_moved_widgets_import_from_widgets(self):
+        from ltk.widgets import Canvas
+        self.assertIs(Canvas, sys.modules["ltk.canvas"].Canvas)
+        with self.assertRaises(ImportError):
+            from ltk.widgets import DoesNotExist
+
+    def test_root_logger_level(self):
+        self.assertEqual(logging.getLogger("root").level, logging.DEBUG)
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            ltk.DoesNotExist
+
+    def test_import_report(self):
+        report = ltk.import_report()
+        self.assertIn("ltk.widgets", report)
+        self.assertIn("total", report)
+
+
+class TestStartup(unittest.TestCase):
+    def test_import_phases(self):
+        ltk.Div()
+        names = [event["name"] for event in ltk.startup.report()["events"]]
+        self.assertIn("interpreter ready", names)
+        self.assertIn("import ltk.widgets", names)
+        self.assertIn("first widget", names)
+
+    def test_phase_and_mark(self):
+        with ltk.startup.phase("load data"):
+            pass
+        ltk.startup.mark("painted", 12345.0)
+        events = {event["name"]: event for event in ltk.startup.report()["events"]}
+        self.assertGreaterEqual(events["load data"]["duration"], 0)
+        self.assertEqual(events["painted"], { "name": "painted", "start": 12345.0, "duration": 0 })
+
+    def test_chrome_trace(self):
+        ltk.startup.mark("traced", 1.5)
+        trace = json.loads(ltk.startup.chrome_trace())
+        event = [event for event in trace["traceEvents"] if event["name"] == "traced"][0]
+        self.assertEqual(event["ph"], "i")
+        self.assertEqual(event["ts"], 1500)
+
+    def test_tab_construction(self):
+        tabs = ltk.Tabs(("Slow", lambda: ltk.Div()))
+        tabs._load(0)
+        names = [event["name"] for event in ltk.startup.report()["events"]]
+        self.assertIn("tab Slow", names)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,18 @@
 # pylint: skip-file
 
+import json
+import sys
 import unittest
 import ltk
+from unittest.mock import MagicMock
+from unittest.mock import patch
+from ltk.jquery import _run_idle
+from ltk.jquery import _run_timers
+from ltk.jquery import window
+from ltk.widgets import _dirty_manifests
+from ltk.widgets import _manifests
+from ltk.widgets import _save_models
+from ltk.widgets import _unsaved
 
 
 class TodoModel(ltk.LocalStorageModel):
@@ -42,6 +53,441 @@ class TestTodoModel(unittest.TestCase):
         self.assertEqual(self.todo.suggestion, test_suggestion)
 
 
+class Product(ltk.Model):
+    name: str = ""
+    price: float = 0.0
+    summary: str = ""
+
+    def changed(self, name, value):
+        self.calls.append(name)
+        if name != "summary":
+            self.summary = f"{self.name} {self.price}"
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.product = Product()
+        self.product.calls = []
+        self.notified = []
+        for attribute in [self.product.name, self.product.price, self.product.summary]:
+            attribute.listeners.append(lambda attribute: self.notified.append(attribute.name))
+
+    def test_changed_once_per_assignment(self):
+        self.product.name = "Hammer"
+        self.assertEqual(self.product.calls, ["name", "summary"])
+
+    def test_batch_notifies_once(self):
+        with self.product.batch():
+            self.product.name = "Hammer"
+            self.product.price = 100
+            self.product.name = "Drill"
+            self.assertEqual(self.notified, [])
+        self.assertEqual(self.product.name, "Drill")
+        self.assertEqual(self.product.summary, "Drill 100.0")
+        self.assertEqual(self.product.calls, ["name", "price", "summary"])
+        self.assertEqual(self.notified, ["name", "price", "summary"])
+
+    def test_nested_batch(self):
+        with self.product.batch():
+            with self.product.batch():
+                self.product.price = 5
+            self.assertEqual(self.notified, [])
+        self.assertEqual(self.notified, ["price", "summary"])
+
+    def test_batch_with_exception(self):
+        with self.assertRaises(KeyError):
+            with self.product.batch():
+                self.product.price = 5
+                raise KeyError("price")
+        self.assertEqual(self.notified, [])
+        self.assertEqual(self.product.calls, [])
+        self.product.name = "Saw"
+        self.assertCountEqual(self.notified, ["name", "summary"])
+
+    def test_runaway_batch(self):
+        class Ticker(ltk.Model):
+            count: int = 0
+
+            def changed(self, name, value):
+                self.count = value + 1
+
+        ticker = Ticker()
+        with self.assertRaises(ValueError):
+            with ticker.batch():
+                ticker.count = 1
+        self.assertIsNone(ticker._batch)
+
+    def test_update(self):
+        self.product.update(name="Saw", price=12)
+        self.assertEqual(self.notified, ["name", "price", "summary"])
+        with self.assertRaises(ValueError):
+            self.product.update(color="red")
+
+
+class TestWriteBehind(unittest.TestCase):
+    def setUp(self):
+        self.todo = TodoModel()
+        self.store = window.localStorage
+        self.store.reset_mock()
+        self.deadline = MagicMock()
+        self.deadline.timeRemaining.return_value = 50
+
+    def saved(self):
+        values = [args[1] for args, _ in self.store.setItem.call_args_list if args[0] == self.todo._key]
+        self.assertEqual(len(values), 1)
+        return json.loads(values[0])
+
+    def test_changes_are_saved_once(self):
+        self.todo.note = "a"
+        self.todo.note = "ab"
+        self.todo.completed = True
+        self.assertEqual(self.store.setItem.call_count, 0)
+        _unsaved[self.todo._key].flush()
+        self.assertEqual(self.saved(), { "note": "ab", "completed": True, "suggestion": "" })
+
+    def test_saved_when_idle(self):
+        widgets = sys.modules["ltk.widgets"]
+        widgets.STORE_DELAY_SECONDS = 0
+        self.todo.note = "idle"
+        self.todo.note = "idle later"
+        _run_timers()
+        _run_idle(self.deadline)
+        widgets.STORE_DELAY_SECONDS = 0.5
+        self.assertEqual(self.saved()["note"], "idle later")
+
+    def test_saved_while_changing(self):
+        widgets = sys.modules["ltk.widgets"]
+        clock = [0]
+        with patch.object(widgets, "now", lambda: clock[0]), patch.object(widgets, "schedule") as schedule:
+            _save_models()
+            for n in range(20):
+                clock[0] = n * 0.4
+                self.todo.note = str(n)
+                remaining = max(0, widgets.MAX_STORE_DELAY_SECONDS - clock[0])
+                self.assertEqual(schedule.call_args[0][2], min(widgets.STORE_DELAY_SECONDS, remaining))
+            _save_models()
+            clock[0] = 10
+            self.todo.note = "later"
+            self.assertEqual(schedule.call_args[0][2], widgets.STORE_DELAY_SECONDS)
+            _save_models()
+
+    def test_only_dirty_fields_are_encoded(self):
+        self.todo.note = "first"
+        self.todo.flush()
+        self.store.reset_mock()
+        self.todo.suggestion = "second"
+        self.todo.flush()
+        self.assertEqual(self.todo._encoded["note"], '"first"')
+        self.assertEqual(self.saved(), { "note": "first", "completed": False, "suggestion": "second" })
+        self.assertNotIn(self.todo._key, _unsaved)
+
+
+class Note(ltk.LocalStorageModel):
+    text: str = ""
+    stars: float = 0.0
+
+
+class TestLoad(unittest.TestCase):
+    def setUp(self):
+        self.items = {
+            "Note-1": json.dumps({ "text": "one", "stars": 3 }),
+            "Note-2": json.dumps({ "text": "two", "stars": 4.5 }),
+            "Other-1": json.dumps({}),
+        }
+        _manifests.clear()
+        _dirty_manifests.clear()
+        store = window.localStorage
+        store.reset_mock()
+        store.getItem.side_effect = self.items.get
+        store.setItem.side_effect = self.items.__setitem__
+        window.Object.keys.return_value = list(self.items)
+
+    def tearDown(self):
+        window.localStorage.getItem.side_effect = None
+        window.localStorage.setItem.side_effect = None
+
+    def test_load_creates_manifest_once(self):
+        notes = Note.load()
+        self.assertEqual(json.loads(self.items["ltk-manifest-Note"]), ["Note-1", "Note-2"])
+        window.Object.keys.reset_mock()
+        Note.load()
+        self.assertEqual(window.Object.keys.call_count, 0)
+
+    def test_load_is_lazy_and_does_not_save(self):
+        notes = Note.load()
+        self.assertEqual(window.localStorage.getItem.call_count, 1)
+        self.assertEqual(notes[1].text, "two")
+        self.assertEqual(notes[0].stars, 3.0)
+        self.assertIsInstance(notes[0].stars.value, float)
+        self.assertEqual(window.localStorage.getItem.call_count, 3)
+        self.assertEqual(_unsaved, {})
+
+    def test_lazy_model_class(self):
+        notes = Note.load()
+        self.assertIsInstance(notes[0], Note)
+        self.assertIs(notes[0].__class__, Note)
+        self.assertEqual(window.localStorage.getItem.call_count, 1)
+
+    def test_lazy_model_in_collection(self):
+        existing = Note("Note-x")
+        existing.text = "two"
+        collection = ltk.ModelCollection([existing], key="text")
+        collection.set(Note.load())
+        self.assertIs(collection.get("two"), existing)
+        self.assertEqual(existing.stars, 4.5)
+        self.assertEqual(collection.get("one").stars, 3.0)
+        existing.remove()
+
+    def test_new_model_is_added_to_manifest(self):
+        Note.load()
+        note = Note("Note-3")
+        note.text = "three"
+        note.flush()
+        self.assertEqual(json.loads(self.items["ltk-manifest-Note"]), ["Note-1", "Note-2", "Note-3"])
+        note.remove()
+        self.assertEqual(json.loads(self.items["ltk-manifest-Note"]), ["Note-1", "Note-2"])
+
+    def test_manifest_is_saved_once_per_pass(self):
+        Note.load()
+        window.localStorage.setItem.reset_mock()
+        for n in range(3, 13):
+            Note(f"Note-{n}").text = str(n)
+        _save_models()
+        keys = [args[0] for args, _ in window.localStorage.setItem.call_args_list]
+        self.assertEqual(keys.count("ltk-manifest-Note"), 1)
+        self.assertEqual(len(json.loads(self.items["ltk-manifest-Note"])), 12)
+
+
+class Order(ltk.Model):
+    count: int = 1
+    price: float = 10.0
+    note: str = ""
+
+    @ltk.computed
+    def total(self):
+        self.computations += 1
+        return self.count * self.price
+
+    @ltk.computed
+    def label(self):
+        return f"total: {self.total}"
+
+    @ltk.computed
+    def discounted(self):
+        return self.discount() * self.total
+
+    def discount(self):
+        return 0.5 if self.note == "sale" else 1.0
+
+
+class TestComputed(unittest.TestCase):
+    def setUp(self):
+        self.order = Order()
+        self.order.computations = 0
+
+    def test_cached(self):
+        self.assertEqual(self.order.total, 10.0)
+        self.assertEqual(self.order.total, 10.0)
+        self.assertEqual(self.order.computations, 1)
+
+    def test_only_dependencies_invalidate(self):
+        self.assertEqual(self.order.total, 10.0)
+        self.order.note = "fast"
+        self.assertEqual(self.order.total, 10.0)
+        self.assertEqual(self.order.computations, 1)
+        self.order.count = 3
+        self.assertEqual(self.order.total, 30.0)
+        self.assertEqual(self.order.computations, 2)
+
+    def test_notify_only_when_value_differs(self):
+        notified = []
+        self.order.label.listeners.append(lambda attribute: notified.append(attribute.get_value()))
+        self.order.label.get_value()
+        self.order.update(count=2, price=5.0)
+        _run_timers()
+        self.assertEqual(notified, [])
+        self.order.count = 3
+        self.order.price = 6.0
+        self.assertEqual(notified, [])
+        _run_timers()
+        self.assertEqual(notified, ["total: 18.0"])
+
+    def test_recomputed_on_read(self):
+        self.assertEqual(self.order.total, 10.0)
+        self.order.count = 2
+        self.order.count = 3
+        self.assertEqual(self.order.computations, 1)
+        self.assertEqual(self.order.label, "total: 30.0")
+        self.assertEqual(self.order.computations, 2)
+
+    def test_read_through_helper(self):
+        self.assertEqual(self.order.discounted, 10.0)
+        self.order.note = "sale"
+        self.assertEqual(self.order.discounted, 5.0)
+        self.order.count = 4
+        self.assertEqual(self.order.discounted, 20.0)
+
+    def test_not_settable_or_encoded(self):
+        with self.assertRaises(ValueError):
+            self.order.total = 5
+        self.assertNotIn("total", json.loads(self.order.encode()))
+
+
+class Basket(ltk.Model):
+    items: list = []
+    prices: dict = {}
+    name: str = ""
+
+
+class TestObservable(unittest.TestCase):
+    def setUp(self):
+        self.basket = Basket()
+        self.events = []
+        self.notified = []
+        for attribute in [self.basket.items, self.basket.prices]:
+            attribute.item_listeners.append(lambda attribute, event: self.events.append(event))
+            attribute.listeners.append(lambda attribute: self.notified.append(attribute.name))
+
+    def test_defaults_are_not_shared(self):
+        self.basket.items.append("apple")
+        self.assertEqual(Basket().items, [])
+        self.assertEqual(Basket.items, [])
+
+    def test_list_splices(self):
+        items = self.basket.items
+        items.append("a")
+        items.extend(["b", "c"])
+        items.insert(0, "z")
+        items.pop()
+        items.remove("a")
+        items[0] = "y"
+        del items[0]
+        self.assertEqual(items, ["b"])
+        self.assertEqual(self.events, [
+            { "type": "splice", "index": 0, "removed": 0, "inserted": ["a"] },
+            { "type": "splice", "index": 1, "removed": 0, "inserted": ["b", "c"] },
+            { "type": "splice", "index": 0, "removed": 0, "inserted": ["z"] },
+            { "type": "splice", "index": 3, "removed": 1, "inserted": [] },
+            { "type": "splice", "index": 1, "removed": 1, "inserted": [] },
+            { "type": "set", "key": 0, "value": "y" },
+            { "type": "splice", "index": 0, "removed": 1, "inserted": [] },
+        ])
+        self.assertEqual(len(self.notified), 7)
+
+    def test_dict_events(self):
+        prices = self.basket.prices
+        prices["apple"] = 1
+        prices.update(pear=2)
+        prices.pop("apple")
+        prices.pop("missing", None)
+        del prices["pear"]
+        self.assertEqual(self.events, [
+            { "type": "set", "key": "apple", "value": 1 },
+            { "type": "set", "key": "pear", "value": 2 },
+            { "type": "delete", "key": "apple" },
+            { "type": "delete", "key": "pear" },
+        ])
+
+    def test_reading_does_not_notify(self):
+        self.basket.items.append("a")
+        self.notified.clear()
+        self.basket.items.count("a")
+        self.basket.items.index("a")
+        _run_timers()
+        self.assertEqual(self.notified, [])
+
+    def test_assignment_keeps_observing(self):
+        self.basket.items = ["x", "y"]
+        self.basket.items.append("z")
+        self.assertEqual(self.events[-1]["inserted"], ["z"])
+        self.assertEqual(json.loads(self.basket.encode())["items"], ["x", "y", "z"])
+
+
+class TestConstruction(unittest.TestCase):
+    def test_no_notifications(self):
+        calls = []
+        class Quiet(ltk.Model):
+            count: int = 0
+            price: float = 1.0
+            def changed(self, name, value):
+                calls.append(name)
+        quiet = Quiet(count="3", price=2)
+        self.assertEqual(calls, [])
+        self.assertEqual(quiet.count.value, 3)
+        self.assertIsInstance(quiet.price.value, float)
+
+    def test_schema_is_cached(self):
+        Product()
+        schema = sys.modules["ltk.widgets"]._schemas[Product]
+        self.assertEqual(schema.fields, ["name", "price", "summary"])
+        self.assertIs(sys.modules["ltk.widgets"]._get_schema(Product), schema)
+
+    def test_class_default_changes(self):
+        class Counter(ltk.Model):
+            count: int = 0
+        Counter()
+        Counter.count += 10
+        self.assertEqual(Counter().count, 10)
+
+    def test_unknown_argument(self):
+        with self.assertRaises(ValueError):
+            Product(color="red")
+
+    def test_attributes_have_no_dict(self):
+        self.assertFalse(hasattr(Product().name, "__dict__"))
+
+
+class TestDiff(unittest.TestCase):
+    def setUp(self):
+        self.basket = Basket(name="groceries", items=["apple", "pear"])
+        self.copy = Basket(name="groceries", items=["apple", "pear"])
+
+    def test_full_diff(self):
+        patch = self.basket.diff()
+        self.assertEqual(patch["fields"], { "items": ["apple", "pear"], "prices": {}, "name": "groceries" })
+        self.assertEqual(patch["version"], 0)
+
+    def test_only_changed_fields(self):
+        version = self.basket.get_version()
+        self.basket.name = "market"
+        patch = self.basket.diff(since=version)
+        self.assertEqual(patch["fields"], { "name": "market" })
+        self.assertEqual(patch["items"], {})
+        self.assertEqual(self.basket.diff(since=patch["version"])["fields"], {})
+
+    def test_item_events(self):
+        version = self.basket.get_version()
+        self.basket.items.append("plum")
+        self.basket.items[0] = "kiwi"
+        self.basket.prices["plum"] = 2
+        patch = self.basket.diff(since=version)
+        self.assertEqual(patch["fields"], {})
+        self.assertEqual(len(patch["items"]["items"]), 2)
+        self.copy.apply_patch(json.loads(json.dumps(patch)))
+        self.assertEqual(self.copy.items, ["kiwi", "pear", "plum"])
+        self.assertEqual(self.copy.prices, { "plum": 2 })
+
+    def test_assignment_sends_value(self):
+        self.basket.items.append("plum")
+        version = self.basket.get_version()
+        self.basket.items.append("fig")
+        self.basket.items = ["fig"]
+        self.basket.items.append("date")
+        patch = self.basket.diff(since=version)
+        self.assertEqual(patch["fields"], { "items": ["fig", "date"] })
+        self.assertEqual(self.basket.diff(since=self.basket.get_version() - 1)["items"], {
+            "items": [{ "type": "splice", "index": 1, "removed": 0, "inserted": ["date"] }],
+        })
+
+    def test_long_journal_sends_value(self):
+        version = self.basket.get_version()
+        for n in range(sys.modules["ltk.widgets"].MAX_ITEM_EVENTS + 1):
+            self.basket.items.append(n)
+        patch = self.basket.diff(since=version)
+        self.assertIn("items", patch["fields"])
+        self.copy.apply_patch(patch)
+        self.assertEqual(self.copy.items, self.basket.items)
+
+
 if __name__ == '__main__':
     unittest.main()
-
@@ -0,0 +1,214 @@
+# pylint: skip-file
+
+import logging
+import unittest
+from unittest.mock import MagicMock
+from unittest.mock import patch
+import json
+from ltk.jquery import _run_timers
+from ltk.pubsub import _PubSub
+from ltk.pubsub import receive_frames
+
+
+class TestPubSub(unittest.TestCase):
+    def setUp(self):
+        self.pubsub = _PubSub()
+        self.received = []
+
+    def subscribe(self, receiver, topic):
+        self.pubsub.subscribe(receiver, topic, lambda data: self.received.append((receiver, data)))
+
+    def test_exact_topic(self):
+        self.subscribe("a", "log.info")
+        self.subscribe("b", "log.error")
+        self.pubsub.publish("sender", "a", "log.info", 1)
+        self.assertEqual(self.received, [("a", 1)])
+
+    def test_wildcards(self):
+        self.subscribe("one", "log.*")
+        self.subscribe("all", "worker.#")
+        self.subscribe("deep", "app.*.done")
+        for topic in ["log.info", "log.info.extra", "worker", "worker.run.now", "app.save.done"]:
+            self.pubsub.publish("sender", "", topic, topic)
+        self.assertEqual(self.received, [
+            ("one", "log.info"),
+            ("all", "worker"),
+            ("all", "worker.run.now"),
+            ("deep", "app.save.done"),
+        ])
+
+    def test_publish_to_wildcard_topic(self):
+        self.subscribe("one", "log.*")
+        self.pubsub.publish("sender", "", "log.*", 1)
+        self.assertEqual(self.received, [("one", 1)])
+
+    def test_match_cache_is_bounded(self):
+        from ltk.pubsub import MAX_CACHED_TOPICS
+        self.subscribe("all", "#")
+        for n in range(MAX_CACHED_TOPICS + 10):
+            self.pubsub.publish("sender", "", f"topic.{n}", n)
+        self.assertLessEqual(len(self.pubsub.matches), MAX_CACHED_TOPICS)
+        self.assertEqual(len(self.received), MAX_CACHED_TOPICS + 10)
+
+    def test_subscription_order(self):
+        self.subscribe("first", "log.#")
+        self.subscribe("second", "log.info")
+        self.subscribe("third", "*.info")
+        self.pubsub.publish("sender", "", "log.info", 0)
+        self.assertEqual([receiver for receiver, _ in self.received], ["first", "second", "third"])
+
+    def test_unsubscribe(self):
+        self.subscribe("a", "log.info")
+        self.subscribe("a", "log.*")
+        self.subscribe("b", "log.info")
+        self.pubsub.publish("sender", "", "log.info", 1)
+        self.pubsub.unsubscribe("a")
+        self.pubsub.publish("sender", "", "log.info", 2)
+        self.assertEqual(self.received, [("a", 1), ("a", 1), ("b", 1), ("b", 2)])
+
+    def test_unsubscribe_topic(self):
+        self.subscribe("a", "log.info")
+        self.subscribe("a", "log.error")
+        self.pubsub.unsubscribe("a", "log.info")
+        self.pubsub.publish("sender", "", "log.info", 1)
+        self.pubsub.publish("sender", "", "log.error", 2)
+        self.assertEqual(self.received, [("a", 2)])
+
+
+class TestTrace(unittest.TestCase):
+    def setUp(self):
+        self.pubsub = _PubSub()
+        self.pubsub.subscribe("a", "topic", lambda data: None)
+        self.pubsub.subscribe("b", "topic", lambda data: None)
+
+    def test_no_trace_by_default(self):
+        self.pubsub.publish("sender", "a", "topic", 1)
+        self.assertEqual(self.pubsub.get_trace(), [])
+
+    def test_ring_buffer(self):
+        self.pubsub.start_trace(size=3)
+        for n in range(5):
+            self.pubsub.publish("sender", "a", "topic", n)
+        self.assertEqual([record[4] for record in self.pubsub.get_trace()], [2, 3, 4])
+        self.assertEqual(self.pubsub.get_trace(4), [(5, "sender", "a", "topic", 4)])
+
+    def test_restart_keeps_the_trace(self):
+        self.pubsub.start_trace(size=4)
+        for n in range(5):
+            self.pubsub.publish("sender", "a", "topic", n)
+        self.pubsub.start_trace(size=2)
+        self.pubsub.publish("sender", "a", "topic", 5)
+        self.assertEqual(self.pubsub.get_trace(4), [(5, "sender", "a", "topic", 4), (6, "sender", "a", "topic", 5)])
+        self.pubsub.start_trace(size=8)
+        self.assertEqual([record[0] for record in self.pubsub.get_trace()], [5, 6])
+
+    def test_sampling(self):
+        self.pubsub.start_trace(sample_rate=0.25)
+        for n in range(8):
+            self.pubsub.publish("sender", "a", "topic", n)
+        self.assertEqual([record[4] for record in self.pubsub.get_trace()], [3, 7])
+
+    def test_sampling_keeps_logging(self):
+        self.pubsub.start_trace(sample_rate=0.25)
+        logger = logging.getLogger("root")
+        level = logger.level
+        logger.setLevel(logging.DEBUG)
+        with patch.object(logger, "log") as log:
+            with patch.object(logger, "handlers", [MagicMock(level=logging.INFO)]):
+                for n in range(4):
+                    self.pubsub.publish("sender", "a", "topic", n)
+            self.assertEqual(log.call_count, 4)
+        logger.setLevel(level)
+        self.assertEqual(len(self.pubsub.get_trace()), 1)
+
+    def test_lazy_logging(self):
+        logger = logging.getLogger("root")
+        level = logger.level
+        logger.setLevel(logging.DEBUG)
+        with patch.object(logger, "log") as log:
+            with patch.object(logger, "handlers", []):
+                self.pubsub.publish("sender", "a", "topic", 1)
+            self.assertEqual(log.call_count, 0)
+            with patch.object(logger, "handlers", [MagicMock(level=logging.WARNING)]):
+                self.pubsub.publish("sender", "a", "topic", 1)
+            self.assertEqual(log.call_count, 0)
+            with patch.object(logger, "handlers", [MagicMock(level=logging.INFO)]):
+                self.pubsub.publish("sender", "a", "topic", 1)
+            self.assertEqual(log.call_count, 1)
+        logger.setLevel(level)
+
+
+class TestWorkerFrames(unittest.TestCase):
+    def setUp(self):
+        self.pubsub = _PubSub()
+        self.worker = MagicMock()
+
+    def publish(self, count):
+        for n in range(count):
+            self.pubsub.publish("main", "worker", "tick" if n % 2 else "tock", n)
+
+    def test_unbatched(self):
+        self.pubsub.register_worker("remote", self.worker)
+        self.pubsub.subscribe("worker", "#", "remote")
+        self.publish(3)
+        self.assertEqual(self.worker.sync.handler.call_count, 3)
+
+    def test_one_frame_per_tick(self):
+        self.pubsub.register_worker("remote", self.worker, batch=True)
+        self.pubsub.subscribe("worker", "#", "remote")
+        self.publish(100)
+        self.assertEqual(self.worker.sync.handle_frame.call_count, 0)
+        _run_timers()
+        self.worker.sync.handle_frame.assert_called_once()
+        frame = json.loads(self.worker.sync.handle_frame.call_args[0][0])
+        self.assertEqual(len(frame), 100)
+        self.assertEqual(frame[1], ["main", "tick", 1])
+
+    def test_conflate(self):
+        self.pubsub.register_worker("remote", self.worker, batch=True, conflate=True)
+        self.pubsub.subscribe("worker", "#", "remote")
+        self.publish(100)
+        self.pubsub.flush()
+        frame = json.loads(self.worker.sync.handle_frame.call_args[0][0])
+        self.assertEqual(frame, [["main", "tock", 98], ["main", "tick", 99]])
+
+    def test_batched_without_scheduler(self):
+        self.pubsub.register_worker("remote", self.worker, batch=True)
+        self.pubsub.subscribe("worker", "#", "remote")
+        with patch.dict("sys.modules", { "ltk.jquery": None }):
+            self.publish(2)
+        self.assertEqual(self.worker.sync.handle_frame.call_count, 2)
+        frame = json.loads(self.worker.sync.handle_frame.call_args[0][0])
+        self.assertEqual(frame, [["main", "tick", 1]])
+
+    def test_flush_per_instance(self):
+        other = _PubSub()
+        other_worker = MagicMock()
+        self.pubsub.register_worker("remote", self.worker, batch=True)
+        other.register_worker("remote", other_worker, batch=True)
+        self.pubsub.subscribe("worker", "#", "remote")
+        other.subscribe("worker", "#", "remote")
+        self.publish(1)
+        other.publish("main", "worker", "tock", 0)
+        _run_timers()
+        self.worker.sync.handle_frame.assert_called_once()
+        other_worker.sync.handle_frame.assert_called_once()
+
+    def test_receive_frames(self):
+        received = []
+        sync = MagicMock()
+        receive_frames(sync, lambda sender, topic, data: received.append((topic, data)))
+        sync.handle_frame(json.dumps([["main", "tick", { "n": 1 }], ["main", "tock", 2]]))
+        sync.handler("main", "single", "3")
+        self.assertEqual(received, [("tick", { "n": 1 }), ("tock", 2), ("single", 3)])
+
+    def test_publish_frame_from_worker(self):
+        received = []
+        self.pubsub.register_worker("remote", self.worker)
+        self.pubsub.subscribe("main", "result", received.append)
+        self.worker.sync.publish_frame(json.dumps([["worker", "main", "result", n] for n in range(3)]))
+        self.assertEqual(received, [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,539 @@
+# pylint: skip-file
+
+import gc
+import json
+import unittest
+import weakref
+from unittest.mock import MagicMock
+import ltk
+from ltk.jquery import _run_frame
+from ltk.jquery import _run_idle
+from ltk.jquery import _run_timers
+from ltk.jquery import window
+from ltk.widgets import _dispatch_event
+from ltk.widgets import _dispatch_proxy
+from ltk.widgets import _HeightIndex
+from ltk.widgets import _longest_increasing
+from ltk.widgets import _release_widgets
+from ltk.widgets import event_handlers
+from ltk.widgets import widgets
+
+
+class TestDeferred(unittest.TestCase):
+    def setUp(self):
+        window.reset_mock()
+
+    def test_single_build_call(self):
+        with ltk.deferred():
+            view = ltk.VBox(
+                ltk.HBox(
+                    ltk.Text(f"{row}").css("color", "red"),
+                    ltk.Text("<b>").attr("title", "bold"),
+                )
+                for row in range(100)
+            )
+        self.assertEqual(window.jQuery.call_count, 0)
+        view.element
+        self.assertEqual(window.ltkBuild.call_count, 1)
+
+    def test_html(self):
+        with ltk.deferred():
+            text = ltk.Text("a").text("1 < 2").addClass("big")
+            view = ltk.VBox(text, ltk.Input("value"))
+        view.element
+        html, ops, events, *_ = window.ltkBuild.call_args[0]
+        self.assertIn('class="ltk-text big">1 &lt; 2</div>', html)
+        self.assertTrue(html.endswith('class="ltk-input"></div>'))
+        self.assertIn([text._ltk_id, "attr", [{"ltk_id": text._ltk_id}]], json.loads(ops))
+
+    def test_recorded_attr(self):
+        with ltk.deferred():
+            text = ltk.Text("a").attr("name", "tab")
+        self.assertEqual(text.attr("name"), "tab")
+        self.assertEqual(window.ltkBuild.call_count, 0)
+
+    def test_writes_after_the_root_is_built(self):
+        with ltk.deferred():
+            text = ltk.Text("a")
+            view = ltk.VBox(text)
+        view.element
+        text.css("color", "red")
+        root = window.ltkBuild.return_value
+        root.find.assert_called_with(f"[ltk_id='{text._ltk_id}']")
+        root.find.return_value.css.assert_called_with("color", "red")
+
+
+class TestEvents(unittest.TestCase):
+    def setUp(self):
+        window.reset_mock()
+
+    def test_delegated_handler(self):
+        clicks = []
+        div = ltk.Div()
+        div.on("click", lambda event: clicks.append(event), delegate=True)
+        ltk_id = div._ltk_id
+        window.ltkListen.assert_called_with("click", ltk_id, _dispatch_proxy, div.element)
+        _dispatch_event(ltk_id, "click", "event")
+        self.assertEqual(clicks, ["event"])
+
+    def test_deferred_handler(self):
+        with ltk.deferred():
+            text = ltk.Text("a").on("click", lambda event: None, delegate=True)
+        text.element
+        events = window.ltkBuild.call_args[0][2]
+        self.assertEqual(json.loads(events), [[text._ltk_id, "click"]])
+
+    def test_direct_by_default(self):
+        # a handler bound to the element can stop the event before it reaches its ancestors
+        button = ltk.Button("ok", lambda event: event.stopPropagation())
+        button.element.on.assert_called_once()
+        self.assertEqual(window.ltkListen.call_count, 0)
+        self.assertNotIn(button._ltk_id, event_handlers)
+
+    def test_custom_events_on_detached_widgets(self):
+        # trigger on a detached element never reaches the document-level listener
+        div = ltk.Div()
+        div.on("layout", lambda event: None, delegate=True)
+        div.element.on.assert_called_once()
+        self.assertEqual(window.ltkListen.call_count, 0)
+
+    def test_on_returns_jquery(self):
+        div = ltk.Div()
+        self.assertIs(div.on("click", lambda event: None), div.element.on.return_value)
+        self.assertIs(div.on("click", lambda event: None, delegate=True), div.element)
+        with ltk.deferred():
+            text = ltk.Text("a")
+            self.assertIs(text.on("click", lambda event: None, delegate=True), text)
+
+    def test_table_keeps_its_id(self):
+        table = ltk.Table()
+        window.table.return_value.attr.assert_any_call("ltk_id", table._ltk_id)
+
+
+class Counter(ltk.Model):
+    count: int = 0
+
+
+class TestDispose(unittest.TestCase):
+    def test_dispose(self):
+        counter = Counter()
+        text = ltk.Text(counter.count)
+        button = ltk.Div()
+        button.on("click", lambda event: None, delegate=True)
+        view = ltk.VBox(text, button)
+        window.ltkRemove.return_value = json.dumps([view._ltk_id, text._ltk_id, button._ltk_id])
+        self.assertEqual(len(counter.count.listeners), 1)
+        self.assertIn(button._ltk_id, event_handlers)
+        view.dispose()
+        self.assertEqual(counter.count.listeners, [])
+        self.assertNotIn(button._ltk_id, event_handlers)
+        self.assertNotIn(text._ltk_id, ltk.widgets)
+
+    def test_dispose_deferred(self):
+        counter = Counter()
+        with ltk.deferred():
+            text = ltk.Text(counter.count)
+            view = ltk.VBox(text)
+        view.dispose()
+        self.assertEqual(counter.count.listeners, [])
+        self.assertNotIn(text._ltk_id, event_handlers)
+
+    def test_ids_are_not_reused(self):
+        div = ltk.Div()
+        div.on("click", lambda event: None, delegate=True)
+        ltk_id = div._ltk_id
+        del div
+        self.assertNotEqual(ltk.Div()._ltk_id, ltk_id)
+
+    def test_handled_widget_that_is_never_attached(self):
+        div = ltk.Div()
+        div.on("click", lambda event: None, delegate=True)
+        ltk_id = div._ltk_id
+        self.assertIs(window.ltkListen.call_args[0][3], div.element) # ltk.js watches the element
+        collected = weakref.ref(div)
+        del div
+        gc.collect()
+        self.assertIsNone(collected())
+        self.assertIsNone(window.getWidget(MagicMock(attr=lambda name: ltk_id)))
+        _release_widgets(json.dumps([ltk_id])) # ltk.js reports that the element was collected
+        self.assertNotIn(ltk_id, event_handlers)
+
+class TestTransaction(unittest.TestCase):
+    def test_writes_are_flushed_together(self):
+        window.reset_mock()
+        first = ltk.Div()
+        second = ltk.Div()
+        first.transaction().css("top", 10).css("left", 20).width(30).attr("title", "first")
+        second.transaction().addClass("a").addClass("b")
+        self.assertEqual(window.ltkWrite.call_count, 0)
+        _run_frame()
+        writes = json.loads(window.ltkWrite.call_args[0][0])
+        self.assertEqual(writes, [
+            { "css": { "top": 10, "left": 20 }, "width": 30, "attr": { "title": "first" } },
+            { "addClass": "a b" },
+        ])
+        self.assertEqual(window.ltkWrite.call_count, 1)
+
+    def test_element_access_applies_writes(self):
+        window.reset_mock()
+        div = ltk.Div()
+        div.transaction().css("top", 10)
+        div.animate({ "opacity": 1 })
+        self.assertEqual(window.ltkWrite.call_count, 1)
+        _run_frame()
+        self.assertEqual(window.ltkWrite.call_count, 1)
+
+
+class TestGeometry(unittest.TestCase):
+    def test_geometry_is_cached_while_measuring(self):
+        window.reset_mock()
+        window.ltkGeometry.return_value = json.dumps({ "width": 10 })
+        div = ltk.Div()
+        widths = []
+        ltk.measure(lambda: widths.append(div.geometry()["width"]), "first")
+        ltk.measure(lambda: widths.append(div.geometry()["width"]), "second")
+        _run_frame()
+        self.assertEqual(widths, [10, 10])
+        self.assertEqual(window.ltkGeometry.call_count, 1)
+
+
+class TestRenderer(unittest.TestCase):
+    def setUp(self):
+        window.reset_mock()
+
+    def render(self, items, color="red"):
+        return ltk.VBox(
+            ltk.Text(item).attr("key", item).css("color", color)
+            for item in items
+        )
+
+    def patch(self):
+        return json.loads(window.ltkPatch.call_args[0][1])
+
+    def test_unchanged(self):
+        renderer = ltk.Renderer(lambda: self.render(["a", "b"]))
+        self.assertEqual(window.ltkBuild.call_count, 1)
+        renderer.refresh()
+        window.ltkPatch.assert_not_called()
+
+    def test_minimal_updates(self):
+        color = ["red"]
+        renderer = ltk.Renderer(lambda: self.render(["a", "b"], color[0]))
+        ids = [node.widget._ltk_id for node in renderer.tree.children]
+        color[0] = "blue"
+        renderer.refresh()
+        patch = self.patch()
+        self.assertEqual(patch["children"], [])
+        self.assertEqual(patch["fragments"], [])
+        self.assertEqual(patch["updates"], [[ltk_id, "css", [{"color": "blue"}]] for ltk_id in ids])
+        self.assertEqual([node.widget._ltk_id for node in renderer.tree.children], ids)
+
+    def test_keyed_moves(self):
+        items = ["a", "b", "c"]
+        renderer = ltk.Renderer(lambda: self.render(items))
+        root_id = renderer.tree.widget._ltk_id
+        ids = { node.key: node.widget._ltk_id for node in renderer.tree.children }
+        items[:] = ["c", "a", "d"]
+        renderer.refresh()
+        patch = self.patch()
+        self.assertFalse({ltk_id for ltk_id, *_ in patch["updates"]} & set(ids.values()))
+        self.assertEqual(len(patch["fragments"]), 1)
+        self.assertIn(">d</div>", patch["fragments"][0])
+        self.assertEqual(patch["children"], [[root_id, [
+            {"id": ids["c"]},
+            {"id": ids["a"]},
+            {"fragment": 0},
+        ]]])
+
+    def test_handlers_survive(self):
+        clicks = []
+        label = ["ok"]
+        renderer = ltk.Renderer(lambda: ltk.Button(label[0], lambda event: clicks.append(label[0])))
+        ltk_id = renderer.tree.widget._ltk_id
+        label[0] = "go"
+        renderer.refresh()
+        self.assertEqual(self.patch()["updates"], [[ltk_id, "html", ["go"]]])
+        self.assertIs(widgets[ltk_id], renderer.tree.widget)
+        _dispatch_event(ltk_id, "click", "event")
+        self.assertEqual(clicks, ["go"])
+
+
+class TestVirtualList(unittest.TestCase):
+    def setUp(self):
+        window.reset_mock()
+        window.ltkHeights.side_effect = lambda *elements: json.dumps([20] * len(elements))
+
+    def scroll(self, virtual_list, top):
+        window.ltkGeometry.return_value = json.dumps({ "scroll_top": top, "height": 100 })
+        virtual_list.layout()
+        _run_frame()
+
+    def test_height_index(self):
+        index = _HeightIndex(10, 20)
+        index.set(3, 50)
+        index.extend(5, 10)
+        self.assertEqual(index.offset(4), 110)
+        self.assertEqual(index.offset(15), 280)
+        self.assertEqual(index.find(0), 0)
+        self.assertEqual(index.find(109), 3)
+        self.assertEqual(index.find(110), 4)
+        self.assertEqual(index.find(10000), 14)
+
+    def test_only_visible_rows(self):
+        items = [f"item {n}" for n in range(100000)]
+        virtual_list = ltk.VirtualList(items, row_height=20, overscan=2)
+        self.scroll(virtual_list, 0)
+        self.assertEqual(sorted(virtual_list.rows), list(range(8)))
+        self.assertEqual(window.ltkBuild.call_count, 1)
+        self.assertIn("item 7", window.ltkBuild.call_args[0][0])
+
+    def test_rows_are_recycled(self):
+        updates = []
+        virtual_list = ltk.VirtualList(
+            1000,
+            lambda index: ltk.Text(index),
+            lambda row, index: updates.append(index),
+            row_height=20,
+            overscan=2,
+        )
+        self.scroll(virtual_list, 0)
+        rows = set(virtual_list.rows.values())
+        self.scroll(virtual_list, 1000)
+        self.assertEqual(sorted(virtual_list.rows), list(range(48, 58)))
+        self.assertEqual(window.ltkBuild.call_count, 2)
+        self.assertEqual(len(updates), 8)
+        self.assertTrue(rows < set(virtual_list.rows.values()))
+
+
+class TestTable(unittest.TestCase):
+    def test_bulk_writes(self):
+        window.reset_mock()
+        table = ltk.Table()
+        table.set_rows(2, [[1, "a"], [2, "b"]])
+        table.set_column(3, [True, None], start=5)
+        self.assertEqual(window.tableSetRange.call_count, 2)
+        self.assertEqual(window.tableSetRange.call_args_list[0][0][1:], (2, 0, '[["1", "a"], ["2", "b"]]'))
+        self.assertEqual(window.tableSetRange.call_args_list[1][0][1:], (5, 3, '[["True"], ["None"]]'))
+
+    def test_cells_in_existing_rows(self):
+        window.reset_mock()
+        table = ltk.Table(
+            ltk.TableRow(ltk.TableHeader("name"), ltk.TableHeader("price")),
+            ltk.TableRow(ltk.TableData("apple"), ltk.TableData("1.5")),
+        )
+        table.title(2, "count")
+        table.set(2, 1, 7)
+        table.set_range(1, 0, [["pear", 2.5, 3]])
+        self.assertEqual(table.get(1, 1), window.tableGet.return_value)
+        window.tableTitle.assert_called_once_with(table.element, 2, "count")
+        window.tableSet.assert_called_once_with(table.element, 2, 1, "7")
+        window.tableSetRange.assert_called_once_with(table.element, 1, 0, '[["pear", "2.5", "3"]]')
+        window.tableGet.assert_called_once_with(table.element, 1, 1)
+
+    def test_cells_after_rows_change(self):
+        window.reset_mock()
+        table = ltk.Table()
+        table.set_rows(0, [["a"], ["b"], ["c"]])
+        table.append(ltk.TableRow(ltk.TableData("d")))
+        table.element.find(".ltk-table-row").eq(1).remove()
+        table.set_column(0, ["x", "y"], start=3)
+        table.set(1, 0, "z")
+        self.assertEqual([call[0] for call in window.tableSetRange.call_args_list], [
+            (table.element, 0, 0, '[["a"], ["b"], ["c"]]'),
+            (table.element, 3, 0, '[["x"], ["y"]]'),
+        ])
+        window.tableSet.assert_called_once_with(table.element, 1, 0, "z")
+
+
+class TestDataGrid(unittest.TestCase):
+    def setUp(self):
+        window.reset_mock()
+        window.ltkGeometry.return_value = json.dumps({
+            "scroll_top": 0, "scroll_left": 0, "width": 150, "height": 100,
+        })
+
+    def render(self, grid):
+        _run_frame()
+        return json.loads(window.ltkGrid.call_args[0][1])
+
+    def test_column_store(self):
+        grid = ltk.DataGrid({ "id": [3, 1, 2], "price": [1.5, 2, 3], "name": ["c", "a", "b"] })
+        self.assertEqual(grid.columns["id"].typecode, "q")
+        self.assertEqual(grid.columns["price"].typecode, "d")
+        self.assertEqual(grid.columns["name"], ["c", "a", "b"])
+
+    def test_visible_cells(self):
+        grid = ltk.DataGrid({ "a": range(1000), "b": range(1000), "c": range(1000) }, row_height=20, overscan=1)
+        update = self.render(grid)
+        self.assertEqual(update["columns"], [[0, 120], [120, 120]])
+        self.assertEqual(len(update["rows"]), 5)
+        self.assertEqual(update["height"], 20000)
+        self.assertEqual(update["width"], 360)
+
+    def test_sort_and_filter(self):
+        grid = ltk.DataGrid({ "id": [3, 1, 2, 4], "name": ["c", "a", "b", "d"] })
+        grid.sort("id")
+        self.assertEqual(self.render(grid)["values"], [["1", "a"], ["2", "b"], ["3", "c"], ["4", "d"]])
+        grid.filter("name", lambda name: name != "b")
+        grid.filter("id", lambda id: id > 1)
+        grid.sort("id", descending=True)
+        self.assertEqual(self.render(grid)["values"], [["4", "d"], ["3", "c"]])
+        self.assertEqual(list(grid.sorts), ["id"])
+        grid.filter("name")
+        grid.sort()
+        self.assertEqual(self.render(grid)["values"], [["3", "c"], ["2", "b"], ["4", "d"]])
+
+    def test_visible_rows_below_header(self):
+        window.ltkGeometry.return_value = json.dumps({
+            "scroll_top": 200, "scroll_left": 0, "width": 150, "height": 100,
+        })
+        grid = ltk.DataGrid({ "a": range(1000) }, row_height=20, overscan=0)
+        update = self.render(grid)
+        self.assertEqual(update["rows"], [200, 220, 240, 260])
+
+    def test_descending_sort_is_stable(self):
+        grid = ltk.DataGrid({ "group": [1, 2, 1, 2], "name": ["a", "b", "c", "d"] })
+        grid.sort("group", descending=True)
+        self.assertEqual(self.render(grid)["values"], [["2", "b"], ["2", "d"], ["1", "a"], ["1", "c"]])
+
+    def test_column_lengths(self):
+        grid = ltk.DataGrid({ "id": [1, 2, 3] })
+        with self.assertRaises(ValueError):
+            grid.set_column("name", ["a", "b"])
+        with self.assertRaises(ValueError):
+            ltk.DataGrid({ "id": [1, 2, 3], "name": ["a"] })
+        grid.set_column("id", [1, 2])
+        self.assertEqual(grid.count, 2)
+
+
+class TestStream(unittest.TestCase):
+    def test_chunks_per_frame(self):
+        window.reset_mock()
+        created = []
+        progress = []
+        done = []
+
+        def rows():
+            for n in range(3):
+                created.append(n)
+                yield ltk.Text(n)
+
+        ltk.VBox().stream(rows(), lambda: done.append(True), progress.append, budget_seconds=0)
+        self.assertEqual(created, [])
+        for _ in range(4):
+            _run_timers()
+            _run_frame()
+        self.assertEqual(progress, [1, 2, 3])
+        self.assertEqual(done, [True])
+        self.assertEqual(window.ltkBuild.call_count, 3)
+
+
+class TestTabs(unittest.TestCase):
+    def activate(self, tabs, index):
+        ui = MagicMock()
+        ui.newPanel.attr.return_value = f"{tabs.name}-{index}"
+        tabs._before_activate(ui)
+
+    def test_lazy_panels(self):
+        created = []
+        def factory(name):
+            return lambda: created.append(name) or ltk.Text(name)
+        tabs = ltk.Tabs(
+            ("first", factory("first")),
+            ("second", factory("second")),
+            ("third", factory("third")),
+            max_panels=2,
+        )
+        self.assertEqual(created, [])
+        self.activate(tabs, 1)
+        self.activate(tabs, 1)
+        self.assertEqual(created, ["second"])
+        self.activate(tabs, 0)
+        self.activate(tabs, 2)
+        self.assertEqual(tabs.created, [0, 2])
+        self.activate(tabs, 1)
+        self.assertEqual(created, ["second", "first", "third", "second"])
+
+    def test_prefetch(self):
+        created = []
+        tabs = ltk.Tabs(
+            ("first", lambda: created.append(0) or ltk.Text("first")),
+            ("second", lambda: created.append(1) or ltk.Text("second")),
+            prefetch=True,
+        )
+        self.activate(tabs, 0)
+        self.assertEqual(created, [0])
+        _run_timers()
+        _run_idle()
+        self.assertEqual(created, [0, 1])
+
+
+class Item(ltk.Model):
+    id: str = ""
+    label: str = ""
+
+
+class Row():
+    def __init__(self, model):
+        self.model = model
+        self.element = MagicMock()
+        self.dispose = MagicMock()
+
+
+class TestModelCollection(unittest.TestCase):
+    def setUp(self):
+        self.collection = ltk.ModelCollection([Item(id=key) for key in "abcde"])
+        self.container = ltk.VBox()
+        self.created = []
+        def create_row(model):
+            self.created.append(model.id.get_value())
+            return Row(model)
+        self.collection.bind(self.container, create_row)
+        self.binding = self.container._bindings[-1][1].__self__
+        self.rows = dict(self.binding.rows)
+        self.container.element.reset_mock()
+
+    def moves(self):
+        return sum(row.element.before.call_count for row in self.binding.rows.values()) + \
+            self.container.element.append.call_count
+
+    def test_insert_and_remove_touch_one_row(self):
+        self.collection.insert(2, Item(id="x"))
+        self.assertEqual(self.created, list("abcdex"))
+        self.rows["c"].element.before.assert_called_once()
+        self.collection.remove(self.collection.get("b"))
+        self.rows["b"].dispose.assert_called_once()
+        self.assertEqual(self.binding.keys, list("axcde"))
+
+    def test_move(self):
+        self.collection.move(self.collection.get("a"), 4)
+        self.assertEqual(self.binding.keys, list("bcdea"))
+        self.assertEqual(self.container.element.append.call_count, 1)
+
+    def test_sort_moves_few_rows(self):
+        self.collection.move(self.collection.get("e"), 0)
+        self.collection.sort(key=lambda item: item.id.get_value())
+        self.assertEqual(self.binding.keys, list("abcde"))
+        self.assertEqual(self.created, list("abcde"))
+        self.assertEqual(self.moves(), 2)
+
+    def test_set_reuses_rows_and_models(self):
+        b = self.collection.get("b")
+        self.collection.set([Item(id="b", label="new"), Item(id="f"), Item(id="a")])
+        self.assertIs(self.collection.get("b"), b)
+        self.assertEqual(b.label, "new")
+        self.assertEqual(self.created, list("abcdef"))
+        for key in "cde":
+            self.rows[key].dispose.assert_called_once()
+        self.assertEqual(self.binding.keys, list("bfa"))
+
+    def test_duplicate_key(self):
+        with self.assertRaises(ValueError):
+            self.collection.append(Item(id="a"))
+
+    def test_longest_increasing(self):
+        self.assertEqual(_longest_increasing([4, 0, 1, -1, 2, 3]), {1, 2, 4, 5})
+
+
+if __name__ == '__main__':
+    unittest.main()